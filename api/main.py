@@ -1,8 +1,94 @@
-from fastapi import FastAPI
-from api.routes import predict, status, recommend
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from pymongo.errors import PyMongoError
+from api.routes import predict, status, recommend, ingest, monitoring, dispatch
+import os
+from api.utils.geo import DispatchIndex
+from api.utils.instrumentation import MetricsMiddleware
+from api.utils.model_server import BayesianModelServer, ModelServer
+from models.feature_store import FeatureStore
+from database.indexes import ensure_indexes_async
+from database.mongo_connection import create_async_client
+from utils import config
+from utils.logger import logger
+from utils.metrics import start_snapshot_thread
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the failure model once per worker and start the micro-batcher
+    app.state.model_server = ModelServer(
+        config.MODEL_PATH,
+        batch_window_ms=config.MODEL_BATCH_WINDOW_MS,
+        max_batch_size=config.MODEL_MAX_BATCH_SIZE,
+        reload_interval_s=config.MODEL_RELOAD_INTERVAL_S,
+    )
+    await app.state.model_server.start()
+
+    # The Bayesian model is optional: its route answers 503 until a posterior has been fit
+    app.state.bayes_server = None
+    if os.path.exists(config.BAYES_MODEL_PATH):
+        app.state.bayes_server = BayesianModelServer(
+            config.BAYES_MODEL_PATH,
+            credible_level=config.CREDIBLE_LEVEL,
+            batch_window_ms=config.MODEL_BATCH_WINDOW_MS,
+            max_batch_size=config.MODEL_MAX_BATCH_SIZE,
+            reload_interval_s=config.MODEL_RELOAD_INTERVAL_S,
+        )
+        await app.state.bayes_server.start()
+    # Window features accumulate per worker from the readings it serves
+    window = getattr(app.state.model_server.model, "feature_window_", None) or config.FEATURE_WINDOW
+    app.state.feature_store = FeatureStore(window=window)
+
+    # One pooled async MongoDB client per worker
+    app.state.mongo_client = create_async_client()
+    app.state.db = app.state.mongo_client[config.MONGO_DB]
+    try:
+        await ensure_indexes_async(app.state.db)
+    except PyMongoError:
+        # The prediction routes do not need MongoDB, so keep serving them
+        logger.exception("Could not ensure MongoDB indexes")
+    # Built lazily from components_latest on the first dispatch query
+    app.state.dispatch_index = DispatchIndex(config.GEO_INDEX_REFRESH_S, cell_deg=config.GEO_CELL_DEG)
+
+    # Other workers answer /metrics with this worker's counters too (utils/metrics.py)
+    metrics_snapshots = None
+    if config.PROMETHEUS_MULTIPROC_DIR:
+        metrics_snapshots = start_snapshot_thread(config.PROMETHEUS_MULTIPROC_DIR, config.METRICS_SNAPSHOT_INTERVAL_S)
+
+    # Score one row so the first request does not pay for page faults on the model
+    server = app.state.model_server
+    await asyncio.to_thread(server.predict_batch, [{name: 0.0 for name in server.feature_names}])
+    logger.info("Worker %d ready (model %s)", os.getpid(), server.model_path)
+
+    try:
+        yield
+    finally:
+        # In-flight requests have finished by now; answer anything still queued, then close
+        logger.info("Worker %d shutting down", os.getpid())
+        await app.state.model_server.stop()
+        if app.state.bayes_server is not None:
+            await app.state.bayes_server.stop()
+        await app.state.mongo_client.close()
+        if metrics_snapshots is not None:
+            metrics_snapshots.set()
+
+
+app = FastAPI(title="Smart Transport AI Backend", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(PyMongoError)
+async def mongo_error_handler(request: Request, exc: PyMongoError):
+    logger.warning("MongoDB error on %s: %s", request.url.path, exc)
+    return JSONResponse(status_code=503, content={"detail": "Database unavailable"})
 
-app = FastAPI(title="Smart Transport AI Backend")
 
 app.include_router(predict.router, prefix="/predict-failure")
 app.include_router(status.router, prefix="/get-component-status")
 app.include_router(recommend.router, prefix="/recommend-maintenance")
+app.include_router(ingest.router)
+app.include_router(monitoring.router)
+app.include_router(dispatch.router, prefix="/dispatch")
@@ -1,6 +1,7 @@
 # api/models/schemas.py
-from pydantic import BaseModel
-from typing import Optional
+from datetime import date, datetime
+from pydantic import BaseModel, field_validator
+from typing import Any, Dict, List, Optional
 
 class Battery(BaseModel):
     temperature: float
@@ -31,6 +32,21 @@ class SensorInput(BaseModel):
     brake_system: BrakeSystem
     last_service_date: str
     component_age_days: int
+    # Selects per-component-type costs from the cost model, e.g. "battery"
+    component_type: Optional[str] = None
+
+    # Kept as the client's ISO strings, but rejected with a 422 if they do not parse
+    @field_validator("timestamp")
+    @classmethod
+    def _iso_timestamp(cls, value: str) -> str:
+        datetime.fromisoformat(value)
+        return value
+
+    @field_validator("last_service_date")
+    @classmethod
+    def _iso_date(cls, value: str) -> str:
+        date.fromisoformat(value)
+        return value
 
 class MaintenanceDecision(BaseModel):
     component_id: str
@@ -38,8 +54,43 @@ class MaintenanceDecision(BaseModel):
     failure_probability: float
     recommended_action: str
     explanation: str
-    
+    cost_model_version: str
+
 class PredictionOutput(BaseModel):
     component_id: str
     vehicle_id: str
-    failure_probability: float
\ No newline at end of file
+    failure_probability: float
+
+class IntervalPredictionOutput(BaseModel):
+    component_id: str
+    vehicle_id: str
+    failure_probability: float
+    lower: float
+    upper: float
+    credible_level: float
+
+class ColumnarSensorBatch(BaseModel):
+    # Flat, json_normalize-style column names, e.g. "battery.temperature"
+    columns: Dict[str, List[Any]]
+
+class BatchItemError(BaseModel):
+    index: int
+    errors: List[Any]
+
+class BatchMaintenanceResponse(BaseModel):
+    results: List[Optional[MaintenanceDecision]]
+    errors: List[BatchItemError]
+
+class DispatchCandidate(BaseModel):
+    component_id: str
+    vehicle_id: str
+    timestamp: str
+    latitude: float
+    longitude: float
+    distance_km: float
+    failure_probability: float
+    recommended_action: str
+
+class DispatchResponse(BaseModel):
+    index_size: int
+    results: List[DispatchCandidate]
@@ -0,0 +1,30 @@
+# api/routes/dispatch.py
+from typing import Literal
+from fastapi import APIRouter, Depends, Query
+from api.models.schemas import DispatchResponse
+from api.utils.db import get_db
+from api.utils.geo import DispatchIndex, get_dispatch_index
+
+router = APIRouter()
+
+Action = Literal["fix_now", "wait", "any"]
+
+def _response(index, results):
+    return {"index_size": len(index), "results": results.to_dict(orient="records")}
+
+@router.get("/nearby", response_model=DispatchResponse)
+async def nearby(latitude: float = Query(..., ge=-90, le=90), longitude: float = Query(..., ge=-180, le=180),
+                 radius_km: float = Query(50, gt=0, le=20_000), action: Action = "fix_now",
+                 limit: int = Query(100, ge=1, le=10_000), db=Depends(get_db),
+                 dispatch_index: DispatchIndex = Depends(get_dispatch_index)):
+    """Components (by their latest reading) within `radius_km` of a depot, nearest first."""
+    index = await dispatch_index.get(db, action)
+    return _response(index, index.within(latitude, longitude, radius_km, limit=limit))
+
+@router.get("/nearest", response_model=DispatchResponse)
+async def nearest(latitude: float = Query(..., ge=-90, le=90), longitude: float = Query(..., ge=-180, le=180),
+                  k: int = Query(10, ge=1, le=10_000), action: Action = "fix_now", db=Depends(get_db),
+                  dispatch_index: DispatchIndex = Depends(get_dispatch_index)):
+    """The `k` components nearest to a depot."""
+    index = await dispatch_index.get(db, action)
+    return _response(index, index.nearest(latitude, longitude, k))
@@ -0,0 +1,32 @@
+# api/routes/ingest.py
+from typing import List
+from fastapi import APIRouter, Depends
+from api.models.schemas import SensorInput
+from api.utils.cache import invalidate_component, recommendation_cache, status_cache
+from api.utils.db import get_db
+from api.utils.instrumentation import BATCH_ITEMS
+from database.indexes import LATEST_COLLECTION, READINGS_COLLECTION
+from database.insert_data import bulk_upsert_readings_async
+
+router = APIRouter()
+
+@router.post("/ingest-readings")
+async def ingest_readings(readings: List[SensorInput], db=Depends(get_db)):
+    """
+    Stores new readings and invalidates the cached status / recommendations
+    of every component they belong to (other workers pick the change up
+    through api.utils.cache.InvalidationFeed).
+    """
+    stats = await bulk_upsert_readings_async(
+        db[READINGS_COLLECTION],
+        (reading.model_dump() for reading in readings),
+        latest_collection=db[LATEST_COLLECTION],
+    )
+    for component_id in {reading.component_id for reading in readings}:
+        invalidate_component(component_id)
+
+    return {"documents": stats.documents, "upserted": stats.upserted, "modified": stats.modified}
+
+@router.get("/cache-stats")
+def cache_stats():
+    return {"status": status_cache.stats(), "recommendation": recommendation_cache.stats()}
@@ -0,0 +1,41 @@
+# api/routes/monitoring.py
+import asyncio
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse, Response
+from pymongo.errors import PyMongoError
+from utils import config
+from utils.logger import logger
+from utils.metrics import CONTENT_TYPE, REGISTRY, render_multiprocess
+
+router = APIRouter()
+
+@router.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint: every worker's metrics when they share PROMETHEUS_MULTIPROC_DIR."""
+    if config.PROMETHEUS_MULTIPROC_DIR:
+        return Response(render_multiprocess(config.PROMETHEUS_MULTIPROC_DIR), media_type=CONTENT_TYPE)
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+@router.get("/healthz")
+async def healthz(request: Request):
+    """
+    Readiness for the load balancer: 200 when the failure model is loaded and
+    MongoDB answers a ping within HEALTH_DB_TIMEOUT_S, 503 otherwise.
+    """
+    state = request.app.state
+    model_server = getattr(state, "model_server", None)
+    checks = {"model": "ok" if model_server is not None and model_server.is_loaded else "not loaded"}
+
+    bayes_server = getattr(state, "bayes_server", None)
+    checks["bayes_model"] = "disabled" if bayes_server is None else ("ok" if bayes_server.is_loaded else "not loaded")
+
+    try:
+        await asyncio.wait_for(state.db.command("ping"), timeout=config.HEALTH_DB_TIMEOUT_S)
+        checks["database"] = "ok"
+    except (PyMongoError, asyncio.TimeoutError, AttributeError) as e:
+        logger.warning("Health check: MongoDB unreachable: %r", e)
+        checks["database"] = "unreachable"
+
+    healthy = checks["model"] == "ok" and checks["database"] == "ok" and checks["bayes_model"] != "not loaded"
+    return JSONResponse(status_code=200 if healthy else 503,
+                        content={"status": "ok" if healthy else "unavailable", "checks": checks})
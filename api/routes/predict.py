@@ -1,9 +1,24 @@
-from fastapi import APIRouter
-from api.models.schemas import SensorInput, PredictionOutput
-from api.utils.processor import predict_failure
+from fastapi import APIRouter, Depends
+from api.models.schemas import SensorInput, PredictionOutput, IntervalPredictionOutput
+from api.utils.model_server import (
+    BayesianModelServer,
+    ModelServer,
+    get_bayes_server,
+    get_feature_store,
+    get_model_server,
+)
+from api.utils.processor import predict_failure, predict_failure_interval
+from models.feature_store import FeatureStore
 
 router = APIRouter()
 
 @router.post("/", response_model=PredictionOutput)
-def predict_failure_endpoint(sensor_data: SensorInput):
-    return predict_failure(sensor_data)
+async def predict_failure_endpoint(sensor_data: SensorInput, model_server: ModelServer = Depends(get_model_server),
+                                   feature_store: FeatureStore = Depends(get_feature_store)):
+    return await predict_failure(sensor_data, model_server, feature_store)
+
+@router.post("/interval", response_model=IntervalPredictionOutput)
+async def predict_failure_interval_endpoint(sensor_data: SensorInput,
+                                            bayes_server: BayesianModelServer = Depends(get_bayes_server),
+                                            feature_store: FeatureStore = Depends(get_feature_store)):
+    return await predict_failure_interval(sensor_data, bayes_server, feature_store)
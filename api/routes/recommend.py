@@ -1,10 +1,68 @@
 # api/routes/recommend.py
-from fastapi import APIRouter
-from api.models.schemas import SensorInput, MaintenanceDecision
-from api.utils.processor import recommend_maintenance
+from typing import Any, Dict, List, Union
+from fastapi import APIRouter, Body, HTTPException
+from pydantic import ValidationError
+from api.models.schemas import SensorInput, MaintenanceDecision, ColumnarSensorBatch, BatchMaintenanceResponse
+from api.utils.cache import MISSING, payload_digest, recommendation_cache
+from api.utils.instrumentation import BATCH_ITEMS
+from api.utils.processor import (
+    cost_models,
+    recommend_maintenance,
+    recommend_maintenance_batch,
+    sensor_inputs_to_frame,
+    validate_columnar_batch,
+)
 
 router = APIRouter()
 
-@router.post("/recommend-maintenance", response_model=MaintenanceDecision)
+# Served at /recommend-maintenance; the doubled path is what earlier releases exposed under the router prefix
+@router.post("", response_model=MaintenanceDecision)
+@router.post("/recommend-maintenance", response_model=MaintenanceDecision, include_in_schema=False)
 def recommend(sensor_data: SensorInput):
-    return recommend_maintenance(sensor_data)
+    cost_model = cost_models.get()
+    key = (sensor_data.component_id, cost_model.version, payload_digest(sensor_data.model_dump_json()))
+    decision = recommendation_cache.get(key)
+    if decision is MISSING:
+        decision = recommend_maintenance(sensor_data, cost_model)
+        recommendation_cache.set(key, decision)
+    return decision
+
+@router.post("/batch", response_model=BatchMaintenanceResponse)
+def recommend_batch(payload: Union[ColumnarSensorBatch, List[Dict[str, Any]]] = Body(...)):
+    """
+    Scores many components in one request.
+
+    Accepts either a list of SensorInput objects or a columnar payload
+    ({"columns": {"component_id": [...], "battery.temperature": [...], ...}}).
+    Results are returned in input order; invalid items get a null result and
+    an entry in `errors`.
+    """
+    if isinstance(payload, ColumnarSensorBatch):
+        try:
+            frame, errors = validate_columnar_batch(payload.columns)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        total = len(frame)
+        frame = frame.drop(index=list(errors))
+    else:
+        valid, valid_idx, errors = [], [], {}
+        for idx, item in enumerate(payload):
+            try:
+                valid.append(SensorInput.model_validate(item))
+                valid_idx.append(idx)
+            except ValidationError as e:
+                errors[idx] = e.errors(include_url=False, include_context=False)
+        frame = sensor_inputs_to_frame(valid)
+        frame.index = valid_idx
+        total = len(payload)
+
+    BATCH_ITEMS.observe(total, route="/recommend-maintenance/batch")
+    results = [None] * total
+    scored = recommend_maintenance_batch(frame)
+    for idx, record in zip(frame.index, scored.to_dict(orient="records")):
+        results[idx] = record
+
+    return {
+        "results": results,
+        "errors": [{"index": idx, "errors": errs} for idx, errs in sorted(errors.items())],
+    }
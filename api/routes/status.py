@@ -1,26 +1,45 @@
-from fastapi import APIRouter, HTTPException
-from pymongo import MongoClient
-from bson.json_util import dumps
-import json
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from api.utils.cache import MISSING, invalidation_feed, status_cache
+from api.utils.db import get_db
+from database.queries import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    get_latest_reading_async,
+    get_reading_history_async,
+    list_components_page_async,
+)
 
 router = APIRouter()
 
-# Securely load credentials (e.g., via environment variables in real systems)
-db = client["smart_transport"]
-
 @router.get("/get-all-components")
-def get_all():
-    data = list(db.components.find({}, {"_id": 0, "component_id": 1, "vehicle_id": 1}))
-    return data
+async def get_all(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), after: Optional[str] = None,
+                  db=Depends(get_db)):
+    """
+    Lists components ordered by component_id, one page at a time.
+    Pass the returned `next_cursor` as `after` to fetch the next page.
+    """
+    return await list_components_page_async(db, limit=limit, after=after)
 
 @router.get("/get-component-status/{component_id}")
-def get_status(component_id: str):
-    component = db.components.find_one({"component_id": component_id})
+async def get_status(component_id: str, db=Depends(get_db)):
+    # Drop statuses other workers (or a bulk ingest) made stale before trusting the cache
+    await invalidation_feed.sync(db)
+    component = status_cache.get(component_id)
+    if component is not MISSING:
+        return component
+
+    # Latest reading, without the internal MongoDB ID
+    component = await get_latest_reading_async(db, component_id)
     
     if not component:
         raise HTTPException(status_code=404, detail="Component not found")
 
-    # Remove internal MongoDB ID for cleaner API response
-    component.pop("_id", None)
-
+    status_cache.set(component_id, component)
     return component
+
+@router.get("/get-component-status/{component_id}/history")
+async def get_history(component_id: str, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                      before: Optional[str] = None, db=Depends(get_db)):
+    """Readings of one component, newest first; pass `next_cursor` as `before` for older ones."""
+    return await get_reading_history_async(db, component_id, limit=limit, before=before)
@@ -0,0 +1,179 @@
+# api/serving.py
+"""
+Production entry point for the API: several uvicorn worker processes sharing one
+read-only copy of the failure model.
+
+Usage:
+    python -m api.serving --workers 4
+    gunicorn -c gunicorn.conf.py api.main:app    # the same under gunicorn's process manager
+
+Before any worker starts, `prepare_shared_model` exports a pickled sklearn
+pipeline once to a memory-mapped .npy scoring kernel (models/scoring_kernel.py)
+and points MODEL_PATH at it. Every worker then maps the same file from the page
+cache. Workers never unpickle the pipeline or import sklearn/scipy, which is
+most of a worker's memory. Per-worker startup and shutdown (model servers,
+MongoDB client, draining queued predictions) happen in api.main's lifespan.
+
+The master also runs `watch_model`, which re-exports the kernel whenever a new
+checkpoint is promoted to the pickle. The kernel is replaced atomically, and
+each worker's ModelServer reloads it when its modification time changes, so
+hot reload works as it does with a single process.
+
+`prepare_metrics_dir` gives the workers one PROMETHEUS_MULTIPROC_DIR, so a
+/metrics scrape answered by any worker reports the totals of all of them (see
+utils/metrics.py).
+
+State that is not shared between workers:
+- The sliding-window FeatureStore. A windowed model would only see the readings
+  of a component that reached the same worker, so windowed models are served by
+  a single worker: startup refuses workers > 1 for one, and a worker keeps its
+  previous model rather than hot-reloading into one (API_SERVING_WORKERS tells
+  the workers how many of them there are).
+- The status and recommendation caches. Recommendations are keyed by the
+  reading and cost model version, so a copy per worker only costs memory. An
+  ingest invalidates the status cache of the worker that handled it at once;
+  the others see the `ingested_at` stamp it leaves on components_latest within
+  STATUS_CACHE_SYNC_S (api.utils.cache.InvalidationFeed), as they do for
+  ingest_jsonl / upload_to_mongo.py.
+"""
+import argparse
+import os
+import tempfile
+import threading
+from typing import Optional
+
+from utils import config
+from utils.logger import logger
+from utils.metrics import clear_snapshots
+
+
+def default_workers() -> int:
+    return config.API_WORKERS or os.cpu_count() or 1
+
+
+def export_kernel(model_path: str, kernel_path: str) -> bool:
+    """
+    Exports `model_path` to `kernel_path` if the kernel is missing or older than
+    the pickle. Returns False for models that cannot be exported (not a scaler +
+    linear classifier).
+    """
+    if os.path.exists(kernel_path) and os.path.getmtime(kernel_path) >= os.path.getmtime(model_path):
+        return True
+    from models.scoring_kernel import checkpoint_version, export_scoring_kernel, load_model
+
+    try:
+        export_scoring_kernel(load_model(model_path), kernel_path, model_version=checkpoint_version(model_path))
+    except ValueError as e:
+        logger.warning("%s cannot be exported as a kernel: %s", model_path, e)
+        return False
+    logger.info("Exported %s to the shared scoring kernel %s", model_path, kernel_path)
+    return True
+
+
+def prepare_shared_model(model_path: Optional[str] = None, kernel_path: Optional[str] = None) -> str:
+    """
+    Returns the model path the workers should load, exporting the kernel if it
+    is missing or older than the pickle. Models that cannot be exported are
+    served as they are.
+    """
+    model_path = model_path or config.MODEL_PATH
+    kernel_path = kernel_path or config.SERVING_KERNEL_PATH
+    if model_path.endswith((".json", ".npy")):
+        return model_path
+
+    serving_path = kernel_path if export_kernel(model_path, kernel_path) else model_path
+
+    # Workers read it from the environment (spawned) or the already imported config (forked)
+    os.environ["MODEL_PATH"] = serving_path
+    config.MODEL_PATH = serving_path
+    return serving_path
+
+
+def watch_model(model_path: str, kernel_path: str, interval_s: Optional[float] = None,
+                stop: Optional[threading.Event] = None) -> threading.Thread:
+    """
+    Starts a daemon thread in the master that re-exports the kernel whenever
+    `model_path` changes. If a new checkpoint cannot be exported, the workers
+    keep serving the previous kernel.
+    """
+    interval_s = config.MODEL_RELOAD_INTERVAL_S if interval_s is None else interval_s
+    stop = stop or threading.Event()
+
+    def run():
+        exported_mtime = None
+        while not stop.wait(interval_s):
+            try:
+                mtime = os.path.getmtime(model_path)
+                if mtime != exported_mtime:
+                    export_kernel(model_path, kernel_path)
+                    exported_mtime = mtime
+            except Exception:
+                # Missing or half-written pickle: try again on the next tick
+                logger.exception("Failed to re-export %s", model_path)
+
+    thread = threading.Thread(target=run, name="kernel-exporter", daemon=True)
+    thread.start()
+    return thread
+
+
+def prepare_metrics_dir(workers: int):
+    """Points the workers at one (empty) metrics snapshot directory, so /metrics covers all of them."""
+    if workers <= 1 and not config.PROMETHEUS_MULTIPROC_DIR:
+        return
+    directory = config.PROMETHEUS_MULTIPROC_DIR or tempfile.mkdtemp(prefix="api-metrics-")
+    clear_snapshots(directory)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+    config.PROMETHEUS_MULTIPROC_DIR = directory
+
+
+def start_serving(workers: int) -> str:
+    """
+    Prepares the shared model and metrics and starts the kernel watcher; returns
+    the path workers load. Raises ValueError for a windowed model with workers > 1.
+    """
+    prepare_metrics_dir(workers)
+    model_path = config.MODEL_PATH
+    serving_path = prepare_shared_model(model_path)
+    if serving_path != model_path:
+        watch_model(model_path, serving_path)
+    os.environ["API_SERVING_WORKERS"] = str(workers)
+    config.API_SERVING_WORKERS = workers
+    if workers > 1:
+        from api.utils.model_server import check_single_worker
+        from models.scoring_kernel import load_model
+
+        # Fail here, with one message, rather than in every worker's startup
+        check_single_worker(load_model(serving_path))
+    return serving_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API with several worker processes")
+    parser.add_argument("--host", default=config.API_HOST)
+    parser.add_argument("--port", type=int, default=config.API_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--graceful-timeout", type=int, default=config.API_GRACEFUL_TIMEOUT_S,
+                        help="Seconds a stopping worker gets to finish in-flight requests")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    workers = args.workers or default_workers()
+    try:
+        model_path = start_serving(workers)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"🚀 Serving on {args.host}:{args.port} with {workers} workers (model: {model_path})")
+    uvicorn.run(
+        "api.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        proxy_headers=True,
+        log_level="info",
+    )
+
+
+if __name__ == "__main__":
+    main()
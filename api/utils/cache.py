@@ -0,0 +1,152 @@
+# api/utils/cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Set
+
+from database.queries import changed_components_async
+from utils import config
+
+# Returned by TTLCache.get on a miss (cached values may legitimately be None)
+MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire `ttl_s` seconds after being set.
+
+    Thread-safe, since sync routes run in FastAPI's threadpool. Keys are
+    either a component_id or a (component_id, ...) tuple so that
+    `invalidate_component` can drop everything derived from one component;
+    a component_id -> keys index keeps that proportional to the component's
+    own entries rather than the cache size.
+    """
+
+    def __init__(self, maxsize: int, ttl_s: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl_s
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._by_component: Dict[Hashable, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _component(key: Hashable) -> Hashable:
+        return key[0] if isinstance(key, tuple) and key else key
+
+    def _delete(self, key: Hashable):
+        # Caller holds the lock
+        del self._data[key]
+        component = self._component(key)
+        keys = self._by_component.get(component)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_component[component]
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    self._delete(key)
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            self._by_component.setdefault(self._component(key), set()).add(key)
+            while len(self._data) > self.maxsize:
+                self._delete(next(iter(self._data)))
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            if key in self._data:
+                self._delete(key)
+
+    def invalidate_component(self, component_id: str) -> int:
+        """Drops every entry keyed by `component_id` or by a tuple starting with it."""
+        with self._lock:
+            keys = self._by_component.pop(component_id, set())
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._by_component.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_s": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def payload_digest(payload: str) -> str:
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+# Process-wide caches (one per API worker)
+status_cache = TTLCache(config.STATUS_CACHE_SIZE, config.STATUS_CACHE_TTL_S)
+recommendation_cache = TTLCache(config.RECOMMENDATION_CACHE_SIZE, config.RECOMMENDATION_CACHE_TTL_S)
+
+
+def invalidate_component(component_id: str):
+    """Called when new readings for a component are ingested."""
+    status_cache.invalidate_component(component_id)
+    recommendation_cache.invalidate_component(component_id)
+
+
+class InvalidationFeed:
+    """
+    Drops cached entries of components another process ingested readings for.
+
+    Every write to components_latest stamps `ingested_at` (database.insert_data),
+    whether it came from another API worker or from ingest_jsonl. `sync` asks
+    for the components stamped since its previous poll, at most once every
+    `interval_s`, so a worker serves a stale status for about that long rather
+    than for the whole TTL. Polls overlap by `overlap_s`, so a write that
+    commits late or comes from a host with a slightly different clock is still
+    seen; invalidating a component twice is harmless.
+    """
+
+    def __init__(self, interval_s: float, overlap_s: float = 5.0, clock: Callable[[], float] = time.time):
+        self.interval = interval_s
+        self.overlap = overlap_s
+        self._clock = clock
+        self._since = clock() - overlap_s
+        self._next_poll = 0.0
+
+    async def sync(self, db) -> int:
+        """Polls if `interval_s` has passed; returns how many components were invalidated."""
+        now = self._clock()
+        if now < self._next_poll:
+            return 0
+        # Set before awaiting, so concurrent requests do not poll too
+        self._next_poll = now + self.interval
+        component_ids = await changed_components_async(db, self._since)
+        self._since = now - self.overlap
+        for component_id in component_ids:
+            invalidate_component(component_id)
+        return len(component_ids)
+
+
+invalidation_feed = InvalidationFeed(config.STATUS_CACHE_SYNC_S)
@@ -0,0 +1,7 @@
+# api/utils/db.py
+from fastapi import Request
+
+
+def get_db(request: Request):
+    """FastAPI dependency returning the AsyncDatabase created in the app lifespan."""
+    return request.app.state.db
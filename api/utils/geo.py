@@ -0,0 +1,104 @@
+# api/utils/geo.py
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+from fastapi import Request
+
+from api.utils.processor import cost_models, recommend_maintenance_batch
+from database.indexes import LATEST_COLLECTION
+from utils.logger import logger
+
+if TYPE_CHECKING:
+    from engine.cost_model import CostModel
+    from engine.geo_index import GridIndex
+
+# Fields of the latest-reading documents the dispatch index needs
+GEO_PROJECTION = {
+    "_id": 0, "component_id": 1, "vehicle_id": 1, "component_type": 1, "timestamp": 1, "location": 1,
+    "battery.temperature": 1, "battery.error_code": 1, "motor.vibration_level": 1,
+}
+ACTIONS = ("fix_now", "wait")
+
+
+def build_dispatch_indexes(docs: List[dict], cell_deg: float = 0.5,
+                           cost_model: Optional[CostModel] = None) -> Dict[str, GridIndex]:
+    """
+    Scores the latest reading of every component with the recommender and
+    returns one GridIndex over all of them ("any") plus one per recommended action.
+    """
+    import pandas as pd
+    from engine.geo_index import GridIndex
+
+    def field(doc, group, key):
+        return (doc.get(group) or {}).get(key)
+
+    frame = pd.DataFrame({
+        "component_id": [doc.get("component_id") for doc in docs],
+        "vehicle_id": [doc.get("vehicle_id") for doc in docs],
+        "timestamp": [str(doc.get("timestamp")) for doc in docs],
+        "latitude": np.array([field(doc, "location", "latitude") for doc in docs], dtype=float),
+        "longitude": np.array([field(doc, "location", "longitude") for doc in docs], dtype=float),
+        "battery.temperature": np.array([field(doc, "battery", "temperature") for doc in docs], dtype=float),
+        "motor.vibration_level": np.array([field(doc, "motor", "vibration_level") for doc in docs], dtype=float),
+        "battery.error_code": [field(doc, "battery", "error_code") for doc in docs],
+        "component_type": [doc.get("component_type") for doc in docs],
+    })
+    scored = recommend_maintenance_batch(frame, cost_model)
+    frame["failure_probability"] = scored["failure_probability"].to_numpy()
+    frame["recommended_action"] = scored["recommended_action"].to_numpy()
+
+    columns = ["component_id", "vehicle_id", "timestamp", "failure_probability", "recommended_action"]
+    indexes = {"any": GridIndex.from_frame(frame, "latitude", "longitude", columns, cell_deg)}
+    for action in ACTIONS:
+        subset = frame[frame["recommended_action"] == action]
+        indexes[action] = GridIndex.from_frame(subset, "latitude", "longitude", columns, cell_deg)
+    return indexes
+
+
+class DispatchIndex:
+    """
+    Spatial indexes over the latest reading per component, rebuilt from
+    MongoDB at most every `refresh_interval_s` seconds, or as soon as the
+    cost model changes. Concurrent requests during a rebuild wait for the
+    same build instead of starting their own.
+    """
+
+    def __init__(self, refresh_interval_s: float = 30, cell_deg: float = 0.5):
+        self.refresh_interval = refresh_interval_s
+        self.cell_deg = cell_deg
+        self.indexes: Optional[Dict[str, GridIndex]] = None
+        self.built_at: Optional[float] = None
+        self.cost_model_version: Optional[str] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def is_fresh(self, cost_model_version: Optional[str] = None) -> bool:
+        return (self.built_at is not None and time.monotonic() - self.built_at < self.refresh_interval
+                and cost_model_version in (None, self.cost_model_version))
+
+    def invalidate(self):
+        self.built_at = None
+
+    async def get(self, db, action: str = "any", cost_model: Optional[CostModel] = None) -> GridIndex:
+        cost_model = cost_model or cost_models.get()
+        if not self.is_fresh(cost_model.version):
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                if not self.is_fresh(cost_model.version):
+                    start = time.perf_counter()
+                    docs = await db[LATEST_COLLECTION].find({"location": {"$ne": None}}, GEO_PROJECTION).to_list(None)
+                    self.indexes = await asyncio.to_thread(build_dispatch_indexes, docs, self.cell_deg, cost_model)
+                    self.built_at = time.monotonic()
+                    self.cost_model_version = cost_model.version
+                    logger.info("Built dispatch index over %d components in %.2fs",
+                                len(self.indexes["any"]), time.perf_counter() - start)
+        return self.indexes[action]
+
+
+def get_dispatch_index(request: Request) -> DispatchIndex:
+    """FastAPI dependency returning the per-worker dispatch index."""
+    return request.app.state.dispatch_index
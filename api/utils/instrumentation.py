@@ -0,0 +1,123 @@
+# api/utils/instrumentation.py
+"""
+Request metrics for the API (exported at /metrics, see api/routes/monitoring.py).
+
+`MetricsMiddleware` times every request and counts it per route template
+(e.g. /get-component-status/get-component-status/{component_id}), so the
+label set stays bounded. The model servers record batch sizes and inference
+time, and database.mongo_connection records MongoDB command time. Cache hit
+and miss counts are read from the caches at scrape time.
+"""
+import time
+import weakref
+
+from starlette.routing import Mount
+
+from api.utils.cache import recommendation_cache, status_cache
+from utils.metrics import SIZE_BUCKETS, Counter, Gauge, Histogram
+
+REQUESTS = Counter("http_requests_total", "HTTP requests served", ["method", "route", "status"])
+REQUEST_ERRORS = Counter("http_request_errors_total", "Requests that raised or returned a 5xx", ["method", "route"])
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Time to produce the full response", ["method", "route"])
+IN_PROGRESS = Gauge("http_requests_in_progress", "Requests being served", ["method"])
+BATCH_ITEMS = Histogram("http_request_batch_items", "Items per batch request", ["route"], buckets=SIZE_BUCKETS)
+
+MODEL_BATCH_SIZE = Histogram("model_batch_size", "Rows per micro-batched predict call", ["model"],
+                             buckets=SIZE_BUCKETS)
+MODEL_INFERENCE_SECONDS = Histogram("model_inference_duration_seconds", "Time spent in one batched predict call",
+                                    ["model"])
+MODEL_RELOADS = Counter("model_reloads_total", "Model (re)loads from disk", ["model", "outcome"])
+
+CACHES = {"status": status_cache, "recommendation": recommendation_cache}
+
+
+def _cache_stat(field):
+    return lambda: {(name,): cache.stats()[field] for name, cache in CACHES.items()}
+
+
+CACHE_HITS = Counter("cache_hits_total", "Cache lookups that found a live entry", ["cache"],
+                     callback=_cache_stat("hits"))
+CACHE_MISSES = Counter("cache_misses_total", "Cache lookups that missed or found an expired entry", ["cache"],
+                       callback=_cache_stat("misses"))
+# A ratio does not add up across workers, so each worker reports its own (pid label)
+CACHE_HIT_RATIO = Gauge("cache_hit_ratio", "Hits / lookups since the worker started", ["cache"],
+                        callback=_cache_stat("hit_rate"), multiprocess_mode="all")
+CACHE_ENTRIES = Gauge("cache_entries", "Entries currently cached", ["cache"], callback=_cache_stat("size"))
+
+
+# app -> {id(route): [(prefix, full template)]}, built once per app on its first request
+_TEMPLATES: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _collect_templates(routes, prefix: str, templates: dict):
+    for route in routes:
+        include_context = getattr(route, "include_context", None)
+        if include_context is not None:
+            # Routers added with include_router keep their own routes, with paths relative to the prefix
+            _collect_templates(route.original_router.routes, prefix + include_context.prefix, templates)
+        elif isinstance(route, Mount):
+            _collect_templates(route.routes, prefix + route.path, templates)
+        elif getattr(route, "path", None) is not None:
+            templates.setdefault(id(route), []).append((prefix, prefix + route.path))
+
+
+def route_template(scope) -> str:
+    """
+    The matched route's full path template, router prefix included (e.g.
+    /get-component-status/get-component-status/{component_id}), or
+    "unmatched" (e.g. 404s), to keep label values bounded.
+    """
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        return "unmatched"
+    app = scope.get("app")
+    try:
+        templates = _TEMPLATES.get(app)
+        if templates is None:
+            templates = _TEMPLATES[app] = {}
+            _collect_templates(app.router.routes, "", templates)
+    except (AttributeError, TypeError):
+        return path
+    candidates = templates.get(id(route))
+    if not candidates:
+        return path
+    # A router included under several prefixes: the longest prefix the request path falls under
+    matching = [c for c in candidates if scope.get("path", "").startswith(c[0])] or candidates
+    return max(matching, key=lambda c: len(c[0]))[1]
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: counts and times every HTTP request by method, route and status."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        IN_PROGRESS.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            status["code"] = 500
+            raise
+        finally:
+            # The router fills scope["route"] in place while handling the request
+            route = route_template(scope)
+            REQUEST_SECONDS.observe(time.perf_counter() - start, method=method, route=route)
+            REQUESTS.inc(method=method, route=route, status=str(status["code"]))
+            if status["code"] >= 500:
+                REQUEST_ERRORS.inc(method=method, route=route)
+            IN_PROGRESS.dec(method=method)
@@ -0,0 +1,231 @@
+# api/utils/model_server.py
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException, Request
+
+from api.utils.instrumentation import MODEL_BATCH_SIZE, MODEL_INFERENCE_SECONDS, MODEL_RELOADS
+from models.bayesian_failure import BayesianFailureModel
+from models.feature_store import FeatureStore
+from models.scoring_kernel import ScoringKernel, load_model
+from utils import config
+from utils.logger import logger
+
+# Feature order used by models.failure_predictor when the model was trained
+DEFAULT_FEATURES = ["battery.temperature", "motor.vibration_level", "error_flag"]
+
+
+def check_single_worker(model):
+    """
+    Sliding-window features live in each worker's FeatureStore, so a windowed
+    model served by several workers would score a component against whichever
+    part of its history reached that worker. Refuse instead.
+    """
+    window = getattr(model, "feature_window_", None) or getattr(model, "feature_window", None)
+    if window and config.API_SERVING_WORKERS > 1:
+        raise ValueError(f"The model uses {window}-reading window features, which need a single API worker "
+                         f"(running {config.API_SERVING_WORKERS}); serve it with --workers 1")
+
+
+class ModelServer:
+    """
+    Serves the trained failure model from a single in-memory copy.
+
+    Concurrent `predict` calls are queued and answered in micro-batches: the
+    batcher waits at most `batch_window_ms` (or until `max_batch_size` rows are
+    queued) and then makes one `predict_proba` call for the whole batch. The
+    pickle is reloaded when its modification time changes.
+    """
+    # `model` label of the batch size / inference time metrics
+    metrics_label = "failure"
+
+    def __init__(self, model_path: str, batch_window_ms: float = 5, max_batch_size: int = 256,
+                 reload_interval_s: float = 2):
+        self.model_path = model_path
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.reload_interval = reload_interval_s
+
+        self.model = None
+        self.feature_names: List[str] = DEFAULT_FEATURES
+        self._mtime: Optional[float] = None
+        self._last_reload_check = 0.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ----------------------------
+    # Model loading
+    # ----------------------------
+    def load(self):
+        mtime = os.path.getmtime(self.model_path)
+        model = load_model(self.model_path)
+        check_single_worker(model)
+        self.model = model
+        self.feature_names = list(getattr(model, "feature_names_in_", DEFAULT_FEATURES))
+        self._mtime = mtime
+        MODEL_RELOADS.inc(model=self.metrics_label, outcome="ok")
+        logger.info("Loaded failure model from %s", self.model_path)
+
+    def maybe_reload(self):
+        """Reloads the model if the pickle changed on disk (checked at most every reload_interval)."""
+        now = time.monotonic()
+        if now - self._last_reload_check < self.reload_interval:
+            return
+        self._last_reload_check = now
+        try:
+            mtime = os.path.getmtime(self.model_path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            try:
+                self.load()
+            except Exception:
+                # Keep serving the previous model if the new file is half-written or broken
+                MODEL_RELOADS.inc(model=self.metrics_label, outcome="error")
+                logger.exception("Failed to reload failure model, keeping previous version")
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.model is not None
+
+    # ----------------------------
+    # Batching
+    # ----------------------------
+    async def start(self):
+        if self.model is None:
+            self.load()
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._batch_loop())
+
+    async def stop(self):
+        """Stops the batcher, then answers anything still queued so no request is left hanging."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._queue is None:
+            return
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        pending = [(features, future) for features, future in pending if not future.done()]
+        if pending:
+            try:
+                results = self.predict_batch([features for features, _ in pending])
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+            else:
+                for (_, future), result in zip(pending, results):
+                    future.set_result(result)
+
+    async def predict(self, features: Dict[str, float]) -> float:
+        """Queues one feature row and waits for its failure probability."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((features, future))
+        return await future
+
+    def predict_batch(self, rows: List[Dict[str, float]]) -> List[float]:
+        """Scores a list of feature rows with one predict_proba call."""
+        self.maybe_reload()
+        if isinstance(self.model, ScoringKernel):
+            X = np.array([[row[name] for name in self.feature_names] for row in rows], dtype=float)
+        else:
+            # sklearn pipelines check feature names, so they get a frame; a kernel never needs pandas
+            import pandas as pd
+
+            X = pd.DataFrame.from_records(rows, columns=self.feature_names)
+        return self.model.predict_proba(X)[:, 1].tolist()
+
+    def _predict_batch_timed(self, rows):
+        with MODEL_INFERENCE_SECONDS.time(model=self.metrics_label):
+            return self.predict_batch(rows)
+
+    async def _collect_batch(self, batch: List[Tuple[Dict[str, float], asyncio.Future]]):
+        # Fills `batch` in place, so the rows already taken are known if the loop is cancelled
+        batch.append(await self._queue.get())
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+    async def _batch_loop(self):
+        while True:
+            batch = []
+            try:
+                await self._collect_batch(batch)
+                rows = [features for features, _ in batch]
+                MODEL_BATCH_SIZE.observe(len(rows), model=self.metrics_label)
+                results = await asyncio.to_thread(self._predict_batch_timed, rows)
+            except asyncio.CancelledError:
+                # Hand the rows back for stop() to answer
+                for item in batch:
+                    self._queue.put_nowait(item)
+                raise
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+class BayesianModelServer(ModelServer):
+    """
+    Micro-batched posterior predictive of the Bayesian failure model
+    (models/bayesian_failure.py): every request gets the posterior mean
+    failure probability and its credible interval, from one matrix multiply
+    per batch over the stored posterior draws.
+    """
+    metrics_label = "bayesian"
+
+    def __init__(self, model_path: str, credible_level: float = 0.9, **kwargs):
+        super().__init__(model_path, **kwargs)
+        self.credible_level = credible_level
+
+    def load(self):
+        mtime = os.path.getmtime(self.model_path)
+        model = BayesianFailureModel.load(self.model_path)
+        check_single_worker(model)
+        self.model = model
+        self.feature_names = self.model.feature_names
+        self._mtime = mtime
+        MODEL_RELOADS.inc(model=self.metrics_label, outcome="ok")
+        logger.info("Loaded %d posterior draws from %s", self.model.n_draws, self.model_path)
+
+    def predict_batch(self, rows: List[Dict[str, float]]) -> List[Dict[str, float]]:
+        self.maybe_reload()
+        X = np.array([[row[name] for name in self.feature_names] for row in rows], dtype=float)
+        intervals = self.model.intervals(X, self.credible_level)
+        return [dict(zip(intervals, values)) for values in zip(*(v.tolist() for v in intervals.values()))]
+
+
+def get_model_server(request: Request) -> ModelServer:
+    """FastAPI dependency returning the model server created at startup."""
+    return request.app.state.model_server
+
+
+def get_bayes_server(request: Request) -> BayesianModelServer:
+    """FastAPI dependency returning the Bayesian model server, or 503 when no posterior was fit."""
+    server = request.app.state.bayes_server
+    if server is None:
+        raise HTTPException(status_code=503, detail="Bayesian failure model not available")
+    return server
+
+
+def get_feature_store(request: Request) -> FeatureStore:
+    """FastAPI dependency returning the per-worker sliding-window feature store."""
+    return request.app.state.feature_store
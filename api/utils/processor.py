@@ -1,38 +1,103 @@
-import pandas as pd
-from typing import Dict
+from __future__ import annotations
+
+import numpy as np
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from api.models.schemas import SensorInput, MaintenanceDecision
-from api.models.schemas import SensorInput
+from engine.cost_model import CostModel, CostModelStore, format_cost
+from models.feature_store import FeatureStore, reading_features
+from utils import config
+
+# Only the batch recommender needs pandas; it is imported there so single-reading routes never load it
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Cost model used by the heuristic recommender, reloaded per worker when the file changes.
+# Its version is part of the recommendation cache key and of every decision.
+cost_models = CostModelStore(config.COST_MODEL_PATH, reload_interval_s=config.COST_MODEL_RELOAD_S)
 
-def predict_failure(sensor_data):
+# Flat (json_normalize-style) columns the batch recommender needs
+BATCH_STRING_COLUMNS = ["component_id", "vehicle_id", "battery.error_code"]
+BATCH_NUMERIC_COLUMNS = ["battery.temperature", "motor.vibration_level"]
+# Optional columns that select per-component-type costs
+BATCH_OPTIONAL_COLUMNS = ["component_type"]
+
+def windowed_store(server, feature_store: Optional[FeatureStore]) -> Optional[FeatureStore]:
+    """The feature store, if the server's model was trained on window features; otherwise None."""
+    model = getattr(server, "model", None)
+    if getattr(model, "feature_window_", None) or getattr(model, "feature_window", None):
+        return feature_store
+    return None
+
+def failure_features(sensor_data: SensorInput, feature_store: Optional[FeatureStore] = None) -> Dict[str, float]:
+    """
+    Builds the feature row the failure model was trained on (see models/failure_predictor.py).
+
+    With a feature store, the reading is added to its component's window and the
+    window features are included; the model server picks the columns its model needs.
+    A reading the store has already seen (same or older timestamp) is not added twice.
+    """
+    features = {
+        "battery.temperature": sensor_data.battery.temperature,
+        "motor.vibration_level": sensor_data.motor.vibration_level,
+        "error_flag": 1 if sensor_data.battery.error_code != "OK" else 0,
+    }
+    if feature_store is not None:
+        signals = {
+            "battery.temperature": sensor_data.battery.temperature,
+            "battery.voltage": sensor_data.battery.voltage,
+            "motor.vibration_level": sensor_data.motor.vibration_level,
+            "motor.torque": sensor_data.motor.torque,
+            "brake_system.brake_pad_thickness": sensor_data.brake_system.brake_pad_thickness,
+            "brake_system.temperature": sensor_data.brake_system.temperature,
+        }
+        features.update(feature_store.update(sensor_data.component_id,
+                                             [signals[signal] for signal in feature_store.signals],
+                                             timestamp=datetime.fromisoformat(sensor_data.timestamp)))
+        features.update(reading_features(sensor_data.battery.error_code, sensor_data.component_age_days,
+                                         sensor_data.timestamp, sensor_data.last_service_date))
+    return features
+
+async def predict_failure(sensor_data: SensorInput, model_server, feature_store: Optional[FeatureStore] = None):
     """
     Process incoming sensor data and return a prediction result.
 
     Args:
         sensor_data (SensorInput): Incoming validated sensor data.
+        model_server (ModelServer): Shared, micro-batching model server.
+        feature_store (FeatureStore): Per-worker sliding-window features, if any.
 
     Returns:
-        dict: Prediction with failure probability and recommendation.
+        dict: Prediction with failure probability.
     """
-    # Dummy logic for now – replace with your ML model
-    prob = 0.8 if sensor_data.error_flag else 0.2
-    recommended_action = "fix_now" if prob >= 0.6 else "wait"
-    
-    expected_cost_fix = 1000
-    expected_cost_wait = int(prob * 5000)
+    prob = await model_server.predict(failure_features(sensor_data, windowed_store(model_server, feature_store)))
 
     return {
         "component_id": sensor_data.component_id,
-        "vehicle_id": getattr(sensor_data, "vehicle_id", "VH-1234"),
+        "vehicle_id": sensor_data.vehicle_id,
         "failure_probability": prob,
-        "recommended_action": recommended_action,
-        "expected_cost_fix": expected_cost_fix,
-        "expected_cost_wait": expected_cost_wait,
-        "explanation": f"Expected cost: {expected_cost_wait} > {expected_cost_fix}"
+    }
+
+async def predict_failure_interval(sensor_data: SensorInput, bayes_server,
+                                   feature_store: Optional[FeatureStore] = None):
+    """
+    Posterior mean failure probability plus its credible interval
+    from the Bayesian model server.
+    """
+    posterior = await bayes_server.predict(failure_features(sensor_data, windowed_store(bayes_server, feature_store)))
+
+    return {
+        "component_id": sensor_data.component_id,
+        "vehicle_id": sensor_data.vehicle_id,
+        **posterior,
+        "credible_level": bayes_server.credible_level,
     }
 
 # api/utils/processor.py
 
-def recommend_maintenance(sensor_data: SensorInput):
+def recommend_maintenance(sensor_data: SensorInput, cost_model: Optional[CostModel] = None):
+    cost_model = cost_model or cost_models.get()
+
     # Extract relevant fields
     battery_temp = sensor_data.battery.temperature
     motor_vibration = sensor_data.motor.vibration_level
@@ -46,20 +111,131 @@ def recommend_maintenance(sensor_data: SensorInput):
     else:
         failure_probability = 0.1
 
-    # Use your cost model here (example)
-    cost_failure = 5000
-    cost_fix = 1000
-    threshold = 0.6
+    cost_failure, cost_fix = cost_model.costs_for(sensor_data.vehicle_id, sensor_data.component_type)
+    threshold = cost_model.threshold
 
     expected_failure_cost = failure_probability * cost_failure
     recommended_action = "fix_now" if expected_failure_cost > cost_fix or failure_probability >= threshold else "wait"
-    explanation = f"Expected failure cost {expected_failure_cost:.2f} vs fix cost {cost_fix}"
+    explanation = f"Expected failure cost {expected_failure_cost:.2f} vs fix cost {format_cost(cost_fix)}"
 
     return {
         "component_id": sensor_data.component_id,
         "vehicle_id": sensor_data.vehicle_id,
         "failure_probability": failure_probability,
         "recommended_action": recommended_action,
-        "explanation": explanation
+        "explanation": explanation,
+        "cost_model_version": cost_model.version,
     }
 
+def sensor_inputs_to_frame(items: List[SensorInput]) -> pd.DataFrame:
+    """
+    Flattens validated SensorInput objects into the columns used by the batch recommender.
+    """
+    import pandas as pd
+
+    return pd.DataFrame({
+        "component_id": [item.component_id for item in items],
+        "vehicle_id": [item.vehicle_id for item in items],
+        "battery.temperature": np.fromiter((item.battery.temperature for item in items), dtype=float, count=len(items)),
+        "motor.vibration_level": np.fromiter((item.motor.vibration_level for item in items), dtype=float, count=len(items)),
+        "battery.error_code": [item.battery.error_code for item in items],
+        "component_type": [item.component_type for item in items],
+    })
+
+def _column_error(col: str, value, numeric: bool) -> dict:
+    """One problem with one cell, shaped like the pydantic errors of the list-of-objects payload."""
+    loc = tuple(col.split("."))
+    if numeric and isinstance(value, str):
+        return {"type": "float_parsing", "loc": loc,
+                "msg": "Input should be a valid number, unable to parse string as a number", "input": value}
+    if numeric:
+        return {"type": "float_type", "loc": loc, "msg": "Input should be a valid number", "input": value}
+    return {"type": "string_type", "loc": loc, "msg": "Input should be a valid string", "input": value}
+
+def validate_columnar_batch(columns: Dict[str, list]) -> Tuple[pd.DataFrame, Dict[int, List[dict]]]:
+    """
+    Checks a columnar payload and returns (frame, errors).
+
+    Every cell is checked against the SensorInput field it maps to: numbers for
+    the numeric columns, strings for the string columns (or null for optional
+    ones). `errors` maps a row index to its problems, in the same shape as the
+    list payload's validation errors; those rows are still present in `frame`
+    (with None in the bad cells) and must be skipped by the caller.
+    """
+    import pandas as pd
+
+    missing = [col for col in BATCH_STRING_COLUMNS + BATCH_NUMERIC_COLUMNS if col not in columns]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+
+    present = BATCH_STRING_COLUMNS + BATCH_NUMERIC_COLUMNS + [col for col in BATCH_OPTIONAL_COLUMNS if col in columns]
+    if len({len(columns[col]) for col in present}) > 1:
+        raise ValueError("All columns must have the same length")
+
+    frame = pd.DataFrame({col: pd.Series(columns[col], dtype=object) for col in present})
+    invalid = {}
+    for col in BATCH_NUMERIC_COLUMNS:
+        raw = frame[col]
+        frame[col] = pd.to_numeric(raw, errors="coerce")
+        invalid[col] = frame[col].isna().to_numpy()
+    for col in present:
+        if col in BATCH_NUMERIC_COLUMNS:
+            continue
+        optional = col in BATCH_OPTIONAL_COLUMNS
+        is_str = np.fromiter((isinstance(v, str) or (optional and v is None) for v in columns[col]),
+                             dtype=bool, count=len(frame))
+        invalid[col] = ~is_str
+        frame[col] = frame[col].where(is_str, None)
+
+    errors = {}
+    bad_rows = np.flatnonzero(np.logical_or.reduce(list(invalid.values())))
+    for idx in bad_rows:
+        errors[int(idx)] = [_column_error(col, columns[col][idx], col in BATCH_NUMERIC_COLUMNS)
+                            for col, mask in invalid.items() if mask[idx]]
+    return frame, errors
+
+def recommend_maintenance_batch(sensor_df: pd.DataFrame, cost_model: Optional[CostModel] = None) -> pd.DataFrame:
+    """
+    Vectorized version of `recommend_maintenance` over a flat sensor frame.
+    Rows come back in the same order as the input.
+    """
+    import pandas as pd
+
+    cost_model = cost_model or cost_models.get()
+    columns = ["component_id", "vehicle_id", "failure_probability", "recommended_action", "explanation",
+               "cost_model_version"]
+    if len(sensor_df) == 0:
+        return pd.DataFrame(columns=columns)
+
+    battery_temp = sensor_df["battery.temperature"].to_numpy(dtype=float)
+    motor_vibration = sensor_df["motor.vibration_level"].to_numpy(dtype=float)
+    error_flag = sensor_df["battery.error_code"].to_numpy() != "OK"
+
+    at_risk = (battery_temp > 85) | (motor_vibration > 1.0) | error_flag
+    failure_probability = np.where(at_risk, 0.9, 0.1)
+
+    cost_failure, cost_fix = cost_model.lookup(
+        sensor_df["vehicle_id"].to_numpy(),
+        sensor_df["component_type"].to_numpy() if "component_type" in sensor_df.columns else None,
+        size=len(sensor_df),
+    )
+    expected_failure_cost = failure_probability * cost_failure
+    fix_now = (expected_failure_cost > cost_fix) | (failure_probability >= cost_model.threshold)
+    # Few distinct fix costs, so each is formatted once
+    fix_costs, inverse = np.unique(cost_fix, return_inverse=True)
+    fix_cost_labels = np.array([f" vs fix cost {format_cost(cost)}" for cost in fix_costs], dtype=object)
+    # Object arrays throughout: pandas 3 would infer `str` for the formatted costs, which cannot be added to object
+    explanation = (
+        "Expected failure cost "
+        + np.char.mod("%.2f", expected_failure_cost).astype(object)
+        + fix_cost_labels[inverse.reshape(-1)]
+    )
+
+    return pd.DataFrame({
+        "component_id": sensor_df["component_id"].to_numpy(),
+        "vehicle_id": sensor_df["vehicle_id"].to_numpy(),
+        "failure_probability": failure_probability,
+        "recommended_action": np.where(fix_now, "fix_now", "wait"),
+        "explanation": explanation,
+        "cost_model_version": np.full(len(sensor_df), cost_model.version, dtype=object),
+    }, columns=columns)
@@ -0,0 +1,201 @@
+# benchmarks/cases.py
+"""
+The benchmarks: simulator, JSONL ingest, training, scoring, decision engine
+and the API routes (through an in-process TestClient, no server or MongoDB).
+
+Per-reading Python paths (generate_component_data, single-request API calls)
+stop at 100k / 1k items; the vectorized paths run at all of SIZES.
+"""
+import random
+import tempfile
+import time
+from contextlib import asynccontextmanager
+
+from benchmarks.datasets import SEED, SIZES, synthetic_jsonl, synthetic_readings, synthetic_records
+from benchmarks.harness import benchmark
+
+COSTS = {"cost_failure": 5000, "early_fix_cost": 1000}
+TRAINING_ROWS = 10_000
+
+
+def _trained_model(model_dir: str):
+    from models.failure_predictor import train_failure_model
+
+    return train_failure_model(synthetic_readings(TRAINING_ROWS), model_path=f"{model_dir}/failure_predictor.pkl")
+
+
+# ----------------------------
+# Simulator
+# ----------------------------
+@benchmark("simulator.generate_component_data", sizes=SIZES[:2])
+def generate_component_data(n):
+    from faker import Faker
+    from simulation.simulator import generate_component_data
+
+    def run():
+        random.seed(SEED)
+        Faker.seed(SEED)
+        for i in range(n):
+            generate_component_data(f"C-{i}")
+        return n
+    return run
+
+
+@benchmark("simulator.generate_fleet", sizes=SIZES)
+def generate_fleet(n):
+    import numpy as np
+    from simulation.simulator import generate_fleet_batch
+    from benchmarks.datasets import START_TIME
+
+    return lambda: len(generate_fleet_batch(n, np.random.default_rng(SEED), START_TIME))
+
+
+# ----------------------------
+# Ingest
+# ----------------------------
+@benchmark("ingest.load_sensor_data", sizes=SIZES)
+def load_jsonl(n):
+    from utils.sensor_reader import load_sensor_data
+
+    path = synthetic_jsonl(n)
+    return lambda: len(load_sensor_data(path))
+
+
+# ----------------------------
+# Model
+# ----------------------------
+@benchmark("model.train_failure_model", sizes=SIZES)
+def train(n):
+    from models.failure_predictor import train_failure_model
+
+    readings = synthetic_readings(n)
+    model_dir = tempfile.mkdtemp(prefix="bench-model-")
+
+    def run():
+        train_failure_model(readings, model_path=f"{model_dir}/failure_predictor.pkl")
+        return n
+    return run
+
+
+@benchmark("model.predict_failure_probabilities", sizes=SIZES)
+def predict(n):
+    from models.failure_predictor import predict_failure_probabilities
+
+    model = _trained_model(tempfile.mkdtemp(prefix="bench-model-"))
+    readings = synthetic_readings(n)
+    return lambda: len(predict_failure_probabilities(model, readings))
+
+
+# ----------------------------
+# Decision engine
+# ----------------------------
+@benchmark("decision_engine.apply_decision_engine", sizes=SIZES)
+def decide(n):
+    from engine.decision_engine import apply_decision_engine
+    from models.failure_predictor import predict_failure_probabilities
+
+    model = _trained_model(tempfile.mkdtemp(prefix="bench-model-"))
+    predicted = predict_failure_probabilities(model, synthetic_readings(n))
+    return lambda: len(apply_decision_engine(predicted, COSTS))
+
+
+@benchmark("what_if.grid", sizes=SIZES)
+def what_if_grid(n):
+    import numpy as np
+
+    from engine.what_if import WhatIfSweep
+
+    sweep = WhatIfSweep(np.random.default_rng(SEED).random(n))
+    thresholds, failure_costs, fix_costs = np.linspace(0, 1, 21), np.linspace(500, 10_000, 20), [500, 1000, 2000]
+    # The sort happens once per upload, outside the timed call; each grid spans all n readings
+    def run():
+        sweep.grid(thresholds, failure_costs, fix_costs)
+        return n
+
+    return run
+
+
+# ----------------------------
+# API
+# ----------------------------
+class ApiRun:
+    """Sends `requests` through a TestClient; returns per-request latencies. `close` ends the app lifespan."""
+
+    def __init__(self, client, requests):
+        self.client = client
+        self.requests = requests
+        client.__enter__()
+
+    def __call__(self):
+        latencies = []
+        for path, payload in self.requests:
+            start = time.perf_counter()
+            response = self.client.post(path, json=payload)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+        return latencies
+
+    def close(self):
+        self.client.__exit__(None, None, None)
+
+
+def _api_client():
+    """The prediction and recommendation routers with the model server api.main would start."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from api.routes import predict, recommend
+    from api.utils.model_server import ModelServer
+    from models.feature_store import FeatureStore
+    from utils import config
+
+    model_dir = tempfile.mkdtemp(prefix="bench-model-")
+    _trained_model(model_dir)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        app.state.model_server = ModelServer(f"{model_dir}/failure_predictor.pkl",
+                                             batch_window_ms=config.MODEL_BATCH_WINDOW_MS,
+                                             max_batch_size=config.MODEL_MAX_BATCH_SIZE)
+        await app.state.model_server.start()
+        app.state.feature_store = FeatureStore(window=config.FEATURE_WINDOW)
+        app.state.bayes_server = None
+        yield
+        await app.state.model_server.stop()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(predict.router, prefix="/predict-failure")
+    app.include_router(recommend.router, prefix="/recommend-maintenance")
+    return TestClient(app)
+
+
+@benchmark("api.predict_failure", sizes=SIZES[:1])
+def api_predict(n):
+    records = synthetic_records(n)
+    return ApiRun(_api_client(), [("/predict-failure/", record) for record in records])
+
+
+@benchmark("api.recommend_maintenance", sizes=SIZES[:1])
+def api_recommend(n):
+    from api.utils.cache import recommendation_cache
+
+    records = synthetic_records(n)
+    run = ApiRun(_api_client(), [("/recommend-maintenance", record) for record in records])
+
+    def uncached():
+        # Time the scoring path, not cache hits from the previous repeat
+        recommendation_cache.clear()
+        return run()
+    uncached.close = run.close
+    return uncached
+
+
+@benchmark("api.recommend_batch", sizes=SIZES[:2], repeat=3)
+def api_recommend_batch(n):
+    # One request carrying all n readings; throughput is readings per second
+    run = ApiRun(_api_client(), [("/recommend-maintenance/batch", synthetic_records(n))])
+
+    def batch():
+        run()
+        return n
+    batch.close = run.close
+    return batch
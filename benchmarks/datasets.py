@@ -0,0 +1,45 @@
+# benchmarks/datasets.py
+"""
+Reproducible synthetic datasets for the benchmarks.
+
+Readings come from the vectorized fleet generator with a fixed seed and
+start time, so the same size always gives the same rows. JSONL copies are
+written once to benchmarks/.data/ and reused by later runs.
+"""
+import functools
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from simulation.simulator import generate_fleet, write_jsonl
+
+SIZES = (1_000, 100_000, 1_000_000)
+SEED = 42
+START_TIME = datetime(2025, 1, 1)
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data")
+
+
+@functools.lru_cache(maxsize=4)
+def synthetic_readings(n_rows: int, seed: int = SEED) -> pd.DataFrame:
+    """`n_rows` flat readings (utils.sensor_reader.SENSOR_SCHEMA columns). Cached: treat as read-only."""
+    return pd.concat(list(generate_fleet(n_rows, seed=seed, start_time=START_TIME)), ignore_index=True)
+
+
+def synthetic_jsonl(n_rows: int, seed: int = SEED) -> str:
+    """Path of a JSONL file holding `synthetic_readings(n_rows, seed)`, written on first use."""
+    path = os.path.join(DATA_DIR, f"readings-{n_rows}-seed{seed}.jsonl")
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        with open(f"{path}.tmp", "wb") as f:
+            for batch in generate_fleet(n_rows, seed=seed, start_time=START_TIME):
+                write_jsonl(batch, f)
+        os.replace(f"{path}.tmp", path)
+    return path
+
+
+def synthetic_records(n_rows: int, seed: int = SEED) -> list:
+    """The readings as nested SensorInput-shaped dicts, the way API clients send them."""
+    from simulation.simulator import frame_to_records
+
+    return list(frame_to_records(synthetic_readings(n_rows, seed)))
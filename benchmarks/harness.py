@@ -0,0 +1,188 @@
+# benchmarks/harness.py
+"""
+A small asv-style benchmark harness.
+
+A benchmark is a setup function registered with `@benchmark`. It receives
+the dataset size and returns the callable to time (with an optional `close`
+for cleanup). That callable returns how many items it processed, or a list
+of per-item latencies in seconds:
+
+    @benchmark("decision_engine.apply", sizes=SIZES)
+    def apply(n):
+        frame = ...                       # setup, not timed
+        return lambda: len(apply_decision_engine(frame, COSTS))
+
+Each (benchmark, size) pair is run `repeat` times after one warmup call. The
+result records wall time (min / median), throughput, latency percentiles
+when the callable reports them, and peak traced memory. Peak memory comes
+from one extra tracemalloc run, so tracing does not slow the timed runs.
+tracemalloc sees Python and NumPy allocations but not Arrow buffers.
+
+Results are saved as JSON and can be compared against a baseline file
+(see benchmarks/run.py).
+"""
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[int], Callable[[], object]]
+    sizes: Sequence[int]
+    repeat: int = 3
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    size: int
+    repeat: int
+    items: int
+    min_s: float
+    median_s: float
+    runs_s: List[float] = field(default_factory=list)
+    peak_memory_mb: Optional[float] = None
+    latency_ms: Optional[Dict[str, float]] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.size}]"
+
+    @property
+    def items_per_s(self) -> float:
+        return self.items / self.median_s if self.median_s else 0.0
+
+
+REGISTRY: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, sizes: Sequence[int], repeat: int = 3):
+    """Registers a setup function as benchmark `name`."""
+    def register(setup):
+        REGISTRY[name] = Benchmark(name, setup, tuple(sizes), repeat)
+        return setup
+    return register
+
+
+def _call(run) -> tuple:
+    start = time.perf_counter()
+    outcome = run()
+    elapsed = time.perf_counter() - start
+    return elapsed, outcome
+
+
+def run_benchmark(bench: Benchmark, size: int, repeat: Optional[int] = None,
+                  trace_memory: bool = True) -> BenchmarkResult:
+    repeat = repeat or bench.repeat
+    run = bench.setup(size)
+    try:
+        _call(run)  # warmup: imports, caches, first-call allocations
+
+        runs, latencies, items = [], [], size
+        for _ in range(repeat):
+            gc.collect()
+            elapsed, outcome = _call(run)
+            runs.append(elapsed)
+            if isinstance(outcome, list):
+                latencies.extend(outcome)
+                items = len(outcome)
+            elif isinstance(outcome, int):
+                items = outcome
+
+        peak = None
+        if trace_memory:
+            gc.collect()
+            tracemalloc.start()
+            try:
+                run()
+                peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            finally:
+                tracemalloc.stop()
+    finally:
+        # Setups that hold resources (e.g. an app lifespan) expose close()
+        close = getattr(run, "close", None)
+        if close is not None:
+            close()
+
+    latency_ms = None
+    if latencies:
+        p50, p95, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+        latency_ms = {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+    return BenchmarkResult(bench.name, size, repeat, items, min(runs), statistics.median(runs), runs,
+                           peak, latency_ms)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        completed = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def environment() -> dict:
+    import pandas as pd
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def save_results(results: List[BenchmarkResult], path: str) -> dict:
+    report = {
+        "environment": environment(),
+        "results": [{**asdict(r), "key": r.key, "items_per_s": r.items_per_s} for r in results],
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(report, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+    return report
+
+
+def load_results(path: str) -> Dict[str, dict]:
+    """{benchmark key: result} of a saved report."""
+    with open(path) as f:
+        report = json.load(f)
+    return {r["key"]: r for r in report["results"]}
+
+
+def compare(current: Dict[str, dict], baseline: Dict[str, dict], tolerance: float = 0.2) -> List[dict]:
+    """
+    One row per benchmark present in both reports. `ratio` is current / baseline
+    median time; a row is a regression when it is slower than 1 + tolerance.
+    """
+    rows = []
+    for key, result in current.items():
+        base = baseline.get(key)
+        if base is None or not base["median_s"]:
+            continue
+        ratio = result["median_s"] / base["median_s"]
+        rows.append({
+            "key": key,
+            "baseline_s": base["median_s"],
+            "current_s": result["median_s"],
+            "ratio": ratio,
+            "regression": ratio > 1 + tolerance,
+        })
+    return rows
@@ -0,0 +1,84 @@
+# benchmarks/run.py
+"""
+Runs the benchmark suite (benchmarks/cases.py) and saves the results as JSON.
+
+Usage:
+    python -m benchmarks.run                              # everything, 1k / 100k / 1M rows
+    python -m benchmarks.run --max-size 100000 -k model.  # quick run of the model benchmarks
+    python -m benchmarks.run --baseline benchmarks/results/main.json
+
+With --baseline, every benchmark is compared against the baseline's median
+time and the exit status is 1 if any is slower by more than --tolerance.
+"""
+import argparse
+import fnmatch
+import logging
+import os
+import sys
+from datetime import datetime
+
+from benchmarks import cases  # noqa: F401  (registers the benchmarks)
+from benchmarks.harness import REGISTRY, compare, load_results, run_benchmark, save_results
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def select(patterns=None, sizes=None, max_size=None):
+    """[(benchmark, size)] matching any of the name patterns (substring or glob)."""
+    selected = []
+    for name, bench in REGISTRY.items():
+        if patterns and not any(p in name or fnmatch.fnmatch(name, p) for p in patterns):
+            continue
+        for size in sizes or bench.sizes:
+            if max_size is None or size <= max_size:
+                selected.append((bench, size))
+    return selected
+
+
+def _format_result(r) -> str:
+    line = f"{r.key:<48} {r.median_s * 1000:10.1f} ms {r.items_per_s:14,.0f} items/s"
+    if r.peak_memory_mb is not None:
+        line += f" {r.peak_memory_mb:9.1f} MB"
+    if r.latency_ms:
+        line += f"  p50 {r.latency_ms['p50']:.2f} ms  p99 {r.latency_ms['p99']:.2f} ms"
+    return line
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the performance benchmarks")
+    parser.add_argument("-k", "--bench", action="append", help="Only run benchmarks matching this name (repeatable)")
+    parser.add_argument("--sizes", type=int, nargs="+", help="Dataset sizes to run instead of each benchmark's own")
+    parser.add_argument("--max-size", type=int, default=None, help="Skip sizes above this")
+    parser.add_argument("--repeat", type=int, default=None, help="Timed runs per benchmark (default: per benchmark)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory run")
+    parser.add_argument("--output", default=None, help="Results JSON (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", default=None, help="Results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs the baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    # Training logs a classification report per run
+    logging.disable(logging.INFO)
+
+    results = []
+    for bench, size in select(args.bench, args.sizes, args.max_size):
+        result = run_benchmark(bench, size, repeat=args.repeat, trace_memory=not args.no_memory)
+        print(_format_result(result), flush=True)
+        results.append(result)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    report = save_results(results, output)
+    print(f"✅ Saved {len(results)} results to {output}")
+
+    if args.baseline:
+        current = {r["key"]: r for r in report["results"]}
+        rows = compare(current, load_results(args.baseline), args.tolerance)
+        for row in rows:
+            status = "❌" if row["regression"] else "✅"
+            print(f"{status} {row['key']:<48} {row['baseline_s'] * 1000:10.1f} ms -> "
+                  f"{row['current_s'] * 1000:10.1f} ms  ({row['ratio']:.2f}x)")
+        if any(row["regression"] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/startup.py
+"""
+Startup-time budget for the API and the entry scripts.
+
+Every entry module is imported in a fresh interpreter, `repeat` times, and
+the median import time is compared against its budget. The same child
+process also reports which heavy libraries the import pulled in. Those
+libraries must stay behind the code paths that use them: sklearn is needed
+only for training, matplotlib/seaborn only for --plot, and pandas never on
+the API's single-reading routes.
+
+Usage:
+    python -m benchmarks.startup [--repeat 5] [--scale 2.0] [--json]
+
+The exit status is 1 if any entry exceeds its budget or imports a
+forbidden module. STARTUP_BUDGET_SCALE (or --scale) multiplies every budget,
+for slow CI machines.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["pandas", "pyarrow", "sklearn", "scipy", "joblib", "matplotlib", "seaborn"]
+PLOTTING = ["matplotlib", "seaborn"]
+TRAINING = ["sklearn", "scipy", "joblib"]
+
+# module -> (import budget in ms, modules it must not import)
+BUDGETS: Dict[str, tuple] = {
+    "api.main": (1000, HEAVY_MODULES),
+    "run_failure_model": (1000, TRAINING + PLOTTING),
+    "run_decision_engine": (1000, TRAINING + PLOTTING),
+    "run_stream_scorer": (1500, TRAINING + PLOTTING),
+    "simulation.fleet": (1000, TRAINING + PLOTTING),
+    "models.scoring_kernel": (250, HEAVY_MODULES),
+    "models.bayesian_failure": (250, HEAVY_MODULES),
+}
+
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+@dataclass
+class StartupResult:
+    module: str
+    median_ms: float
+    budget_ms: float
+    runs_ms: List[float] = field(default_factory=list)
+    loaded: List[str] = field(default_factory=list)
+    forbidden: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.median_ms <= self.budget_ms and not self.forbidden
+
+
+def time_import(module: str) -> dict:
+    """Imports `module` in a fresh interpreter; returns its import time and the heavy modules it loaded."""
+    code = _CHILD.format(module=module, heavy=HEAVY_MODULES)
+    completed = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=False)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure_startup(modules: Optional[List[str]] = None, repeat: int = 5, scale: float = 1.0) -> List[StartupResult]:
+    results = []
+    for module in modules or list(BUDGETS):
+        budget_ms, forbidden = BUDGETS[module]
+        runs = [time_import(module) for _ in range(repeat)]
+        loaded = runs[-1]["loaded"]
+        results.append(StartupResult(
+            module=module,
+            median_ms=statistics.median(run["ms"] for run in runs),
+            budget_ms=budget_ms * scale,
+            runs_ms=[run["ms"] for run in runs],
+            loaded=loaded,
+            forbidden=[m for m in loaded if m in forbidden],
+        ))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check import times of the API and entry scripts against their budgets")
+    parser.add_argument("modules", nargs="*", help="Entry modules to check (default: all budgeted ones)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=float(os.getenv("STARTUP_BUDGET_SCALE", "1.0")))
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    results = measure_startup(args.modules or None, repeat=args.repeat, scale=args.scale)
+    if args.json:
+        print(json.dumps([{**asdict(r), "ok": r.ok} for r in results], indent=2))
+    else:
+        for r in results:
+            status = "✅" if r.ok else "❌"
+            extra = f"  forbidden imports: {', '.join(r.forbidden)}" if r.forbidden else ""
+            print(f"{status} {r.module:<26} {r.median_ms:7.1f} ms (budget {r.budget_ms:.0f} ms){extra}")
+    sys.exit(0 if all(r.ok for r in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
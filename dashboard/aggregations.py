@@ -0,0 +1,284 @@
+# dashboard/aggregations.py
+"""
+Server-side aggregates for the dashboard, so pages plot summaries instead of raw rows.
+
+`DashboardAggregates` is built chunk by chunk and only ever grows:
+
+    histograms      fixed-edge bin counts per signal (mergeable across chunks)
+    error codes     reading counts per battery error code
+    grid cells      per lat/lon cell: readings, errors, anomalies, mean battery temperature
+    time buckets    readings and anomalies per time bucket (daily by default)
+    sample          a uniform random sample of `sample_size` readings (reservoir
+                    by random keys: keep the rows with the smallest keys)
+    latest          the last `latest_size` readings in file order
+
+`refresh_aggregates` brings an aggregate up to date with its source and only
+reads what is new. For a JSONL stream, that is the bytes appended since the
+last saved offset. For a Parquet dataset, it is the files not seen before.
+The aggregate is rebuilt from scratch if the source was rewritten (another
+inode, a shorter file, different bytes where the part already read starts or
+ends, a changed or removed Parquet file). `load_aggregates`
+keeps the result pickled in DASHBOARD_CACHE_DIR, keyed by the source path and
+aggregation settings, so a restarted dashboard does not rescan a month of data.
+"""
+import glob
+import hashlib
+import os
+import pickle
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import config
+from utils.sensor_reader import complete_lines_end, iter_sensor_chunks
+from utils.sensor_store import iter_parquet_files
+
+# Bump when the pickled layout changes; older cache files are then ignored
+AGGREGATES_VERSION = 2
+# Bytes hashed at each end of the part of a JSONL file already aggregated
+PREFIX_CHECK_BYTES = 4096
+
+DASHBOARD_COLUMNS = [
+    "component_id", "vehicle_id", "timestamp", "location.latitude", "location.longitude",
+    "battery.temperature", "motor.vibration_level", "battery.error_code",
+]
+# Fixed bin edges, so chunk histograms can simply be added; values outside go to the edge bins
+HISTOGRAM_EDGES = {
+    "battery.temperature": np.linspace(30, 130, 101),
+    "motor.vibration_level": np.linspace(0, 3, 121),
+}
+# Same anomaly rule the dashboard always used
+ANOMALY_TEMPERATURE = 85
+ANOMALY_VIBRATION = 1.0
+
+
+def anomaly_mask(df: pd.DataFrame) -> np.ndarray:
+    return ((df["battery.temperature"].to_numpy(dtype=float) > ANOMALY_TEMPERATURE)
+            & (df["motor.vibration_level"].to_numpy(dtype=float) > ANOMALY_VIBRATION))
+
+
+class DashboardAggregates:
+    def __init__(self, cell_deg: float = 0.25, time_bucket: str = "1D", sample_size: int = 2000,
+                 latest_size: int = 50, seed: int = 0):
+        self.cell_deg = cell_deg
+        self.time_bucket = time_bucket
+        self.sample_size = sample_size
+        self.latest_size = latest_size
+        self.rows = 0
+        self.histograms = {col: np.zeros(len(edges) - 1, dtype=np.int64) for col, edges in HISTOGRAM_EDGES.items()}
+        self.error_codes: Dict[str, int] = {}
+        # (lat index, lon index) -> [readings, errors, anomalies, temperature sum]
+        self.cells: Dict[Tuple[int, int], np.ndarray] = {}
+        # bucket start -> [readings, anomalies]
+        self.buckets: Dict[pd.Timestamp, np.ndarray] = {}
+        self._sample: Optional[pd.DataFrame] = None
+        self._sample_keys = np.empty(0)
+        self._latest: Optional[pd.DataFrame] = None
+        self._rng = np.random.default_rng(seed)
+        # What has been read from the source so far (see refresh_aggregates)
+        self.source: dict = {}
+
+    @property
+    def settings(self) -> tuple:
+        return (self.cell_deg, self.time_bucket, self.sample_size, self.latest_size)
+
+    # ----------------------------
+    # Incremental updates
+    # ----------------------------
+    def update(self, chunk: pd.DataFrame):
+        """Folds one chunk of flat readings into every aggregate."""
+        if chunk.empty:
+            return
+        self.rows += len(chunk)
+        anomalies = anomaly_mask(chunk)
+        errors = (chunk["battery.error_code"].astype(object) != "OK").to_numpy()
+
+        for col, edges in HISTOGRAM_EDGES.items():
+            values = chunk[col].to_numpy(dtype=float)
+            values = values[~np.isnan(values)]
+            bins = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, len(edges) - 2)
+            self.histograms[col] += np.bincount(bins, minlength=len(edges) - 1)
+
+        for code, count in chunk["battery.error_code"].astype(object).value_counts().items():
+            self.error_codes[code] = self.error_codes.get(code, 0) + int(count)
+
+        self._update_cells(chunk, errors, anomalies)
+        self._update_buckets(chunk, anomalies)
+        self._update_sample(chunk)
+        latest = chunk[DASHBOARD_COLUMNS].tail(self.latest_size)
+        if self._latest is not None:
+            latest = pd.concat([self._latest, latest]).tail(self.latest_size)
+        self._latest = latest
+
+    def _update_cells(self, chunk: pd.DataFrame, errors: np.ndarray, anomalies: np.ndarray):
+        lat = chunk["location.latitude"].to_numpy(dtype=float)
+        lon = chunk["location.longitude"].to_numpy(dtype=float)
+        located = ~(np.isnan(lat) | np.isnan(lon))
+        cells = pd.DataFrame({
+            "i": np.floor(lat[located] / self.cell_deg).astype(np.int64),
+            "j": np.floor(lon[located] / self.cell_deg).astype(np.int64),
+            "readings": 1,
+            "errors": errors[located].astype(np.int64),
+            "anomalies": anomalies[located].astype(np.int64),
+            "temperature": np.nan_to_num(chunk["battery.temperature"].to_numpy(dtype=float)[located]),
+        }).groupby(["i", "j"]).sum()
+        for key, values in zip(cells.index, cells.to_numpy(dtype=float)):
+            current = self.cells.get(key)
+            self.cells[key] = values if current is None else current + values
+
+    def _update_buckets(self, chunk: pd.DataFrame, anomalies: np.ndarray):
+        buckets = pd.DataFrame({
+            "bucket": pd.to_datetime(chunk["timestamp"]).dt.floor(self.time_bucket).to_numpy(),
+            "readings": 1,
+            "anomalies": anomalies.astype(np.int64),
+        }).groupby("bucket").sum()
+        for bucket, values in zip(buckets.index, buckets.to_numpy()):
+            current = self.buckets.get(bucket)
+            self.buckets[bucket] = values if current is None else current + values
+
+    def _update_sample(self, chunk: pd.DataFrame):
+        # Every reading gets a uniform random key; the sample is the rows with the smallest keys seen so far
+        keys = self._rng.random(len(chunk))
+        candidates = chunk[DASHBOARD_COLUMNS].reset_index(drop=True)
+        if self._sample is not None:
+            keys = np.concatenate([self._sample_keys, keys])
+            candidates = pd.concat([self._sample, candidates], ignore_index=True)
+        if len(keys) > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size - 1)[:self.sample_size]
+            keep.sort()
+            keys, candidates = keys[keep], candidates.iloc[keep].reset_index(drop=True)
+        self._sample, self._sample_keys = candidates, keys
+
+    # ----------------------------
+    # Views for the dashboard
+    # ----------------------------
+    def histogram(self, col: str) -> pd.DataFrame:
+        edges = HISTOGRAM_EDGES[col]
+        return pd.DataFrame({"bin_start": edges[:-1], "bin_end": edges[1:],
+                             "bin_center": (edges[:-1] + edges[1:]) / 2, "count": self.histograms[col]})
+
+    def error_code_counts(self) -> pd.DataFrame:
+        return pd.DataFrame(sorted(self.error_codes.items(), key=lambda item: -item[1]),
+                            columns=["error_code", "count"])
+
+    def grid_cells(self) -> pd.DataFrame:
+        """One row per non-empty map cell, located at the cell center."""
+        if not self.cells:
+            return pd.DataFrame(columns=["latitude", "longitude", "readings", "errors", "anomalies",
+                                         "mean_temperature"])
+        keys = np.array(list(self.cells.keys()))
+        values = np.vstack(list(self.cells.values()))
+        return pd.DataFrame({
+            "latitude": (keys[:, 0] + 0.5) * self.cell_deg,
+            "longitude": (keys[:, 1] + 0.5) * self.cell_deg,
+            "readings": values[:, 0].astype(np.int64),
+            "errors": values[:, 1].astype(np.int64),
+            "anomalies": values[:, 2].astype(np.int64),
+            "mean_temperature": values[:, 3] / values[:, 0],
+        })
+
+    def anomalies_over_time(self) -> pd.DataFrame:
+        if not self.buckets:
+            return pd.DataFrame(columns=["bucket", "readings", "anomalies"])
+        buckets = sorted(self.buckets)
+        values = np.vstack([self.buckets[b] for b in buckets])
+        return pd.DataFrame({"bucket": buckets, "readings": values[:, 0], "anomalies": values[:, 1]})
+
+    def sample(self) -> pd.DataFrame:
+        return self._sample.copy() if self._sample is not None else pd.DataFrame(columns=DASHBOARD_COLUMNS)
+
+    def latest(self) -> pd.DataFrame:
+        return self._latest.copy() if self._latest is not None else pd.DataFrame(columns=DASHBOARD_COLUMNS)
+
+
+# ----------------------------
+# Keeping aggregates up to date with their source
+# ----------------------------
+def _parquet_files(root: str) -> Dict[str, tuple]:
+    if os.path.isfile(root):
+        paths = [root]
+    else:
+        paths = glob.glob(os.path.join(root, "**", "*.parquet"), recursive=True)
+    return {path: (os.stat(path).st_size, os.stat(path).st_mtime_ns) for path in sorted(paths)}
+
+
+def _prefix_digest(path: str, offset: int) -> str:
+    """
+    Digest of the first and last PREFIX_CHECK_BYTES of path[:offset]. Rewriting
+    a file in place keeps its inode and may leave it longer, which would
+    otherwise look like an append.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    n = min(offset, PREFIX_CHECK_BYTES)
+    with open(path, "rb") as f:
+        digest.update(f.read(n))
+        f.seek(offset - n)
+        digest.update(f.read(n))
+    return digest.hexdigest()
+
+
+def refresh_aggregates(path: str, aggregates: Optional[DashboardAggregates] = None,
+                       chunk_size: int = 100_000, **settings) -> Tuple[DashboardAggregates, bool]:
+    """
+    Returns (aggregates, changed): `aggregates` updated with whatever `path`
+    gained since it was last refreshed, or rebuilt if the source was rewritten.
+    """
+    rebuilt = aggregates is None
+    if aggregates is None:
+        aggregates = DashboardAggregates(**settings)
+
+    if os.path.isdir(path) or path.endswith(".parquet"):
+        files = _parquet_files(path)
+        seen = aggregates.source.get("files", {})
+        if any(files.get(p) != stat for p, stat in seen.items()):
+            aggregates, seen, rebuilt = DashboardAggregates(**settings), {}, True
+        new = [p for p in files if p not in seen]
+        root = path if os.path.isdir(path) else os.path.dirname(path)
+        for chunk in iter_parquet_files(root, new, columns=DASHBOARD_COLUMNS, chunk_size=chunk_size):
+            aggregates.update(chunk)
+        aggregates.source = {"files": files}
+        return aggregates, rebuilt or bool(new)
+
+    stat = os.stat(path)
+    source = aggregates.source
+    if (source.get("inode") != stat.st_ino or stat.st_size < source.get("offset", 0)
+            or source.get("digest") != _prefix_digest(path, source.get("offset", 0))):
+        aggregates, source, rebuilt = DashboardAggregates(**settings), {}, True
+    offset = source.get("offset", 0)
+    end = complete_lines_end(path, offset)
+    if end == offset and not rebuilt:
+        return aggregates, False
+    for chunk in iter_sensor_chunks(path, columns=DASHBOARD_COLUMNS, chunk_size=chunk_size, start=offset, end=end):
+        aggregates.update(chunk)
+    aggregates.source = {"inode": stat.st_ino, "offset": end, "digest": _prefix_digest(path, end)}
+    return aggregates, True
+
+
+def _cache_path(path: str, settings: tuple, cache_dir: str) -> str:
+    key = repr((AGGREGATES_VERSION, os.path.abspath(path), settings))
+    return os.path.join(cache_dir, f"aggregates-{hashlib.blake2b(key.encode(), digest_size=8).hexdigest()}.pkl")
+
+
+def load_aggregates(path: str, aggregates: Optional[DashboardAggregates] = None,
+                    cache_dir: Optional[str] = None, **settings) -> DashboardAggregates:
+    """
+    refresh_aggregates with an on-disk cache: starts from `aggregates` (the
+    in-memory copy) or the pickled one, and saves it again when it changed.
+    """
+    cache_dir = cache_dir or config.DASHBOARD_CACHE_DIR
+    cache_file = _cache_path(path, (aggregates or DashboardAggregates(**settings)).settings, cache_dir)
+    if aggregates is None and os.path.exists(cache_file):
+        try:
+            with open(cache_file, "rb") as f:
+                aggregates = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            aggregates = None
+
+    aggregates, changed = refresh_aggregates(path, aggregates, **settings)
+    if changed:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(f"{cache_file}.tmp", "wb") as f:
+            pickle.dump(aggregates, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f"{cache_file}.tmp", cache_file)
+    return aggregates
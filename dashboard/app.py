@@ -1,11 +1,25 @@
+import hashlib
+import io
+import os
+import sys
+import threading
 import streamlit as st
+import numpy as np
 import pandas as pd
-import json
 import plotly.express as px
 import folium
 import requests
 from streamlit_folium import folium_static
 
+# Make the project packages importable when run via `streamlit run dashboard/app.py`
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dashboard.aggregations import load_aggregates
+from engine.cost_model import load_cost_model
+from engine.decision_engine import apply_decision_engine, resolve_costs
+from engine.geo_index import GridIndex
+from engine.what_if import WhatIfSweep
+from utils import config
+
 # ----------------------------
 # 🚀 APP CONFIG
 # ----------------------------
@@ -58,32 +72,45 @@ st.sidebar.markdown("🔧 Powered by FastAPI")
 if menu == "🛁 Live Sensor Data":
     st.markdown("<div class='main-title'>🛁 Live Sensor Monitoring</div>", unsafe_allow_html=True)
 
-    @st.cache_data
-    def load_sensor_data(file_path: str):
-        with open(file_path, "r") as f:
-            lines = [json.loads(line) for line in f]
-        return pd.json_normalize(lines)
+    @st.cache_resource
+    def aggregate_store(file_path: str):
+        # One aggregate per source, refreshed in place; only new readings are read on each rerun
+        return {"aggregates": None, "lock": threading.Lock()}
+
+    def load_dashboard_aggregates(file_path: str):
+        store = aggregate_store(file_path)
+        with store["lock"]:
+            store["aggregates"] = load_aggregates(
+                file_path, store["aggregates"], cell_deg=config.DASHBOARD_GRID_DEG,
+                time_bucket=config.DASHBOARD_TIME_BUCKET, sample_size=config.DASHBOARD_SAMPLE_SIZE)
+            return store["aggregates"]
 
     try:
-        df = load_sensor_data("data/sensor_data_stream.jsonl")
+        agg = load_dashboard_aggregates(config.SENSOR_DATA_PATH)
 
         st.markdown("<div class='sub-title'>📄 Sensor Data Snapshot</div>", unsafe_allow_html=True)
-        st.dataframe(df.head(50), use_container_width=True)
+        st.caption(f"{agg.rows:,} readings; showing the latest {len(agg.latest())}")
+        st.dataframe(agg.latest(), use_container_width=True)
 
         st.markdown("<div class='sub-title'>📊 Sensor Metrics Overview</div>", unsafe_allow_html=True)
         col1, col2, col3 = st.columns(3)
 
         with col1:
-            fig = px.histogram(df, x="battery.temperature", nbins=30, color_discrete_sequence=["#FFA500"])
+            temperature = agg.histogram("battery.temperature")
+            fig = px.bar(temperature, x="bin_center", y="count", color_discrete_sequence=["#FFA500"],
+                         labels={"bin_center": "battery.temperature"})
+            fig.update_layout(bargap=0)
             st.plotly_chart(fig, use_container_width=True)
 
         with col2:
-            fig2 = px.box(df, y="motor.vibration_level", points="all", color_discrete_sequence=["#1f77b4"])
+            # Box and points over a uniform sample instead of every reading
+            sample = agg.sample()
+            fig2 = px.box(sample, y="motor.vibration_level", points="all", color_discrete_sequence=["#1f77b4"],
+                          title=f"Sample of {len(sample):,} readings")
             st.plotly_chart(fig2, use_container_width=True)
 
         with col3:
-            errors = df["battery.error_code"].value_counts().reset_index()
-            errors.columns = ["error_code", "count"]
+            errors = agg.error_code_counts()
             fig3 = px.bar(errors, x="error_code", y="count", color="error_code")
             st.plotly_chart(fig3, use_container_width=True)
 
@@ -91,34 +118,35 @@ if menu == "🛁 Live Sensor Data":
         col1, col2 = st.columns([1.5, 1.5])
 
         with col1:
+            # One circle per grid cell, sized by readings and red where errors are reported
             m = folium.Map(location=[9.0820, 8.6753], zoom_start=6)
-            for _, row in df.iterrows():
-                lat = row.get("location.latitude")
-                lon = row.get("location.longitude")
-                if pd.notnull(lat) and pd.notnull(lon):
-                    popup = f"""
-                    <b>Component ID:</b> {row['component_id']}<br>
-                    <b>Battery Temp:</b> {row['battery.temperature']} °C<br>
-                    <b>Vibration:</b> {row['motor.vibration_level']}<br>
-                    <b>Error:</b> {row['battery.error_code']}
-                    """
-                    icon_color = "red" if row["battery.error_code"] != "OK" else "green"
-                    folium.Marker(
-                        location=[lat, lon],
-                        popup=popup,
-                        icon=folium.Icon(color=icon_color)
-                    ).add_to(m)
+            cells = agg.grid_cells()
+            max_readings = max(cells["readings"].max(), 1) if len(cells) else 1
+            for cell in cells.itertuples(index=False):
+                error_share = cell.errors / cell.readings
+                popup = f"""
+                <b>Readings:</b> {cell.readings:,}<br>
+                <b>Errors:</b> {cell.errors:,} ({error_share:.0%})<br>
+                <b>Anomalies:</b> {cell.anomalies:,}<br>
+                <b>Mean Battery Temp:</b> {cell.mean_temperature:.1f} °C
+                """
+                folium.CircleMarker(
+                    location=[cell.latitude, cell.longitude],
+                    radius=3 + 12 * (cell.readings / max_readings) ** 0.5,
+                    popup=popup,
+                    color="red" if error_share > 0.5 or cell.anomalies else "green",
+                    fill=True,
+                    fill_opacity=0.6,
+                ).add_to(m)
             folium_static(m)
 
         with col2:
-            df["anomaly_flag"] = ((df["battery.temperature"] > 85) & (df["motor.vibration_level"] > 1.0)).astype(int)
-            anomaly_df = df.groupby(pd.to_datetime(df["timestamp"]).dt.date)["anomaly_flag"].sum().reset_index()
-            anomaly_df.columns = ["date", "anomalies"]
-            fig_anomaly = px.line(anomaly_df, x="date", y="anomalies", title="🚨 Daily Anomalies")
+            anomaly_df = agg.anomalies_over_time()
+            fig_anomaly = px.line(anomaly_df, x="bucket", y="anomalies", title="🚨 Daily Anomalies")
             st.plotly_chart(fig_anomaly, use_container_width=True)
 
     except FileNotFoundError:
-        st.warning("⚠️ File not found: `data/sensor_data_stream.jsonl`")
+        st.warning(f"⚠️ File not found: `{config.SENSOR_DATA_PATH}`")
 
 # ----------------------------
 # 🛠️ PREDICTIVE MAINTENANCE SECTION
@@ -127,73 +155,71 @@ elif menu == "🛠️ Predictive Maintenance":
     st.markdown("<div class='main-title'>🛠️ Predictive Maintenance</div>", unsafe_allow_html=True)
 
     # 👇 Sidebar config sliders
+    # Defaults come from the same cost model as the API and batch engine
+    cost_model = load_cost_model(config.COST_MODEL_PATH)
     st.sidebar.markdown("### ⚙️ Decision Engine Settings")
-    threshold = st.sidebar.slider("Failure Probability Threshold", 0.0, 1.0, 0.6, 0.05)
-    cost_failure = st.sidebar.number_input("Expected Failure Cost", value=5000)
-    early_fix_cost = st.sidebar.number_input("Early Fix Cost", value=1000)
+    st.sidebar.caption(f"Cost model {cost_model.version}")
+    threshold = st.sidebar.slider("Failure Probability Threshold", 0.0, 1.0, cost_model.threshold, 0.05)
+    cost_failure = st.sidebar.number_input("Expected Failure Cost", value=int(cost_model.cost_failure))
+    early_fix_cost = st.sidebar.number_input("Early Fix Cost", value=int(cost_model.early_fix_cost))
+
+    @st.cache_data(show_spinner=False)
+    def score_upload(data: bytes):
+        # Scored once per upload: moving a slider reruns the script but not the backend call
+        df_upload = pd.read_csv(io.BytesIO(data))
+
+        # One request for the whole upload instead of one per row
+        batch_columns = ["component_id", "vehicle_id", "battery.temperature", "motor.vibration_level", "battery.error_code"]
+        batch_columns += [col for col in ["component_type"] if col in df_upload]
+        payload_df = df_upload.reindex(columns=batch_columns).astype(object)
+        payload = {"columns": payload_df.where(payload_df.notnull(), None).to_dict(orient="list")}
+
+        response = requests.post("http://localhost:8000/recommend-maintenance/batch", json=payload)
+        response.raise_for_status()
+        batch = response.json()
+
+        decision_df = pd.DataFrame([r for r in batch["results"] if r is not None])
+        valid_rows = [i for i, r in enumerate(batch["results"]) if r is not None]
+        lat = df_upload["location.latitude"] if "location.latitude" in df_upload else df_upload.get("latitude")
+        lon = df_upload["location.longitude"] if "location.longitude" in df_upload else df_upload.get("longitude")
+        decision_df["latitude"] = lat.iloc[valid_rows].to_numpy() if lat is not None else None
+        decision_df["longitude"] = lon.iloc[valid_rows].to_numpy() if lon is not None else None
+        if "component_type" in df_upload:
+            decision_df["component_type"] = df_upload["component_type"].iloc[valid_rows].to_numpy()
+        return decision_df, len(batch["errors"])
+
+    @st.cache_resource(show_spinner=False)
+    def what_if_sweep(upload_digest: str, _probabilities):
+        # Sorted once per upload; every slider setting is then a couple of binary searches
+        return WhatIfSweep(_probabilities)
 
     uploaded = st.file_uploader("📂 Upload CSV Sensor Data", type="csv")
 
     if uploaded:
         with st.spinner("⏳ Analyzing uploaded data..."):
-            df_upload = pd.read_csv(uploaded)
-            decisions = []
-
-            for _, row in df_upload.iterrows():
-                payload = {
-                    "component_id": row["component_id"],
-                    "battery_temperature": row["battery.temperature"],
-                    "motor_vibration_level": row["motor.vibration_level"],
-                    "error_flag": 1 if row["battery.error_code"] != "OK" else 0
-                }
-
-                try:
-                    response = requests.post("http://localhost:8000/recommend-maintenance", json=payload)
-                    result = response.json()
-                except Exception as e:
-                    st.error(f"⚠️ Backend error: {e}")
-                    st.stop()
-
-                result["latitude"] = row.get("location.latitude") or row.get("latitude")
-                result["longitude"] = row.get("location.longitude") or row.get("longitude")
-                result["component_id"] = row["component_id"]
-                decisions.append(result)
-
-            decision_df = pd.DataFrame(decisions)
+            data = uploaded.getvalue()
+            try:
+                decision_df, n_errors = score_upload(data)
+            except Exception as e:
+                st.error(f"⚠️ Backend error: {e}")
+                st.stop()
+
+            if n_errors:
+                st.warning(f"⚠️ Skipped {n_errors} invalid row(s)")
+            if decision_df.empty:
+                st.warning("⚠️ No valid rows to analyze")
+                st.stop()
+            sweep = what_if_sweep(hashlib.sha256(data).hexdigest(), decision_df["failure_probability"].to_numpy())
 
         st.markdown("<div class='sub-title'>🧾 Raw Recommendations</div>", unsafe_allow_html=True)
         st.dataframe(decision_df, use_container_width=True)
 
-        def recommend_action(prob, cost_failure, cost_fix, threshold=0.6):
-            expected_failure_cost = prob * cost_failure
-            decision = "FIX" if expected_failure_cost > cost_fix or prob >= threshold else "WAIT"
-            reason = f"Expected cost: {expected_failure_cost:.2f} > fix cost: {cost_fix}" if decision == "FIX" else "Below threshold"
-            return decision, reason
-
-        def apply_decision_engine(sensor_df: pd.DataFrame, cost_config: dict, threshold=0.6):
-            results = []
-            for _, row in sensor_df.iterrows():
-                decision, reason = recommend_action(
-                    row['failure_probability'],
-                    cost_config['cost_failure'],
-                    cost_config['early_fix_cost'],
-                    threshold
-                )
-                results.append({
-                    "component_id": row['component_id'],
-                    "vehicle_id": row.get('vehicle_id', 'N/A'),
-                    "failure_probability": row['failure_probability'],
-                    "decision": decision,
-                    "explanation": reason,
-                    "latitude": row.get("latitude"),
-                    "longitude": row.get("longitude")
-                })
-            return pd.DataFrame(results)
-
-        decision_engine_df = apply_decision_engine(decision_df, {
-            "cost_failure": cost_failure,
-            "early_fix_cost": early_fix_cost
-        }, threshold)
+        # Per-vehicle and per-type costs from the file still apply on top of the sidebar defaults
+        if (cost_failure, early_fix_cost, threshold) != (cost_model.cost_failure, cost_model.early_fix_cost,
+                                                         cost_model.threshold):
+            cost_model = cost_model.with_overrides("dashboard", cost_failure=cost_failure,
+                                                   early_fix_cost=early_fix_cost, threshold=threshold)
+        decision_engine_df = apply_decision_engine(decision_df, cost_model)
 
         st.markdown(f"### 🤖 Actionable Recommendations (Threshold ≥ {threshold})")
         st.dataframe(decision_engine_df, use_container_width=True)
@@ -203,6 +229,24 @@ elif menu == "🛠️ Predictive Maintenance":
         fig_summary = px.bar(summary, x='decision', y='count', color='decision', title="🔍 FIX vs WAIT Decisions")
         st.plotly_chart(fig_summary, use_container_width=True)
 
+        # 🧪 What-if: cost of the current settings and of the alternatives, without rescoring
+        st.markdown("### 🧪 What-if Analysis")
+        row_cost_failure, row_cost_fix = resolve_costs(decision_df, cost_model)
+        current = sweep.evaluate(threshold, row_cost_failure, row_cost_fix)
+        col_fix, col_cost, col_savings = st.columns(3)
+        col_fix.metric("FIX", f"{current.n_fix:,}", f"{current.n_wait:,} WAIT", delta_color="off")
+        col_cost.metric("Expected Cost", f"{current.expected_cost:,.0f}")
+        col_savings.metric("Savings vs Run-to-Failure", f"{current.savings:,.0f}")
+
+        # Same per-row costs as the metrics above, with every row's failure cost scaled
+        grid = sweep.grid(np.round(np.arange(0, 1.0001, 0.05), 2), np.linspace(0.25, 2.0, 8), [1.0],
+                          row_cost_failure=row_cost_failure, row_cost_fix=row_cost_fix)
+        heatmap = grid.pivot(index="failure_cost_scale", columns="threshold", values="savings")
+        fig_grid = px.imshow(heatmap, aspect="auto", color_continuous_scale="RdYlGn", origin="lower",
+                             labels={"x": "Threshold", "y": "Failure Cost ×", "color": "Savings"},
+                             title="💰 Savings by Threshold and Failure Cost (× each component's cost)")
+        st.plotly_chart(fig_grid, use_container_width=True)
+
         fix_df = decision_engine_df[decision_engine_df['decision'] == 'FIX']
 
         st.markdown("### 🧠 Filtered: Components Needing Immediate Attention")
@@ -210,15 +254,28 @@ elif menu == "🛠️ Predictive Maintenance":
 
         st.markdown("### 📍 Fix-Now Locations")
         map_fix = folium.Map(location=[6.5244, 3.3792], zoom_start=6)
-        for _, row in fix_df.iterrows():
-            if pd.notnull(row["latitude"]) and pd.notnull(row["longitude"]):
-                folium.Marker(
-                    location=[row["latitude"], row["longitude"]],
-                    popup=f"{row['component_id']} (Prob: {row['failure_probability']:.2f})",
-                    icon=folium.Icon(color="red", icon="wrench", prefix="fa")
-                ).add_to(map_fix)
+        located = fix_df[fix_df["latitude"].notnull() & fix_df["longitude"].notnull()]
+        for component_id, prob, lat, lon in zip(located["component_id"], located["failure_probability"],
+                                                located["latitude"], located["longitude"]):
+            folium.Marker(
+                location=[lat, lon],
+                popup=f"{component_id} (Prob: {prob:.2f})",
+                icon=folium.Icon(color="red", icon="wrench", prefix="fa")
+            ).add_to(map_fix)
         folium_static(map_fix)
 
+        # 🏭 FIX components near a depot
+        st.markdown("### 🏭 Near a Depot")
+        col_lat, col_lon, col_radius = st.columns(3)
+        depot_lat = col_lat.number_input("Depot latitude", value=6.5244, min_value=-90.0, max_value=90.0)
+        depot_lon = col_lon.number_input("Depot longitude", value=3.3792, min_value=-180.0, max_value=180.0)
+        radius_km = col_radius.number_input("Radius (km)", value=50.0, min_value=1.0)
+        fix_index = GridIndex.from_frame(fix_df, "latitude", "longitude",
+                                         ["component_id", "vehicle_id", "failure_probability"], config.GEO_CELL_DEG)
+        nearby_df = fix_index.within(depot_lat, depot_lon, radius_km)
+        st.markdown(f"**{len(nearby_df)}** of {len(fix_index)} located FIX components within {radius_km:g} km")
+        st.dataframe(nearby_df, use_container_width=True)
+
         # 🔄 Animated Map with Plotly
         st.markdown("### 📍 Animated Map of FIX Components")
         if "timestamp" in fix_df.columns:
@@ -0,0 +1,39 @@
+# database/indexes.py
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, IndexModel
+from pymongo.database import Database
+from utils.logger import logger
+
+READINGS_COLLECTION = "components"
+LATEST_COLLECTION = "components_latest"
+
+# Every reading carries a GeoJSON copy of its location in `geo` (see database.insert_data.to_document)
+INDEXES = {
+    READINGS_COLLECTION: [
+        IndexModel([("component_id", ASCENDING), ("timestamp", ASCENDING)], unique=True, name="component_timestamp"),
+        IndexModel([("vehicle_id", ASCENDING), ("timestamp", DESCENDING)], name="vehicle_timestamp"),
+        IndexModel([("timestamp", DESCENDING)], name="timestamp"),
+        IndexModel([("geo", GEOSPHERE)], name="geo_2dsphere"),
+    ],
+    LATEST_COLLECTION: [
+        IndexModel([("component_id", ASCENDING)], unique=True, name="component_id"),
+        IndexModel([("vehicle_id", ASCENDING)], name="vehicle_id"),
+        IndexModel([("timestamp", DESCENDING)], name="timestamp"),
+        IndexModel([("geo", GEOSPHERE)], name="geo_2dsphere"),
+        # Polled by every API worker for components whose cached status went stale
+        IndexModel([("ingested_at", ASCENDING)], name="ingested_at"),
+    ],
+}
+
+
+def ensure_indexes(db: Database):
+    """Creates the indexes the API and ingestion rely on (no-op when they already exist)."""
+    for name, indexes in INDEXES.items():
+        created = db[name].create_indexes(indexes)
+        logger.info("Indexes on %s: %s", name, ", ".join(created))
+
+
+async def ensure_indexes_async(db):
+    """ensure_indexes for a pymongo AsyncDatabase."""
+    for name, indexes in INDEXES.items():
+        created = await db[name].create_indexes(indexes)
+        logger.info("Indexes on %s: %s", name, ", ".join(created))
@@ -0,0 +1,216 @@
+# database/insert_data.py
+import asyncio
+import time
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.collection import Collection
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError, ConnectionFailure, PyMongoError
+
+from database.indexes import LATEST_COLLECTION, READINGS_COLLECTION, ensure_indexes
+
+from utils import config
+from utils.logger import logger
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson is optional
+    import json
+    _loads = json.loads
+
+# A reading is identified by its component and timestamp; re-ingesting the same file is a no-op
+READING_KEY = ["component_id", "timestamp"]
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+@dataclass
+class IngestStats:
+    documents: int = 0
+    batches: int = 0
+    upserted: int = 0
+    modified: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.documents / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.documents} docs in {self.batches} batches, {self.seconds:.2f}s "
+                f"({self.docs_per_second:,.0f} docs/s), upserted={self.upserted} "
+                f"modified={self.modified} retries={self.retries}")
+
+
+def to_document(record: dict) -> dict:
+    """Adds a GeoJSON `geo` point (for the 2dsphere index) to a raw reading."""
+    location = record.get("location") or {}
+    lat, lon = location.get("latitude"), location.get("longitude")
+    if lat is not None and lon is not None:
+        record["geo"] = {"type": "Point", "coordinates": [lon, lat]}
+    return record
+
+
+def iter_batches(records: Iterable[dict], batch_size: int) -> Iterator[List[dict]]:
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _is_retryable(error: PyMongoError) -> bool:
+    return isinstance(error, ConnectionFailure) or error.has_error_label("RetryableWriteError")
+
+
+def _with_retries(write, stats: IngestStats, max_retries: int, backoff_s: float):
+    for attempt in range(max_retries + 1):
+        try:
+            return write()
+        except PyMongoError as e:
+            # Upserts are idempotent, so replaying the whole batch after a partial write is safe
+            if attempt == max_retries or not _is_retryable(e):
+                raise
+            stats.retries += 1
+            delay = backoff_s * (2 ** attempt)
+            logger.warning("Bulk write failed (%s), retrying in %.2fs", e, delay)
+            time.sleep(delay)
+
+
+async def _with_retries_async(write, stats: IngestStats, max_retries: int, backoff_s: float):
+    """_with_retries for coroutines (pymongo's AsyncCollection)."""
+    for attempt in range(max_retries + 1):
+        try:
+            return await write()
+        except PyMongoError as e:
+            if attempt == max_retries or not _is_retryable(e):
+                raise
+            stats.retries += 1
+            delay = backoff_s * (2 ** attempt)
+            logger.warning("Bulk write failed (%s), retrying in %.2fs", e, delay)
+            await asyncio.sleep(delay)
+
+
+def _reading_operations(batch: List[dict]) -> List[UpdateOne]:
+    return [
+        UpdateOne({key: record[key] for key in READING_KEY}, {"$set": record}, upsert=True)
+        for record in batch
+    ]
+
+
+def _latest_operations(batch: List[dict]) -> List[UpdateOne]:
+    newest = {}
+    for record in batch:
+        current = newest.get(record["component_id"])
+        if current is None or record["timestamp"] > current["timestamp"]:
+            newest[record["component_id"]] = record
+
+    # Only replace an older latest reading; when the stored one is newer the upsert
+    # hits the unique component_id index and is skipped. `ingested_at` tells every
+    # API worker which cached statuses to drop (see api.utils.cache.InvalidationFeed).
+    ingested_at = time.time()
+    return [
+        UpdateOne({"component_id": component_id, "timestamp": {"$lt": record["timestamp"]}},
+                  {"$set": {**record, "ingested_at": ingested_at}}, upsert=True)
+        for component_id, record in newest.items()
+    ]
+
+
+def _only_duplicates(error: BulkWriteError) -> bool:
+    return all(err["code"] == DUPLICATE_KEY_ERROR for err in error.details["writeErrors"])
+
+
+def _upsert_readings(collection: Collection, batch: List[dict], stats: IngestStats):
+    result = collection.bulk_write(_reading_operations(batch), ordered=False)
+    stats.upserted += result.upserted_count
+    stats.modified += result.modified_count
+
+
+def _update_latest(latest: Collection, batch: List[dict]):
+    try:
+        latest.bulk_write(_latest_operations(batch), ordered=False)
+    except BulkWriteError as e:
+        if not _only_duplicates(e):
+            raise
+
+
+async def _upsert_readings_async(collection, batch: List[dict], stats: IngestStats):
+    result = await collection.bulk_write(_reading_operations(batch), ordered=False)
+    stats.upserted += result.upserted_count
+    stats.modified += result.modified_count
+
+
+async def _update_latest_async(latest, batch: List[dict]):
+    try:
+        await latest.bulk_write(_latest_operations(batch), ordered=False)
+    except BulkWriteError as e:
+        if not _only_duplicates(e):
+            raise
+
+
+def bulk_upsert_readings(collection: Collection, records: Iterable[dict], batch_size: Optional[int] = None,
+                         max_retries: int = 5, backoff_s: float = 0.5,
+                         latest_collection: Optional[Collection] = None) -> IngestStats:
+    """
+    Upserts sensor readings with unordered bulk writes of `batch_size` documents.
+
+    When `latest_collection` is given it is kept up to date with the newest
+    reading per component. Transient connection errors are retried with
+    exponential backoff. Returns throughput statistics for the run.
+    """
+    batch_size = batch_size or config.MONGO_INGEST_BATCH_SIZE
+    stats = IngestStats()
+    start = time.perf_counter()
+
+    for batch in iter_batches(map(to_document, records), batch_size):
+        _with_retries(lambda: _upsert_readings(collection, batch, stats), stats, max_retries, backoff_s)
+        if latest_collection is not None:
+            _with_retries(lambda: _update_latest(latest_collection, batch), stats, max_retries, backoff_s)
+        stats.documents += len(batch)
+        stats.batches += 1
+
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+async def bulk_upsert_readings_async(collection, records: Iterable[dict], batch_size: Optional[int] = None,
+                                     max_retries: int = 5, backoff_s: float = 0.5,
+                                     latest_collection=None) -> IngestStats:
+    """bulk_upsert_readings for pymongo's AsyncCollection, so API routes do not block the event loop."""
+    batch_size = batch_size or config.MONGO_INGEST_BATCH_SIZE
+    stats = IngestStats()
+    start = time.perf_counter()
+
+    for batch in iter_batches(map(to_document, records), batch_size):
+        await _with_retries_async(lambda: _upsert_readings_async(collection, batch, stats), stats, max_retries,
+                                  backoff_s)
+        if latest_collection is not None:
+            await _with_retries_async(lambda: _update_latest_async(latest_collection, batch), stats, max_retries,
+                                      backoff_s)
+        stats.documents += len(batch)
+        stats.batches += 1
+
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def iter_jsonl_records(path: str) -> Iterator[dict]:
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield _loads(line)
+
+
+def ingest_jsonl(path: str, db: Database, batch_size: Optional[int] = None) -> IngestStats:
+    """Loads a JSONL sensor stream into the readings and latest-reading collections of `db`."""
+    ensure_indexes(db)
+    stats = bulk_upsert_readings(db[READINGS_COLLECTION], iter_jsonl_records(path), batch_size=batch_size,
+                                 latest_collection=db[LATEST_COLLECTION])
+    logger.info("Ingested %s: %s", path, stats)
+    return stats
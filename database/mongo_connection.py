@@ -0,0 +1,77 @@
+# database/mongo_connection.py
+from typing import Optional
+from pymongo import AsyncMongoClient, MongoClient, monitoring
+from pymongo.collection import Collection
+from pymongo.database import Database
+from utils import config
+from utils.metrics import Counter, Histogram
+
+_client: Optional[MongoClient] = None
+
+MONGO_COMMAND_SECONDS = Histogram("mongo_command_duration_seconds", "MongoDB command round-trip time", ["command"])
+MONGO_COMMAND_FAILURES = Counter("mongo_command_failures_total", "MongoDB commands that failed", ["command"])
+
+
+class CommandTimer(monitoring.CommandListener):
+    """Records the duration of every command a client sends (find, aggregate, update, ...)."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name)
+
+    def failed(self, event):
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name)
+        MONGO_COMMAND_FAILURES.inc(command=event.command_name)
+
+
+def get_client() -> MongoClient:
+    """
+    Returns the process-wide MongoClient.
+
+    MongoClient keeps its own connection pool, so one instance is shared by
+    every caller instead of opening a client per script or request.
+    """
+    global _client
+    if _client is None:
+        _client = MongoClient(
+            config.MONGO_URI,
+            maxPoolSize=config.MONGO_MAX_POOL_SIZE,
+            serverSelectionTimeoutMS=config.MONGO_TIMEOUT_MS,
+            connectTimeoutMS=config.MONGO_TIMEOUT_MS,
+            event_listeners=[CommandTimer()],
+        )
+    return _client
+
+
+def get_database(name: Optional[str] = None) -> Database:
+    return get_client()[name or config.MONGO_DB]
+
+
+def get_collection(name: str = "components") -> Collection:
+    return get_database()[name]
+
+
+def close_client():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+def create_async_client() -> AsyncMongoClient:
+    """
+    Builds the pooled async client used by the API.
+
+    It is created once in the FastAPI lifespan (it binds to the running event
+    loop) and closed on shutdown; `timeoutMS` bounds every operation.
+    """
+    return AsyncMongoClient(
+        config.MONGO_URI,
+        maxPoolSize=config.MONGO_MAX_POOL_SIZE,
+        serverSelectionTimeoutMS=config.MONGO_TIMEOUT_MS,
+        connectTimeoutMS=config.MONGO_TIMEOUT_MS,
+        timeoutMS=config.MONGO_TIMEOUT_MS,
+        event_listeners=[CommandTimer()],
+    )
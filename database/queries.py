@@ -0,0 +1,122 @@
+# database/queries.py
+from typing import List, Optional, Tuple
+from pymongo import ASCENDING, DESCENDING
+from pymongo.database import Database
+from database.indexes import LATEST_COLLECTION, READINGS_COLLECTION
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Fields returned by the component list; full documents are only returned per component
+SUMMARY_PROJECTION = {"_id": 0, "component_id": 1, "vehicle_id": 1, "timestamp": 1}
+# A reading as the API returns it: without the internal MongoDB ID and ingestion stamp
+READING_PROJECTION = {"_id": 0, "ingested_at": 0}
+
+
+def latest_readings_pipeline(match: Optional[dict] = None) -> List[dict]:
+    """
+    Aggregation returning the newest reading of every component.
+
+    The sort uses the component_id + timestamp index, so $group only keeps the
+    first document it sees per component.
+    """
+    pipeline = [{"$match": match}] if match else []
+    pipeline += [
+        {"$sort": {"component_id": ASCENDING, "timestamp": DESCENDING}},
+        {"$group": {"_id": "$component_id", "doc": {"$first": "$$ROOT"}}},
+        {"$replaceRoot": {"newRoot": "$doc"}},
+        {"$project": {"_id": 0}},
+    ]
+    return pipeline
+
+
+def rebuild_latest_collection(db: Database):
+    """Recomputes the materialized latest-reading collection from the full history."""
+    pipeline = latest_readings_pipeline() + [
+        {"$merge": {"into": LATEST_COLLECTION, "on": "component_id", "whenMatched": "replace"}}
+    ]
+    db[READINGS_COLLECTION].aggregate(pipeline, allowDiskUse=True)
+
+
+def clamp_limit(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _components_page_query(limit: int, after: Optional[str]) -> Tuple[dict, int]:
+    return ({"component_id": {"$gt": after}} if after else {}), clamp_limit(limit)
+
+
+def _history_query(component_id: str, limit: int, before: Optional[str]) -> Tuple[dict, int]:
+    query = {"component_id": component_id}
+    if before:
+        query["timestamp"] = {"$lt": before}
+    return query, clamp_limit(limit)
+
+
+def _page(items: List[dict], limit: int, key: str) -> dict:
+    # Queries fetch limit + 1 documents to know whether another page exists
+    has_more = len(items) > limit
+    items = items[:limit]
+    return {"items": items, "next_cursor": items[-1][key] if has_more else None}
+
+
+def list_components_page(db: Database, limit: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None) -> dict:
+    """
+    One page of components ordered by component_id.
+
+    `after` is the `next_cursor` of the previous page; it is None on the last page.
+    """
+    query, limit = _components_page_query(limit, after)
+    cursor = (db[LATEST_COLLECTION].find(query, SUMMARY_PROJECTION)
+              .sort("component_id", ASCENDING).limit(limit + 1))
+    return _page(list(cursor), limit, "component_id")
+
+
+def get_latest_reading(db: Database, component_id: str) -> Optional[dict]:
+    doc = db[LATEST_COLLECTION].find_one({"component_id": component_id}, READING_PROJECTION)
+    if doc is None:
+        # Fall back to the history if the materialized collection has not caught up yet
+        doc = db[READINGS_COLLECTION].find_one(
+            {"component_id": component_id}, {"_id": 0}, sort=[("timestamp", DESCENDING)]
+        )
+    return doc
+
+
+def get_reading_history(db: Database, component_id: str, limit: int = DEFAULT_PAGE_SIZE,
+                        before: Optional[str] = None) -> dict:
+    """Readings of one component, newest first, paginated by timestamp."""
+    query, limit = _history_query(component_id, limit, before)
+    cursor = db[READINGS_COLLECTION].find(query, {"_id": 0}).sort("timestamp", DESCENDING).limit(limit + 1)
+    return _page(list(cursor), limit, "timestamp")
+
+
+# ----------------------------
+# Async variants (pymongo AsyncDatabase), used by the API
+# ----------------------------
+async def list_components_page_async(db, limit: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None) -> dict:
+    query, limit = _components_page_query(limit, after)
+    cursor = (db[LATEST_COLLECTION].find(query, SUMMARY_PROJECTION)
+              .sort("component_id", ASCENDING).limit(limit + 1))
+    return _page(await cursor.to_list(None), limit, "component_id")
+
+
+async def get_latest_reading_async(db, component_id: str) -> Optional[dict]:
+    doc = await db[LATEST_COLLECTION].find_one({"component_id": component_id}, READING_PROJECTION)
+    if doc is None:
+        doc = await db[READINGS_COLLECTION].find_one(
+            {"component_id": component_id}, {"_id": 0}, sort=[("timestamp", DESCENDING)]
+        )
+    return doc
+
+
+async def get_reading_history_async(db, component_id: str, limit: int = DEFAULT_PAGE_SIZE,
+                                    before: Optional[str] = None) -> dict:
+    query, limit = _history_query(component_id, limit, before)
+    cursor = db[READINGS_COLLECTION].find(query, {"_id": 0}).sort("timestamp", DESCENDING).limit(limit + 1)
+    return _page(await cursor.to_list(None), limit, "timestamp")
+
+
+async def changed_components_async(db, since: float) -> List[str]:
+    """component_ids whose latest reading was written at or after `since` (a time.time() value)."""
+    cursor = db[LATEST_COLLECTION].find({"ingested_at": {"$gte": since}}, {"_id": 0, "component_id": 1})
+    return [doc["component_id"] for doc in await cursor.to_list(None)]
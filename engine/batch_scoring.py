@@ -0,0 +1,220 @@
+# engine/batch_scoring.py
+"""
+Parallel batch scoring: sensor history -> failure probabilities -> FIX/WAIT decisions.
+
+The input (JSONL or the Parquet store, see utils.sensor_store) is read in
+shards of `shard_size` readings. Shards are scored on a process pool with the
+saved model (no retraining), and each shard's decisions are written to its own
+part file as soon as it finishes:
+
+    <output>/part-00000.csv
+    <output>/part-00001.csv
+    <output>/_progress.json     # completed shards, used to resume
+
+A rerun with the same input, shard size and model skips the shards that are
+already done, so an interrupted nightly run picks up where it stopped. A run
+with a different model checkpoint is refused rather than mixed into the parts.
+
+For models trained on sliding-window features, the features are computed in
+the parent process, shard by shard in input order, before a shard is handed to
+a worker. Every component's history therefore goes through one FeatureStore
+in the same order whatever the number of workers, and a resumed run still
+replays the skipped shards into it. Readings are expected in arrival order
+(as the ingest appends them); within a shard they are sorted by timestamp.
+"""
+import glob
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from engine.cost_model import CostModel, as_cost_model
+from engine.decision_engine import apply_decision_engine
+from models.failure_predictor import feature_store_for, model_columns, predict_failure_probabilities
+from models.scoring_kernel import checkpoint_version, load_model
+from utils.sensor_store import iter_sensor_history
+
+PROGRESS_FILE = "_progress.json"
+FORMATS = ("csv", "parquet")
+
+# Per-process state, set once by _init_worker instead of pickling the model with every shard
+_worker: Dict[str, object] = {}
+
+
+@dataclass
+class ScoringStats:
+    shards_total: int = 0
+    shards_skipped: int = 0
+    rows: int = 0
+    fix: int = 0
+    seconds: float = 0.0
+    parts: List[str] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def _init_worker(model_path: str, cost_config: CostModel, threshold: Optional[float]):
+    _worker["model"] = load_model(model_path)
+    _worker["cost_config"] = cost_config
+    _worker["threshold"] = threshold
+
+
+def score_frame(model, sensor_df: pd.DataFrame, cost_config, threshold: Optional[float] = None,
+                feature_store=None, features: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Failure probabilities and decisions for one frame of readings. `cost_config`
+    is anything `engine.cost_model.as_cost_model` accepts; `threshold` defaults
+    to the cost model's. `features` are precomputed model inputs for the frame.
+    """
+    predicted = predict_failure_probabilities(model, sensor_df, feature_store, features)
+    return apply_decision_engine(predicted, cost_config, threshold=threshold)
+
+
+def part_path(output_dir: str, index: int, fmt: str) -> str:
+    return os.path.join(output_dir, f"part-{index:05d}.{fmt}")
+
+
+def _write_part(decisions: pd.DataFrame, path: str, fmt: str):
+    # Write to a temp name and rename, so a killed worker never leaves a half-written part behind
+    tmp_path = f"{path}.tmp"
+    if fmt == "parquet":
+        decisions.to_parquet(tmp_path, index=False)
+    else:
+        decisions.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def _score_shard(index: int, shard: pd.DataFrame, features: Optional[pd.DataFrame], output_dir: str,
+                 fmt: str):
+    decisions = score_frame(_worker["model"], shard, _worker["cost_config"], _worker["threshold"],
+                            features=features)
+    path = part_path(output_dir, index, fmt)
+    _write_part(decisions, path, fmt)
+    return index, len(decisions), int((decisions["decision"] == "FIX").sum())
+
+
+def model_fingerprint(model_path: str) -> dict:
+    """Identifies the model a run scored with: its checkpoint version and a digest of the file."""
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return {"path": os.path.abspath(model_path), "version": checkpoint_version(model_path),
+            "sha256": digest.hexdigest()[:16]}
+
+
+def _load_progress(output_dir: str, run_key: dict) -> set:
+    path = os.path.join(output_dir, PROGRESS_FILE)
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        progress = json.load(f)
+    if progress.get("run") != run_key:
+        raise ValueError(f"{output_dir} holds the output of a different run ({progress.get('run')}); "
+                         "use another output directory or disable resume")
+    return set(progress["completed"])
+
+
+def _save_progress(output_dir: str, run_key: dict, completed: set):
+    path = os.path.join(output_dir, PROGRESS_FILE)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump({"run": run_key, "completed": sorted(completed)}, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _clear_output(output_dir: str):
+    for path in glob.glob(os.path.join(output_dir, "part-*")) + [os.path.join(output_dir, PROGRESS_FILE)]:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def run_batch_scoring(input_path: str, output_dir: str, model_path: str, cost_config,
+                      threshold: Optional[float] = None, workers: Optional[int] = None, shard_size: int = 100_000,
+                      fmt: str = "csv", resume: bool = True, filters=None) -> ScoringStats:
+    """
+    Scores `input_path` shard by shard on `workers` processes (all cores by
+    default; 1 scores in-process) and writes one part file per shard to `output_dir`.
+    The cost model is resolved once, so a whole run uses (and is stamped with) one version.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format: {fmt}")
+    cost_model = as_cost_model(cost_config)
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"No saved model at {model_path}; train one with run_failure_model.py first")
+
+    os.makedirs(output_dir, exist_ok=True)
+    run_key = {"input": os.path.abspath(input_path), "shard_size": shard_size, "format": fmt,
+               "filters": [list(f) for f in filters] if filters else None,
+               "cost_model_version": cost_model.version, "threshold": threshold,
+               "model": model_fingerprint(model_path)}
+    if not resume:
+        _clear_output(output_dir)
+    completed = _load_progress(output_dir, run_key)
+
+    workers = workers or os.cpu_count() or 1
+    stats = ScoringStats()
+    start = time.perf_counter()
+    model = load_model(model_path)
+    columns = model_columns(model)
+    shards = iter_sensor_history(input_path, columns=columns, filters=filters, chunk_size=shard_size)
+    # One store for the whole run, fed every shard in order (see the module docstring)
+    feature_store = feature_store_for(model)
+
+    def shard_features(shard: pd.DataFrame) -> Optional[pd.DataFrame]:
+        return feature_store.update_frame(shard) if feature_store is not None else None
+
+    def record(result):
+        index, rows, fix = result
+        completed.add(index)
+        _save_progress(output_dir, run_key, completed)
+        stats.rows += rows
+        stats.fix += fix
+        logging.info("✅ Shard %d: %d rows, %d FIX", index, rows, fix)
+
+    if workers == 1:
+        _init_worker(model_path, cost_model, threshold)
+        for index, shard in enumerate(shards):
+            stats.shards_total += 1
+            features = shard_features(shard)
+            if index in completed:
+                stats.shards_skipped += 1
+                continue
+            record(_score_shard(index, shard, features, output_dir, fmt))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(model_path, cost_model, threshold)) as pool:
+            pending = set()
+            for index, shard in enumerate(shards):
+                stats.shards_total += 1
+                features = shard_features(shard)
+                if index in completed:
+                    stats.shards_skipped += 1
+                    continue
+                # Bound the shards held in memory to a couple per worker
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record(future.result())
+                pending.add(pool.submit(_score_shard, index, shard, features, output_dir, fmt))
+            for future in pending:
+                record(future.result())
+
+    stats.seconds = time.perf_counter() - start
+    stats.parts = [part_path(output_dir, i, fmt) for i in sorted(completed)]
+    return stats
+
+
+def read_decisions(output_dir: str) -> pd.DataFrame:
+    """Loads all part files of a scoring run, in shard order."""
+    parts = sorted(glob.glob(os.path.join(output_dir, "part-*.csv")) +
+                   glob.glob(os.path.join(output_dir, "part-*.parquet")))
+    frames = [pd.read_parquet(p) if p.endswith(".parquet") else pd.read_csv(p) for p in parts]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
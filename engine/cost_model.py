@@ -0,0 +1,223 @@
+# engine/cost_model.py
+"""
+The cost model shared by the API, the batch / stream scorers and the dashboard.
+
+config/cost_model.json holds default costs plus optional overrides:
+
+    {
+      "version": "2025-07-01",
+      "cost_failure": 5000, "early_fix_cost": 1000, "threshold": 0.6,
+      "vehicle_classes": {"bus": {"early_fix_cost": 400}},
+      "component_types": {"battery": {"cost_failure": 8000}},
+      "vehicles": {"VH-1042": {"cost_failure": 12000, "early_fix_cost": 2500}}
+    }
+
+Overrides apply from least to most specific: vehicle class, component type,
+vehicle. Each one may set either cost. Every decision is stamped with
+`CostModel.version`, which is the file's "version" label plus a digest of
+its content, so editing costs without bumping the label still changes it.
+
+`CostModelStore` reloads the file when it changes on disk, so long-running
+workers pick up new costs without a restart.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from utils.logger import logger
+
+COST_FIELDS = ("cost_failure", "early_fix_cost")
+OVERRIDE_TABLES = ("vehicle_classes", "component_types", "vehicles")
+# Configs written before the key was renamed spell it "failure_cost"
+LEGACY_ALIASES = {"failure_cost": "cost_failure"}
+
+DEFAULT_COSTS = {"cost_failure": 5000.0, "early_fix_cost": 1000.0, "threshold": 0.6}
+
+
+def format_cost(cost) -> str:
+    # Match f"{cost}" for the ints users put in the cost config, e.g. "1000" not "1000.0"
+    return str(int(cost)) if float(cost).is_integer() else str(cost)
+
+
+def _check_cost(value, where: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0:
+        raise ValueError(f"{where} must be a non-negative number, got {value!r}")
+    return float(value)
+
+
+@dataclass(frozen=True)
+class CostModel:
+    cost_failure: float = DEFAULT_COSTS["cost_failure"]
+    early_fix_cost: float = DEFAULT_COSTS["early_fix_cost"]
+    threshold: float = DEFAULT_COSTS["threshold"]
+    # table name -> key -> {"cost_failure": ..., "early_fix_cost": ...}
+    vehicle_classes: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    component_types: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    vehicles: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    version: str = "default"
+
+    def to_dict(self) -> dict:
+        return {
+            "cost_failure": self.cost_failure,
+            "early_fix_cost": self.early_fix_cost,
+            "threshold": self.threshold,
+            **{table: getattr(self, table) for table in OVERRIDE_TABLES},
+        }
+
+    def with_overrides(self, label: str = "override", **values) -> "CostModel":
+        """A copy with some settings replaced (e.g. the dashboard's sliders), with its own version."""
+        raw = dict(self.to_dict(), **values, version=f"{self.version.split('+')[0]}.{label}")
+        return parse_cost_model(raw)
+
+    def costs_for(self, vehicle_id: Optional[str] = None, component_type: Optional[str] = None,
+                  vehicle_class: Optional[str] = None) -> Tuple[float, float]:
+        """(cost_failure, early_fix_cost) for one component."""
+        costs = {"cost_failure": self.cost_failure, "early_fix_cost": self.early_fix_cost}
+        for table, key in zip(OVERRIDE_TABLES, (vehicle_class, component_type, vehicle_id)):
+            if key is not None:
+                costs.update(getattr(self, table).get(key, {}))
+        return costs["cost_failure"], costs["early_fix_cost"]
+
+    def lookup(self, vehicle_ids=None, component_types=None, vehicle_classes=None,
+               size: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized `costs_for`: per-row (cost_failure, early_fix_cost) arrays.
+
+        Each override table is joined with one hash lookup over the column, so
+        this stays linear in the number of rows regardless of how many
+        vehicles have their own costs. `size` is the row count when no column is given.
+        """
+        columns = dict(zip(OVERRIDE_TABLES, (vehicle_classes, component_types, vehicle_ids)))
+        n = size if size is not None else next((len(v) for v in columns.values() if v is not None), 0)
+        cost_failure = np.full(n, self.cost_failure)
+        cost_fix = np.full(n, self.early_fix_cost)
+
+        for table, values in columns.items():
+            overrides = getattr(self, table)
+            if values is None or not overrides:
+                continue
+            import pandas as pd
+
+            keys = pd.Index(list(overrides))
+            rows = keys.get_indexer(pd.Index(np.asarray(values, dtype=object)))
+            matched = rows >= 0
+            for name, target in zip(COST_FIELDS, (cost_failure, cost_fix)):
+                table_costs = np.array([overrides[key].get(name, np.nan) for key in keys], dtype=float)
+                mapped = np.where(matched, table_costs[rows], np.nan)
+                np.copyto(target, mapped, where=~np.isnan(mapped))
+        return cost_failure, cost_fix
+
+
+def parse_cost_model(raw: dict) -> CostModel:
+    """Validates a cost config dict and builds a CostModel; raises ValueError on bad input."""
+    if not isinstance(raw, dict):
+        raise ValueError("Cost model must be a JSON object")
+    raw = dict(raw)
+    for legacy, name in LEGACY_ALIASES.items():
+        if legacy in raw:
+            if name in raw:
+                raise ValueError(f"Cost model sets both {legacy!r} and {name!r}")
+            raw[name] = raw.pop(legacy)
+
+    unknown = set(raw) - set(DEFAULT_COSTS) - set(OVERRIDE_TABLES) - {"version"}
+    if unknown:
+        raise ValueError(f"Unknown cost model setting(s): {', '.join(sorted(unknown))}")
+
+    values = {name: _check_cost(raw.get(name, default), name) for name, default in DEFAULT_COSTS.items()}
+    if values["threshold"] > 1:
+        raise ValueError(f"threshold must be within [0, 1], got {values['threshold']}")
+
+    for table in OVERRIDE_TABLES:
+        entries = raw.get(table) or {}
+        if not isinstance(entries, dict):
+            raise ValueError(f"{table} must map names to costs")
+        parsed = {}
+        for key, costs in entries.items():
+            if not isinstance(costs, dict):
+                raise ValueError(f"{table}.{key} must be an object of costs")
+            costs = {LEGACY_ALIASES.get(name, name): cost for name, cost in costs.items()}
+            bad = set(costs) - set(COST_FIELDS)
+            if bad:
+                raise ValueError(f"Unknown cost(s) in {table}.{key}: {', '.join(sorted(bad))}")
+            parsed[str(key)] = {name: _check_cost(cost, f"{table}.{key}.{name}") for name, cost in costs.items()}
+        values[table] = parsed
+
+    digest = hashlib.sha256(json.dumps(values, sort_keys=True).encode()).hexdigest()[:8]
+    label = str(raw.get("version") or "unversioned")
+    return CostModel(**values, version=f"{label}+{digest}")
+
+
+def load_cost_model(path: str) -> CostModel:
+    with open(path) as f:
+        return parse_cost_model(json.load(f))
+
+
+def as_cost_model(source) -> CostModel:
+    """Accepts a CostModel, a CostModelStore (current model) or a raw config dict."""
+    if isinstance(source, CostModel):
+        return source
+    if isinstance(source, CostModelStore):
+        return source.get()
+    return parse_cost_model(source or {})
+
+
+class CostModelStore:
+    """
+    The current cost model for one process, reloaded when the file's
+    modification time changes (checked at most every `reload_interval_s`).
+    A file that fails validation is logged and the previous model is kept, or
+    the default costs if there is none yet.
+    """
+
+    def __init__(self, path: str, reload_interval_s: float = 5):
+        self.path = path
+        self.reload_interval = reload_interval_s
+        self.model: Optional[CostModel] = None
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+
+    def load(self) -> CostModel:
+        mtime = os.path.getmtime(self.path)
+        self.model = load_cost_model(self.path)
+        self._mtime = mtime
+        logger.info("Loaded cost model %s from %s", self.model.version, self.path)
+        return self.model
+
+    def get(self) -> CostModel:
+        if self.model is None:
+            try:
+                return self.load()
+            except FileNotFoundError:
+                logger.warning("No cost model at %s, using the default costs", self.path)
+            except Exception:
+                # Never fail the caller (e.g. an import-time get()); retry once the file changes
+                logger.exception("Invalid cost model at %s, using the default costs", self.path)
+                try:
+                    self._mtime = os.path.getmtime(self.path)
+                except OSError:
+                    pass
+            self.model = CostModel()
+            self._last_check = time.monotonic()
+            return self.model
+
+        now = time.monotonic()
+        if now - self._last_check >= self.reload_interval:
+            self._last_check = now
+            try:
+                changed = os.path.getmtime(self.path) != self._mtime
+            except OSError:
+                changed = False
+            if changed:
+                try:
+                    self.load()
+                except Exception:
+                    logger.exception("Failed to reload cost model, keeping version %s", self.model.version)
+        return self.model
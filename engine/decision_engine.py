@@ -1,5 +1,11 @@
+import numpy as np
 import pandas as pd
 
+from engine.cost_model import as_cost_model, format_cost
+
+# Columns carried through to the decision frame when present (used by the dashboard maps)
+PASSTHROUGH_COLUMNS = ["latitude", "longitude", "timestamp"]
+
 def recommend_action(prob, cost_failure, cost_fix, threshold=0.6):
     """
     Returns 'FIX' if expected cost of failure > early fix, else 'WAIT'.
@@ -10,21 +16,73 @@ def recommend_action(prob, cost_failure, cost_fix, threshold=0.6):
     reason = f"Expected cost: {expected_failure_cost:.2f} > fix cost: {cost_fix}" if decision == "FIX" else "Below threshold"
     return decision, reason
 
-def apply_decision_engine(sensor_df: pd.DataFrame, cost_config: dict):
-    results = []
-    for _, row in sensor_df.iterrows():
-        comp_id = row['component_id']
-        prob = row['failure_probability']
-        cost_failure = cost_config.get('cost_failure', 5000)
-        cost_fix = cost_config.get('early_fix_cost', 1000)
-        
-        decision, reason = recommend_action(prob, cost_failure, cost_fix)
-        results.append({
-            "component_id": comp_id,
-            "vehicle_id": row['vehicle_id'],
-            "failure_probability": prob,
-            "decision": decision,
-            "explanation": reason
-        })
-
-    return pd.DataFrame(results)
\ No newline at end of file
+def _fix_explanations(expected_failure_cost: np.ndarray, cost_fix: np.ndarray) -> list:
+    # String formatting is the only per-row Python work left, so it only runs for FIX rows
+    if len(cost_fix) and (cost_fix == cost_fix[0]).all():
+        suffix = f" > fix cost: {format_cost(cost_fix[0])}"
+        return [f"Expected cost: {cost:.2f}{suffix}" for cost in expected_failure_cost.tolist()]
+    return [
+        f"Expected cost: {cost:.2f} > fix cost: {format_cost(fix)}"
+        for cost, fix in zip(expected_failure_cost.tolist(), cost_fix.tolist())
+    ]
+
+def resolve_costs(sensor_df: pd.DataFrame, cost_config):
+    """
+    Returns per-row (cost_failure, cost_fix) arrays.
+
+    `cost_config` is a CostModel, a CostModelStore or a raw config dict (see
+    engine/cost_model.py). Precedence: `cost_failure` / `early_fix_cost`
+    columns on the frame, then the cost model's per-vehicle, per-component-type
+    and per-vehicle-class costs, then its defaults.
+    """
+    cost_model = as_cost_model(cost_config)
+    cost_failure, cost_fix = cost_model.lookup(
+        *(sensor_df[col] if col in sensor_df.columns else None
+          for col in ('vehicle_id', 'component_type', 'vehicle_class')),
+        size=len(sensor_df),
+    )
+
+    for key, target in (('cost_failure', cost_failure), ('early_fix_cost', cost_fix)):
+        if key in sensor_df.columns:
+            row_costs = sensor_df[key].to_numpy(dtype=float)
+            np.copyto(target, row_costs, where=~np.isnan(row_costs))
+
+    return cost_failure, cost_fix
+
+def apply_decision_engine(sensor_df: pd.DataFrame, cost_config, threshold=None):
+    """
+    Vectorized FIX/WAIT decisions for every row of `sensor_df`.
+
+    Same rule as `recommend_action`, computed over whole columns. Costs can be
+    overridden per vehicle, component type, vehicle class or row, see
+    `resolve_costs`. `threshold` defaults to the cost model's; every decision
+    is stamped with the cost model version.
+    """
+    cost_model = as_cost_model(cost_config)
+    threshold = cost_model.threshold if threshold is None else threshold
+    prob = sensor_df['failure_probability'].to_numpy(dtype=float)
+    cost_failure, cost_fix = resolve_costs(sensor_df, cost_model)
+
+    expected_failure_cost = prob * cost_failure
+    fix = (expected_failure_cost > cost_fix) | (prob >= threshold)
+
+    explanation = np.full(len(prob), "Below threshold", dtype=object)
+    explanation[fix] = _fix_explanations(expected_failure_cost[fix], cost_fix[fix])
+
+    index = pd.RangeIndex(len(sensor_df))
+    vehicle_id = (sensor_df['vehicle_id'].reset_index(drop=True) if 'vehicle_id' in sensor_df.columns
+                  else pd.Series('N/A', index=index))
+    results = pd.DataFrame({
+        "component_id": sensor_df['component_id'].reset_index(drop=True),
+        "vehicle_id": vehicle_id,
+        "failure_probability": prob,
+        "decision": pd.Series(np.where(fix, "FIX", "WAIT"), index=index, dtype=object),
+        "explanation": pd.Series(explanation, index=index, dtype=object),
+        "expected_failure_cost": expected_failure_cost,
+        "cost_model_version": pd.Series(cost_model.version, index=index, dtype=object),
+    }, index=index)
+    for col in PASSTHROUGH_COLUMNS:
+        if col in sensor_df.columns:
+            results[col] = sensor_df[col].to_numpy()
+
+    return results
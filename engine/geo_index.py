@@ -0,0 +1,130 @@
+# engine/geo_index.py
+"""
+In-memory spatial index over component locations, for dispatch queries like
+"FIX components within 50 km of this depot" or "the 10 nearest to it".
+
+Points are bucketed into a lat/lon grid of `cell_deg` degrees and stored
+sorted by cell, so each cell is one contiguous slice. A query visits only
+the cells that intersect the search circle's bounding box, then keeps the
+candidates whose haversine distance is within the radius. k-nearest
+queries search a growing radius until it holds k points.
+
+Built from the latest reading per component (one point per component); the
+API rebuilds it periodically from MongoDB (see api/utils/geo.py) and the
+dashboard builds it from the scored frame it already has.
+"""
+import math
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = math.pi * EARTH_RADIUS_KM / 180
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in km; arguments broadcast like NumPy arrays."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class GridIndex:
+    def __init__(self, latitudes, longitudes, data: Optional[Dict[str, Sequence]] = None, cell_deg: float = 0.5):
+        """
+        `data` holds per-point columns returned with the results (e.g. component_id,
+        failure_probability). Points without a location are dropped.
+        """
+        lat = np.asarray(latitudes, dtype=float)
+        lon = np.asarray(longitudes, dtype=float)
+        located = ~(np.isnan(lat) | np.isnan(lon))
+        self.cell_deg = cell_deg
+
+        rows = np.flatnonzero(located)
+        cell_i = np.floor(lat[rows] / cell_deg).astype(np.int64)
+        cell_j = np.floor(lon[rows] / cell_deg).astype(np.int64)
+        order = np.lexsort((cell_j, cell_i))
+        rows, cell_i, cell_j = rows[order], cell_i[order], cell_j[order]
+
+        self.lat = lat[rows]
+        self.lon = lon[rows]
+        self.data = {name: np.asarray(values)[rows] for name, values in (data or {}).items()}
+
+        # (i, j) -> slice of the sorted points in that cell
+        starts = np.flatnonzero(np.r_[True, (np.diff(cell_i) != 0) | (np.diff(cell_j) != 0)]) if len(rows) else []
+        ends = np.r_[starts[1:], len(rows)] if len(rows) else []
+        self._cells = {(int(cell_i[s]), int(cell_j[s])): (int(s), int(e)) for s, e in zip(starts, ends)}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, lat_col: str = "location.latitude", lon_col: str = "location.longitude",
+                   columns: Optional[Sequence[str]] = None, cell_deg: float = 0.5) -> "GridIndex":
+        columns = [c for c in (columns or df.columns) if c not in (lat_col, lon_col)]
+        return cls(df[lat_col].to_numpy(dtype=float), df[lon_col].to_numpy(dtype=float),
+                   {c: df[c].to_numpy() for c in columns}, cell_deg=cell_deg)
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    @property
+    def n_cells(self) -> int:
+        return len(self._cells)
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Indices of the points in the cells overlapping the circle's bounding box."""
+        dlat = radius_km / KM_PER_DEG_LAT
+        lat_lo, lat_hi = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+        # Longitude degrees shrink toward the poles; use the widest latitude of the box
+        cos_lat = math.cos(math.radians(max(abs(lat_lo), abs(lat_hi))))
+        if cos_lat < 1e-6 or radius_km / (KM_PER_DEG_LAT * cos_lat) >= 180:
+            return np.arange(len(self))
+        dlon = radius_km / (KM_PER_DEG_LAT * cos_lat)
+
+        i_lo, i_hi = math.floor(lat_lo / self.cell_deg), math.floor(lat_hi / self.cell_deg)
+        j_lo, j_hi = math.floor((lon - dlon) / self.cell_deg), math.floor((lon + dlon) / self.cell_deg)
+        # Column offsets wrap around the antimeridian
+        span = round(360 / self.cell_deg)
+        if (i_hi - i_lo + 1) * (j_hi - j_lo + 1) > len(self._cells):
+            # The box spans more grid cells than are occupied: walk the occupied ones instead
+            cells = [c for c in self._cells if i_lo <= c[0] <= i_hi and (c[1] - j_lo) % span <= j_hi - j_lo]
+        else:
+            half = span // 2
+            cells = {(i, (j + half) % span - half) for i in range(i_lo, i_hi + 1) for j in range(j_lo, j_hi + 1)}
+        slices = sorted(self._cells[c] for c in cells if c in self._cells)
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(s, e) for s, e in slices])
+
+    def _results(self, idx: np.ndarray, distances: np.ndarray) -> pd.DataFrame:
+        order = np.argsort(distances, kind="stable")
+        idx, distances = idx[order], distances[order]
+        return pd.DataFrame({
+            **{name: values[idx] for name, values in self.data.items()},
+            "latitude": self.lat[idx],
+            "longitude": self.lon[idx],
+            "distance_km": distances,
+        })
+
+    def within(self, lat: float, lon: float, radius_km: float, limit: Optional[int] = None) -> pd.DataFrame:
+        """Points within `radius_km` of (lat, lon), nearest first."""
+        idx = self._candidates(lat, lon, radius_km)
+        distances = haversine_km(lat, lon, self.lat[idx], self.lon[idx])
+        keep = distances <= radius_km
+        result = self._results(idx[keep], distances[keep])
+        return result.head(limit) if limit is not None else result
+
+    def nearest(self, lat: float, lon: float, k: int = 10) -> pd.DataFrame:
+        """The `k` points nearest to (lat, lon), nearest first."""
+        k = min(k, len(self))
+        if k <= 0:
+            return self._results(np.empty(0, dtype=np.int64), np.empty(0))
+        radius = self.cell_deg * KM_PER_DEG_LAT
+        while True:
+            idx = self._candidates(lat, lon, radius)
+            distances = haversine_km(lat, lon, self.lat[idx], self.lon[idx])
+            # Everything within `radius` was visited, so k points inside it are the true k nearest
+            if (distances <= radius).sum() >= k or radius >= MAX_DISTANCE_KM:
+                top = np.argpartition(distances, k - 1)[:k]
+                return self._results(idx[top], distances[top])
+            radius *= 2
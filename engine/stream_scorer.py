@@ -0,0 +1,318 @@
+# engine/stream_scorer.py
+"""
+Real-time scoring of the sensor stream.
+
+Readings arrive as JSONL lines from a tailed file, stdin or a local socket.
+They are validated against api.models.schemas.SensorInput and scored in
+micro-batches with the saved failure model and the decision engine. The
+decisions are appended to a JSONL sink. A batch is closed after `max_wait_ms`
+or `max_batch_size` readings, whichever comes first, so a reading waits at most
+one window before it is scored.
+
+End-to-end latency is measured from the moment a line is read to the moment
+its decision is written, and reported as p50 / p99.
+
+A batch that fails to score (e.g. the cost config or model cannot handle it) is
+logged, counted and, with a dead-letter path, its raw lines are appended there;
+the scorer then carries on with the next batch.
+"""
+import asyncio
+import os
+import stat
+import sys
+import time
+from collections import deque
+from typing import IO, List, Optional, Tuple
+
+import numpy as np
+import orjson
+import pandas as pd
+from pydantic import ValidationError
+
+from api.models.schemas import SensorInput
+from api.utils.model_server import ModelServer
+from api.utils.processor import sensor_inputs_to_frame
+from engine.batch_scoring import score_frame
+from models.failure_predictor import feature_store_for
+from utils.logger import logger
+
+# (arrival time from time.monotonic(), raw line); the queue ends with None once the source is done
+Line = Tuple[float, bytes]
+
+
+class LatencyTracker:
+    """Keeps the latencies of the last `window` readings for percentile reports."""
+
+    def __init__(self, window: int = 100_000):
+        self._latencies = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, latencies_s: np.ndarray):
+        self._latencies.extend(latencies_s.tolist())
+        self.count += len(latencies_s)
+
+    def percentiles(self) -> dict:
+        if not self._latencies:
+            return {"p50_ms": None, "p99_ms": None}
+        p50, p99 = np.percentile(np.fromiter(self._latencies, dtype=float), [50, 99])
+        return {"p50_ms": round(p50 * 1000, 2), "p99_ms": round(p99 * 1000, 2)}
+
+
+class JsonlSink:
+    """Appends one JSON line per decision to a file, or to stdout for "-"."""
+
+    def __init__(self, path: str = "-", fix_only: bool = False):
+        self.fix_only = fix_only
+        self._file: IO[bytes] = sys.stdout.buffer if path == "-" else open(path, "ab")
+
+    def write(self, decisions: pd.DataFrame):
+        if self.fix_only:
+            decisions = decisions[decisions["decision"] == "FIX"]
+        if decisions.empty:
+            return
+        records = decisions.to_dict("records")
+        self._file.write(b"".join(orjson.dumps(record) + b"\n" for record in records))
+        self._file.flush()
+
+    def close(self):
+        if self._file is not sys.stdout.buffer:
+            self._file.close()
+
+
+# ----------------------------
+# Sources
+# ----------------------------
+async def tail_jsonl(path: str, queue: asyncio.Queue, from_start: bool = False, follow: bool = True,
+                     poll_interval_s: float = 0.05):
+    """
+    Feeds the lines appended to `path` into `queue` (like `tail -f`).
+
+    Starts at the end of the file unless `from_start`; reopens the file when it
+    is truncated or replaced. With `follow=False` it returns at end of file.
+    """
+    f = open(path, "rb")
+    if not from_start:
+        f.seek(0, os.SEEK_END)
+    partial = b""
+    try:
+        while True:
+            line = f.readline()
+            if line.endswith(b"\n"):
+                await queue.put((time.monotonic(), partial + line))
+                partial = b""
+                continue
+            # Incomplete last line: keep it until the writer finishes it
+            partial += line
+            if not follow:
+                if partial.strip():
+                    await queue.put((time.monotonic(), partial))
+                break
+            try:
+                current = os.stat(path)
+            except FileNotFoundError:
+                current = None
+            if current is not None and (current.st_ino != os.fstat(f.fileno()).st_ino or current.st_size < f.tell()):
+                logger.info("%s was rotated or truncated, reopening", path)
+                f.close()
+                f = open(path, "rb")
+                partial = b""
+                continue
+            await asyncio.sleep(poll_interval_s)
+    finally:
+        f.close()
+
+
+async def read_lines(reader: asyncio.StreamReader, queue: asyncio.Queue):
+    """Feeds the lines of an asyncio stream (stdin, a socket connection) into `queue`."""
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        await queue.put((time.monotonic(), line))
+
+
+async def read_stdin(queue: asyncio.Queue):
+    if stat.S_ISREG(os.fstat(sys.stdin.fileno()).st_mode):
+        # Redirected file (`< readings.jsonl`): pipe transports do not support regular files
+        for line in sys.stdin.buffer:
+            await queue.put((time.monotonic(), line))
+        return
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=1 << 20)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    await read_lines(reader, queue)
+
+
+async def serve_unix_socket(path: str, queue: asyncio.Queue):
+    """Accepts any number of writers on a Unix socket; runs until cancelled."""
+    async def handle(reader, writer):
+        try:
+            await read_lines(reader, queue)
+        finally:
+            writer.close()
+
+    if os.path.exists(path):
+        os.remove(path)
+    server = await asyncio.start_unix_server(handle, path=path, limit=1 << 20)
+    logger.info("Listening for sensor readings on %s", path)
+    async with server:
+        await server.serve_forever()
+
+
+# ----------------------------
+# Scoring
+# ----------------------------
+class StreamScorer:
+    def __init__(self, model_path: str, cost_config, sink: JsonlSink, threshold: Optional[float] = None,
+                 max_batch_size: int = 500, max_wait_ms: float = 200, reload_interval_s: float = 2,
+                 dead_letter_path: Optional[str] = None):
+        # Only ModelServer's loading / hot-reload is used; batches are scored here directly
+        self.model = ModelServer(model_path, reload_interval_s=reload_interval_s)
+        self.model.load()
+        # Window features need every reading of a component, so the store lives as long as the scorer
+        self.feature_store = feature_store_for(self.model.model)
+        # A CostModelStore here picks up cost changes between batches
+        self.cost_config = cost_config
+        self.sink = sink
+        self.threshold = threshold
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._dead_letter: Optional[IO[bytes]] = open(dead_letter_path, "ab") if dead_letter_path else None
+
+        self.latency = LatencyTracker()
+        self.scored = 0
+        self.invalid = 0
+        self.fix = 0
+        self.failed = 0          # readings in batches that failed to score
+        self.failed_batches = 0
+
+    def parse(self, lines: List[Line]) -> Tuple[List[SensorInput], np.ndarray]:
+        """Validates raw lines; returns the readings and their arrival times, skipping invalid lines."""
+        readings, arrivals = [], []
+        for arrival, raw in lines:
+            if not raw.strip():
+                continue
+            try:
+                readings.append(SensorInput.model_validate_json(raw))
+                arrivals.append(arrival)
+            except ValidationError as e:
+                self.invalid += 1
+                logger.debug("Skipping invalid reading: %s", e.errors()[0].get("msg"))
+        return readings, np.array(arrivals, dtype=float)
+
+    def score_batch(self, lines: List[Line]) -> pd.DataFrame:
+        """Scores one micro-batch, writes it to the sink and records latencies."""
+        readings, arrivals = self.parse(lines)
+        if not readings:
+            return pd.DataFrame()
+
+        self.model.maybe_reload()
+        self._refresh_feature_store()
+        if self.feature_store is not None:
+            frame = pd.json_normalize([reading.model_dump() for reading in readings])
+        else:
+            frame = sensor_inputs_to_frame(readings)
+        decisions = score_frame(self.model.model, frame, self.cost_config, self.threshold, self.feature_store)
+        decisions["timestamp"] = [reading.timestamp for reading in readings]
+        self.sink.write(decisions)
+
+        self.latency.record(time.monotonic() - arrivals)
+        self.scored += len(decisions)
+        self.fix += int((decisions["decision"] == "FIX").sum())
+        return decisions
+
+    def _refresh_feature_store(self):
+        """Starts a new feature store when a reloaded model uses a different window (or none)."""
+        window = getattr(self.model.model, "feature_window_", None)
+        current = self.feature_store.window if self.feature_store is not None else None
+        if window != current:
+            logger.info("Model feature window changed from %s to %s, resetting the feature store", current, window)
+            self.feature_store = feature_store_for(self.model.model)
+
+    def _dead_letter_batch(self, lines: List[Line]):
+        if self._dead_letter is None:
+            return
+        self._dead_letter.write(b"".join(raw if raw.endswith(b"\n") else raw + b"\n" for _, raw in lines))
+        self._dead_letter.flush()
+
+    async def _collect_batch(self, queue: asyncio.Queue) -> Tuple[List[Line], bool]:
+        first = await queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = first[0] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def consume(self, queue: asyncio.Queue):
+        """Scores batches from `queue` until it yields None."""
+        finished = False
+        while not finished:
+            batch, finished = await self._collect_batch(queue)
+            if batch:
+                # Scoring runs off the event loop so sources keep reading meanwhile
+                try:
+                    await asyncio.to_thread(self.score_batch, batch)
+                except Exception:
+                    # One bad batch must not stop the stream
+                    self.failed += len(batch)
+                    self.failed_batches += 1
+                    logger.exception("Failed to score a batch of %d readings", len(batch))
+                    self._dead_letter_batch(batch)
+
+    def stats(self) -> dict:
+        return {"scored": self.scored, "invalid": self.invalid, "fix": self.fix, "failed": self.failed,
+                **self.latency.percentiles()}
+
+    async def report(self, interval_s: float):
+        last_scored, last_time = 0, time.monotonic()
+        while True:
+            await asyncio.sleep(interval_s)
+            now = time.monotonic()
+            stats = self.stats()
+            rate = (stats["scored"] - last_scored) / (now - last_time)
+            last_scored, last_time = stats["scored"], now
+            logger.info("📈 %d scored (%.0f/s), %d FIX, %d invalid, %d failed, latency p50 %s ms / p99 %s ms",
+                        stats["scored"], rate, stats["fix"], stats["invalid"], stats["failed"], stats["p50_ms"],
+                        stats["p99_ms"])
+
+    async def run(self, source, report_interval_s: Optional[float] = 10.0, queue_size: int = 10_000) -> dict:
+        """
+        Runs `source(queue)` and scores what it produces until the source returns;
+        an error in the source is raised here. The bounded queue pushes back on
+        the source when scoring falls behind.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+        async def feed():
+            await source(queue)
+            await queue.put(None)
+
+        feeder = asyncio.create_task(feed())
+        consumer = asyncio.create_task(self.consume(queue))
+        tasks = [feeder, consumer]
+        if report_interval_s:
+            tasks.append(asyncio.create_task(self.report(report_interval_s)))
+        try:
+            done, _ = await asyncio.wait({feeder, consumer}, return_when=asyncio.FIRST_COMPLETED)
+            if feeder in done and feeder.exception() is not None:
+                raise feeder.exception()
+            await consumer
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.sink.close()
+            if self._dead_letter is not None:
+                self._dead_letter.close()
+        return self.stats()
@@ -0,0 +1,172 @@
+# engine/what_if.py
+"""
+What-if analysis for the decision engine's threshold and costs.
+
+The FIX/WAIT rule (engine/decision_engine.py) fixes a component when
+`p >= threshold` or `p * cost_failure > early_fix_cost`. With the
+probabilities sorted once, every FIX set is a suffix of the sorted order, so
+for any threshold and costs the outcome is two binary searches plus a lookup
+in the cumulative sum of probabilities:
+
+    k            = first index that is FIXed
+    fix count    = n - k
+    expected cost= early_fix_cost * (n - k) + cost_failure * sum(p[:k])
+
+`WhatIfSweep` holds the sorted probabilities for one scored upload so the
+dashboard's sliders never rescore. `evaluate` answers one setting (with
+per-row costs when the cost model has overrides) and `grid` precomputes a
+whole threshold x failure cost x fix cost grid.
+
+With per-row costs the FIX set is no longer a suffix of the probability order.
+A row WAITs when `p < threshold` and `p * cf_i / cx_i <= fix_scale / failure_scale`,
+so the grid buckets rows by those two keys once and reads every cell's WAIT
+count and costs off a 2-D cumulative sum.
+
+Savings are measured against running everything to failure (all WAIT).
+"""
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+ArrayOrFloat = Union[float, np.ndarray]
+
+
+@dataclass
+class WhatIfResult:
+    threshold: float
+    n_fix: int
+    n_wait: int
+    expected_cost: float
+    baseline_cost: float
+
+    @property
+    def savings(self) -> float:
+        return self.baseline_cost - self.expected_cost
+
+
+class WhatIfSweep:
+    def __init__(self, probabilities):
+        probabilities = np.asarray(probabilities, dtype=float)
+        self.order = np.argsort(probabilities, kind="stable")
+        self.sorted_p = probabilities[self.order]
+        # cum_p[k] = sum of the k smallest probabilities
+        self.cum_p = np.r_[0.0, np.cumsum(self.sorted_p)]
+
+    def __len__(self) -> int:
+        return len(self.sorted_p)
+
+    def _fix_start(self, thresholds, cost_failure, cost_fix) -> np.ndarray:
+        """Index of the first FIXed row in sorted order, broadcast over the arguments."""
+        by_threshold = np.searchsorted(self.sorted_p, thresholds, side="left")
+        # p * cost_failure > cost_fix  <=>  p > cost_fix / cost_failure (never, if failures cost nothing)
+        cost_failure = np.asarray(cost_failure, dtype=float)
+        ratio = np.divide(cost_fix, cost_failure, out=np.full(np.broadcast(cost_fix, cost_failure).shape, np.inf),
+                          where=cost_failure > 0)
+        by_cost = np.searchsorted(self.sorted_p, ratio, side="right")
+        return np.minimum(by_threshold, by_cost)
+
+    def evaluate(self, threshold: float, cost_failure: ArrayOrFloat, cost_fix: ArrayOrFloat) -> WhatIfResult:
+        """
+        Outcome of one slider setting. Scalar costs take O(log n); per-row cost
+        arrays (in the original row order) take one vectorized pass.
+        """
+        n = len(self)
+        if np.ndim(cost_failure) == 0 and np.ndim(cost_fix) == 0:
+            k = int(self._fix_start(threshold, cost_failure, cost_fix))
+            return WhatIfResult(threshold, n - k, k, float(cost_fix * (n - k) + cost_failure * self.cum_p[k]),
+                                float(cost_failure * self.cum_p[-1]))
+
+        cost_failure = np.broadcast_to(np.asarray(cost_failure, dtype=float), (n,))[self.order]
+        cost_fix = np.broadcast_to(np.asarray(cost_fix, dtype=float), (n,))[self.order]
+        expected_failure_cost = self.sorted_p * cost_failure
+        fix = (expected_failure_cost > cost_fix) | (self.sorted_p >= threshold)
+        n_fix = int(fix.sum())
+        return WhatIfResult(threshold, n_fix, n - n_fix,
+                            float(np.where(fix, cost_fix, expected_failure_cost).sum()),
+                            float(expected_failure_cost.sum()))
+
+    def grid(self, thresholds: Sequence[float], failure_costs: Sequence[float], fix_costs: Sequence[float],
+             row_cost_failure: Optional[np.ndarray] = None, row_cost_fix: Optional[np.ndarray] = None
+             ) -> pd.DataFrame:
+        """
+        Every combination of threshold, failure cost and fix cost. For
+        fleet-wide costs this is one broadcast: O(n log n) for the sort (done
+        once) plus O(log n) per cell.
+
+        With per-row costs (`row_cost_failure` / `row_cost_fix`, in the
+        original row order, as `evaluate` takes them), `failure_costs` and
+        `fix_costs` are scale factors applied to every row's costs, so a cell
+        matches `evaluate(threshold, f * row_cost_failure, x * row_cost_fix)`.
+        """
+        if row_cost_failure is not None or row_cost_fix is not None:
+            return self._scaled_grid(thresholds, failure_costs, fix_costs,
+                                     1.0 if row_cost_failure is None else row_cost_failure,
+                                     1.0 if row_cost_fix is None else row_cost_fix)
+        t = np.asarray(thresholds, dtype=float)[:, None, None]
+        cf = np.asarray(failure_costs, dtype=float)[None, :, None]
+        cx = np.asarray(fix_costs, dtype=float)[None, None, :]
+        n = len(self)
+
+        k = self._fix_start(t, cf, cx)
+        expected_cost = cx * (n - k) + cf * self.cum_p[k]
+        baseline_cost = np.broadcast_to(cf * self.cum_p[-1], k.shape)
+        t, cf, cx = np.broadcast_arrays(t, cf, cx)
+        return pd.DataFrame({
+            "threshold": t.ravel(),
+            "cost_failure": cf.ravel(),
+            "early_fix_cost": cx.ravel(),
+            "n_fix": (n - k).ravel(),
+            "n_wait": k.ravel(),
+            "expected_cost": expected_cost.ravel(),
+            "baseline_cost": baseline_cost.ravel(),
+            "savings": (baseline_cost - expected_cost).ravel(),
+        })
+
+    def _scaled_grid(self, thresholds, failure_scales, fix_scales, row_cost_failure, row_cost_fix) -> pd.DataFrame:
+        n = len(self)
+        t = np.asarray(thresholds, dtype=float)
+        f, x = (a.ravel() for a in np.meshgrid(np.asarray(failure_scales, dtype=float),
+                                               np.asarray(fix_scales, dtype=float), indexing="ij"))
+        cost_failure = np.broadcast_to(np.asarray(row_cost_failure, dtype=float), (n,))[self.order]
+        cost_fix = np.broadcast_to(np.asarray(row_cost_fix, dtype=float), (n,))[self.order]
+        expected_failure_cost = self.sorted_p * cost_failure
+
+        # p * cf * f > cx * x  <=>  ratio > x / f; rows that cost nothing to fix are FIXed by any positive risk
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(cost_fix > 0, expected_failure_cost / cost_fix,
+                             np.where(expected_failure_cost > 0, np.inf, -np.inf))
+            cutoff = np.where(f > 0, x / f, np.inf)
+        cutoffs, cell_cutoff = np.unique(cutoff, return_inverse=True)
+
+        # Row i WAITs in cell (j, k) iff j >= a[i] (p < t[j]) and k >= b[i] (ratio <= cutoffs[k])
+        t_order = np.argsort(t, kind="stable")
+        a = np.searchsorted(t[t_order], self.sorted_p, side="right")
+        b = np.searchsorted(cutoffs, ratio, side="left")
+        shape = (len(t) + 1, len(cutoffs) + 1)
+        cells = np.ravel_multi_index((a, b), shape)
+
+        def waiting(weights):
+            counts = np.bincount(cells, weights=weights, minlength=shape[0] * shape[1]).reshape(shape)
+            return counts.cumsum(axis=0).cumsum(axis=1)[:-1, :-1]
+
+        n_wait = np.empty((len(t), len(f)), dtype=np.int64)
+        wait_failure_cost = np.empty((len(t), len(f)))
+        wait_fix_cost = np.empty((len(t), len(f)))
+        n_wait[t_order] = np.rint(waiting(None)[:, cell_cutoff]).astype(np.int64)
+        wait_failure_cost[t_order] = waiting(expected_failure_cost)[:, cell_cutoff]
+        wait_fix_cost[t_order] = waiting(cost_fix)[:, cell_cutoff]
+
+        expected_cost = f * wait_failure_cost + x * (cost_fix.sum() - wait_fix_cost)
+        baseline_cost = np.broadcast_to(f * expected_failure_cost.sum(), expected_cost.shape)
+        return pd.DataFrame({
+            "threshold": np.repeat(t, len(f)),
+            "failure_cost_scale": np.tile(f, len(t)),
+            "fix_cost_scale": np.tile(x, len(t)),
+            "n_fix": (n - n_wait).ravel(),
+            "n_wait": n_wait.ravel(),
+            "expected_cost": expected_cost.ravel(),
+            "baseline_cost": baseline_cost.ravel(),
+            "savings": (baseline_cost - expected_cost).ravel(),
+        })
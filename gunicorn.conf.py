@@ -0,0 +1,31 @@
+# gunicorn.conf.py
+# Run with: gunicorn -c gunicorn.conf.py api.main:app
+# Same setup as `python -m api.serving`, under gunicorn's process manager (worker restarts, HUP reloads).
+from api.serving import default_workers, start_serving
+from utils import config
+from utils.logger import logger
+
+bind = f"{config.API_HOST}:{config.API_PORT}"
+workers = default_workers()
+worker_class = "uvicorn.workers.UvicornWorker"
+graceful_timeout = config.API_GRACEFUL_TIMEOUT_S
+timeout = 60
+keepalive = 5
+# Recycle workers now and then so slow leaks cannot build up; jitter keeps them from restarting together
+max_requests = 50_000
+max_requests_jitter = 5_000
+
+
+def on_starting(server):
+    # Export the shared kernel in the master before any worker forks, and re-export it on new checkpoints.
+    # server.cfg.workers, not the default above: -w / --workers / GUNICORN_CMD_ARGS override it.
+    model_path = start_serving(server.cfg.workers)
+    logger.info("Starting %d workers (model: %s)", server.cfg.workers, model_path)
+
+
+def worker_int(worker):
+    logger.info("Worker %s interrupted, finishing in-flight requests", worker.pid)
+
+
+def worker_exit(server, worker):
+    logger.info("Worker %s exited", worker.pid)
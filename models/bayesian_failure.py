@@ -0,0 +1,178 @@
+# models/bayesian_failure.py
+"""
+Bayesian logistic failure model.
+
+The posterior is fit offline with a Laplace approximation: a Gaussian prior
+on the (standardized) weights, a MAP fit by Newton's method, and a Gaussian
+posterior around the MAP with the inverse Hessian as covariance. Draws from
+that posterior are saved as one small float32 matrix in an .npz file:
+
+    draws          (n_draws, n_features + 1)   last column is the intercept
+    feature_names  (n_features,)
+    center, scale  (n_features,)               standardization applied before the draws
+
+Serving needs no sampling: one matrix multiply gives the logits of every
+draw for a whole batch, and the posterior mean and credible interval of the
+failure probability are read off those.
+
+Usage:
+    python -m models.bayesian_failure --draws 1000 [--window 20]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+
+from models.feature_store import FeatureStore
+from utils import config
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + np.tanh(0.5 * z))
+
+
+def fit_laplace(X: np.ndarray, y: np.ndarray, prior_scale: float = 2.5, intercept_scale: float = 10.0,
+                max_iter: int = 100, tol: float = 1e-8):
+    """
+    MAP fit and Laplace approximation of a logistic regression on standardized `X`.
+    Returns (mean, covariance) of the Gaussian posterior over [weights..., intercept].
+    """
+    n, d = X.shape
+    Z = np.hstack([X, np.ones((n, 1))])
+    precision = np.diag(np.r_[np.full(d, prior_scale ** -2), intercept_scale ** -2])
+    beta = np.zeros(d + 1)
+
+    for _ in range(max_iter):
+        p = _sigmoid(Z @ beta)
+        gradient = Z.T @ (y - p) - precision @ beta
+        hessian = (Z * (p * (1 - p))[:, None]).T @ Z + precision
+        step = np.linalg.solve(hessian, gradient)
+        beta += step
+        if np.abs(step).max() < tol:
+            break
+
+    p = _sigmoid(Z @ beta)
+    hessian = (Z * (p * (1 - p))[:, None]).T @ Z + precision
+    return beta, np.linalg.inv(hessian)
+
+
+class BayesianFailureModel:
+    def __init__(self, draws: np.ndarray, feature_names: List[str], center: np.ndarray, scale: np.ndarray,
+                 feature_window: Optional[int] = None):
+        self.draws = draws.astype(np.float32)
+        self.feature_names = list(feature_names)
+        self.center = center
+        self.scale = scale
+        self.feature_window = feature_window
+        # Weights and intercept as one (n_features + 1, n_draws) matrix, standardization folded in
+        weights = self.draws[:, :-1] / scale[None, :]
+        intercept = self.draws[:, -1] - weights @ center
+        self._coef = np.vstack([weights.T, intercept[None, :]]).astype(np.float32)
+
+    @classmethod
+    def fit(cls, X: pd.DataFrame, y: pd.Series, n_draws: int = 1000, prior_scale: float = 2.5, seed: int = 42,
+            feature_window: Optional[int] = None) -> "BayesianFailureModel":
+        values = X.to_numpy(dtype=float)
+        center = values.mean(axis=0)
+        scale = values.std(axis=0)
+        scale[scale == 0] = 1.0
+        mean, covariance = fit_laplace((values - center) / scale, y.to_numpy(dtype=float), prior_scale=prior_scale)
+        draws = np.random.default_rng(seed).multivariate_normal(mean, covariance, size=n_draws, method="cholesky")
+        return cls(draws, list(X.columns), center, scale, feature_window)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # np.savez appends .npz to names without it, so write through an open file for the atomic rename
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, draws=self.draws, feature_names=np.array(self.feature_names), center=self.center,
+                     scale=self.scale, feature_window=np.array(self.feature_window or 0))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BayesianFailureModel":
+        with np.load(path) as data:
+            return cls(data["draws"], data["feature_names"].tolist(), data["center"], data["scale"],
+                       int(data["feature_window"]) or None)
+
+    @property
+    def n_draws(self) -> int:
+        return len(self.draws)
+
+    def probability_draws(self, X) -> np.ndarray:
+        """(n_rows, n_draws) failure probabilities, one column per posterior draw."""
+        values = np.asarray(X[self.feature_names] if hasattr(X, "columns") else X, dtype=np.float32)
+        return _sigmoid(values @ self._coef[:-1] + self._coef[-1])
+
+    def intervals(self, X, credible_level: float = 0.9) -> Dict[str, np.ndarray]:
+        """Posterior mean failure probability and equal-tailed credible interval per row, as arrays."""
+        draws = self.probability_draws(X)
+        tail = (1 - credible_level) / 2 * 100
+        lower, upper = np.percentile(draws, [tail, 100 - tail], axis=1)
+        return {
+            "failure_probability": draws.mean(axis=1, dtype=np.float64),
+            "lower": lower.astype(float),
+            "upper": upper.astype(float),
+        }
+
+    def predict(self, X, credible_level: float = 0.9) -> pd.DataFrame:
+        """`intervals` as a frame, index aligned with `X` when it is one."""
+        import pandas as pd
+
+        return pd.DataFrame(self.intervals(X, credible_level), index=X.index if hasattr(X, "columns") else None)
+
+
+def train_bayesian_failure_model(sensor_df: pd.DataFrame, path: Optional[str] = None, n_draws: int = 1000,
+                                 feature_store: Optional[FeatureStore] = None, seed: int = 42) -> BayesianFailureModel:
+    """Fits the posterior on the same features and labels as models.failure_predictor and saves it."""
+    # Training helpers import sklearn; serving only needs BayesianFailureModel
+    from models.failure_predictor import check_columns, failure_labels
+
+    check_columns(sensor_df, feature_store)
+    X, y = failure_labels(sensor_df, feature_store)
+    model = BayesianFailureModel.fit(X, y, n_draws=n_draws, seed=seed,
+                                     feature_window=feature_store.window if feature_store is not None else None)
+    model.save(path or config.BAYES_MODEL_PATH)
+    return model
+
+
+def predict_failure_intervals(model: BayesianFailureModel, sensor_df: pd.DataFrame,
+                              credible_level: float = 0.9,
+                              feature_store: Optional[FeatureStore] = None) -> pd.DataFrame:
+    """Like predict_failure_probabilities, plus the credible interval bounds."""
+    from models.failure_predictor import failure_features
+
+    if feature_store is None and model.feature_window:
+        feature_store = FeatureStore(window=model.feature_window)
+    result = sensor_df[['component_id', 'vehicle_id']].copy()
+    intervals = model.predict(failure_features(sensor_df, feature_store), credible_level)
+    for col in intervals.columns:
+        result[col] = intervals[col].to_numpy()
+    return result
+
+
+def main():
+    from models.failure_predictor import SCORING_COLUMNS, WINDOWED_SCORING_COLUMNS
+    from utils.sensor_store import load_sensor_history
+
+    parser = argparse.ArgumentParser(description="Fit the Bayesian failure model (Laplace approximation)")
+    parser.add_argument("--draws", type=int, default=1000, help="Posterior draws to store")
+    parser.add_argument("--window", type=int, default=None, help="Use sliding-window features over N readings")
+    parser.add_argument("--output", default=config.BAYES_MODEL_PATH)
+    args = parser.parse_args()
+
+    feature_store = FeatureStore(window=args.window) if args.window else None
+    columns = WINDOWED_SCORING_COLUMNS if feature_store is not None else SCORING_COLUMNS
+    sensor_df = load_sensor_history(config.SENSOR_DATA_PATH, columns=columns)
+    model = train_bayesian_failure_model(sensor_df, args.output, n_draws=args.draws, feature_store=feature_store)
+    print(f"✅ Saved {model.n_draws} posterior draws over {len(model.feature_names)} features to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
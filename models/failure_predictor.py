@@ -1,56 +1,301 @@
-import pandas as pd
-from sklearn.linear_model import LogisticRegression
-from sklearn.preprocessing import StandardScaler
-from sklearn.pipeline import make_pipeline, Pipeline
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report
+from __future__ import annotations
+
+import glob
+import json
 import logging
-import joblib
+import os
+import re
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# sklearn and joblib are only imported by the training and checkpoint code paths,
+# so scoring with a kernel (models/scoring_kernel.py) never loads them
+if TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
+
+from models.feature_store import STORE_COLUMNS, FeatureStore
+from models.scoring_kernel import load_model
+from utils import config
 
 logging.basicConfig(level=logging.INFO)
 
-def train_failure_model(sensor_df: pd.DataFrame) -> Pipeline:
-    """
-    Trains a logistic regression model to predict component failure based on sensor data.
-    Returns the trained pipeline.
-    """
-    # Validate input columns
-    required_cols = ['battery.temperature', 'motor.vibration_level', 'battery.error_code']
-    for col in required_cols:
+# Raw sensor columns the model needs; loaders can project down to these
+REQUIRED_COLUMNS = ['battery.temperature', 'motor.vibration_level', 'battery.error_code']
+# REQUIRED_COLUMNS plus the identifiers carried into predictions
+SCORING_COLUMNS = ['component_id', 'vehicle_id'] + REQUIRED_COLUMNS
+FEATURE_COLUMNS = ['battery.temperature', 'motor.vibration_level', 'error_flag']
+# Columns needed by models trained on sliding-window features (see models/feature_store.py)
+WINDOWED_SCORING_COLUMNS = SCORING_COLUMNS + [col for col in STORE_COLUMNS if col not in SCORING_COLUMNS]
+
+
+def check_columns(sensor_df: pd.DataFrame, feature_store: Optional[FeatureStore] = None):
+    required = STORE_COLUMNS if feature_store is not None else REQUIRED_COLUMNS
+    for col in required:
         if col not in sensor_df.columns:
             raise ValueError(f"Missing required column: {col}")
 
-    # Create label
-    sensor_df['error_flag'] = sensor_df['battery.error_code'].apply(lambda x: 1 if x != 'OK' else 0)
-    sensor_df['failure'] = ((sensor_df['battery.temperature'] > 85) & 
-                            (sensor_df['motor.vibration_level'] > 1.0)) | (sensor_df['error_flag'] == 1)
-    sensor_df['failure'] = sensor_df['failure'].astype(int)
 
-    X = sensor_df[['battery.temperature', 'motor.vibration_level', 'error_flag']]
-    y = sensor_df['failure']
+def feature_store_for(model: Pipeline) -> Optional[FeatureStore]:
+    """A fresh FeatureStore matching the window the model was trained with, or None for instantaneous models."""
+    window = getattr(model, 'feature_window_', None)
+    return FeatureStore(window=window) if window else None
+
+
+def model_columns(model: Pipeline):
+    """Sensor columns a loader must provide to score with `model`."""
+    return WINDOWED_SCORING_COLUMNS if getattr(model, 'feature_window_', None) else SCORING_COLUMNS
+
+
+def failure_features(sensor_df: pd.DataFrame, feature_store: Optional[FeatureStore] = None) -> pd.DataFrame:
+    """
+    Model inputs for each reading; the caller's frame is left untouched.
+    With a feature store the readings are added to it and its window features are returned.
+    """
+    if feature_store is not None:
+        return feature_store.update_frame(sensor_df)
+    return pd.DataFrame({
+        'battery.temperature': sensor_df['battery.temperature'].to_numpy(dtype=float),
+        'motor.vibration_level': sensor_df['motor.vibration_level'].to_numpy(dtype=float),
+        'error_flag': (sensor_df['battery.error_code'] != 'OK').to_numpy(dtype=int),
+    }, index=sensor_df.index)
+
+
+def failure_labels(sensor_df: pd.DataFrame,
+                   feature_store: Optional[FeatureStore] = None) -> Tuple[pd.DataFrame, pd.Series]:
+    """Returns (features, failure label) for training."""
+    X = failure_features(sensor_df, feature_store)
+    failure = ((X['battery.temperature'] > 85) & (X['motor.vibration_level'] > 1.0)) | (X['error_flag'] == 1)
+    return X, failure.astype(int).rename('failure')
+
+
+def train_failure_model(sensor_df: pd.DataFrame, model_path: Optional[str] = None,
+                        feature_store: Optional[FeatureStore] = None) -> Pipeline:
+    """
+    Trains a logistic regression model to predict component failure based on sensor data.
+    With a feature store, the model is trained on its sliding-window features instead
+    of the three instantaneous ones.
+    Saves it as a new checkpoint (see save_checkpoint) and returns the trained pipeline.
+    """
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import classification_report
+    from sklearn.model_selection import train_test_split
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    check_columns(sensor_df, feature_store)
+    X, y = failure_labels(sensor_df, feature_store)
 
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
     model = make_pipeline(StandardScaler(), LogisticRegression(max_iter=200))
     model.fit(X_train, y_train)
+    if feature_store is not None:
+        model.feature_window_ = feature_store.window
 
     y_pred = model.predict(X_test)
     logging.info("\n📋 Classification Report:\n%s", classification_report(y_test, y_pred))
 
-    # Optionally save the model
-    joblib.dump(model, "model/failure_predictor.pkl")
-
+    save_checkpoint(model, model_path or config.MODEL_PATH, {"mode": "full", "rows_seen": len(X_train)})
     return model
 
-def predict_failure_probabilities(model: Pipeline, sensor_df: pd.DataFrame) -> pd.DataFrame:
+
+# --- Versioned checkpoints -------------------------------------------------
+# Every training run writes model/failure_predictor.v0007.pkl (+ a .json with
+# its metadata) and then atomically replaces model/failure_predictor.pkl, which
+# is what the API serves and hot-reloads.
+
+def _checkpoint_paths(model_path: str):
+    stem, ext = os.path.splitext(model_path)
+    pattern = re.compile(re.escape(os.path.basename(stem)) + r"\.v(\d+)" + re.escape(ext) + "$")
+    found = []
+    for path in glob.glob(f"{glob.escape(stem)}.v*{ext}"):
+        match = pattern.search(os.path.basename(path))
+        if match:
+            found.append((int(match.group(1)), path))
+    return sorted(found)
+
+
+def list_checkpoints(model_path: Optional[str] = None):
+    """Returns [(version, path)] of the saved checkpoints, oldest first."""
+    return _checkpoint_paths(model_path or config.MODEL_PATH)
+
+
+def save_checkpoint(model: Pipeline, model_path: str, metadata: Optional[dict] = None, keep: int = 20) -> int:
     """
-    Predicts failure probabilities for each component using the trained model.
+    Saves `model` as the next checkpoint version next to `model_path`, promotes it
+    to `model_path` and prunes all but the `keep` newest checkpoints.
+    Returns the new version number.
+    """
+    import joblib
+
+    os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
+    existing = _checkpoint_paths(model_path)
+    version = existing[-1][0] + 1 if existing else 1
+    stem, ext = os.path.splitext(model_path)
+    versioned = f"{stem}.v{version:04d}{ext}"
+
+    joblib.dump(model, versioned)
+    with open(f"{stem}.v{version:04d}.json", "w") as f:
+        json.dump({"version": version, **(metadata or {})}, f, indent=2)
+
+    tmp_path = f"{model_path}.tmp"
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, model_path)
+
+    for _, old in existing[:max(len(existing) + 1 - keep, 0)]:
+        os.remove(old)
+        meta = os.path.splitext(old)[0] + ".json"
+        if os.path.exists(meta):
+            os.remove(meta)
+    return version
+
+
+# --- Incremental training --------------------------------------------------
+
+@dataclass
+class StreamingMetrics:
+    """Holdout metrics accumulated chunk by chunk."""
+    n: int = 0
+    log_loss_sum: float = 0.0
+    tp: int = 0
+    fp: int = 0
+    fn: int = 0
+    tn: int = 0
+
+    def update(self, y_true: np.ndarray, probabilities: np.ndarray, threshold: float = 0.5):
+        p = np.clip(probabilities, 1e-15, 1 - 1e-15)
+        self.log_loss_sum += float(-(y_true * np.log(p) + (1 - y_true) * np.log(1 - p)).sum())
+        pred = probabilities >= threshold
+        truth = y_true == 1
+        self.tp += int((pred & truth).sum())
+        self.fp += int((pred & ~truth).sum())
+        self.fn += int((~pred & truth).sum())
+        self.tn += int((~pred & ~truth).sum())
+        self.n += len(y_true)
+
+    @property
+    def log_loss(self) -> float:
+        return self.log_loss_sum / self.n if self.n else float("nan")
+
+    @property
+    def accuracy(self) -> float:
+        return (self.tp + self.tn) / self.n if self.n else float("nan")
+
+    @property
+    def precision(self) -> float:
+        return self.tp / (self.tp + self.fp) if self.tp + self.fp else 0.0
+
+    @property
+    def recall(self) -> float:
+        return self.tp / (self.tp + self.fn) if self.tp + self.fn else 0.0
+
+    def summary(self) -> dict:
+        return {**asdict(self), "log_loss": self.log_loss, "accuracy": self.accuracy,
+                "precision": self.precision, "recall": self.recall}
+
+
+def make_incremental_model(seed: int = 42) -> Pipeline:
+    """Scaler + logistic-loss SGD; both steps support partial_fit."""
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    return make_pipeline(StandardScaler(), SGDClassifier(loss="log_loss", alpha=1e-4, random_state=seed))
+
+
+def is_incremental(model: Pipeline) -> bool:
+    return hasattr(model, "steps") and all(hasattr(step, "partial_fit") for _, step in model.steps)
+
+
+def holdout_mask(sensor_df: pd.DataFrame, holdout_fraction: float) -> np.ndarray:
+    """
+    Deterministic holdout assignment by component_id hash, so a component is
+    never trained on in one run and evaluated in another.
+    """
+    hashes = pd.util.hash_pandas_object(sensor_df['component_id'].astype(str), index=False).to_numpy()
+    return (hashes % 10_000) < int(holdout_fraction * 10_000)
+
+
+def partial_fit_chunk(model: Pipeline, X: pd.DataFrame, y: pd.Series):
+    """Updates the running scaler statistics, then the classifier, from one chunk."""
+    scaler, classifier = model.steps[0][1], model.steps[-1][1]
+    scaler.partial_fit(X)
+    classifier.partial_fit(scaler.transform(X), y.to_numpy(), classes=np.array([0, 1]))
+
+
+def train_failure_model_incremental(chunks: Iterable[pd.DataFrame], model_path: Optional[str] = None,
+                                    resume: bool = True, holdout_fraction: float = 0.2, seed: int = 42,
+                                    feature_store: Optional[FeatureStore] = None
+                                    ) -> Tuple[Pipeline, StreamingMetrics]:
     """
-    sensor_df = sensor_df.copy()  # Avoid modifying original
-    sensor_df['error_flag'] = sensor_df['battery.error_code'].apply(lambda x: 1 if x != 'OK' else 0)
+    Updates the failure model from a stream of sensor chunks (e.g.
+    utils.sensor_store.iter_sensor_history over the readings since the last run).
 
-    features = sensor_df[['battery.temperature', 'motor.vibration_level', 'error_flag']]
-    probabilities = model.predict_proba(features)[:, 1]
+    Continues from the latest checkpoint when `resume` is set and that
+    checkpoint is incremental; otherwise starts a new SGD model (on the
+    window features of `feature_store` when given). Rows of
+    holdout components are never trained on: after each chunk's update the
+    model is scored on that chunk's holdout rows. The result is saved as a new
+    checkpoint only if at least one chunk was trained on.
+    """
+    model_path = model_path or config.MODEL_PATH
+    model = None
+    if resume and os.path.exists(model_path):
+        model = load_model(model_path)
+        if not is_incremental(model):
+            logging.info("Current model at %s does not support partial_fit; starting a new incremental model",
+                         model_path)
+            model = None
+    if model is None:
+        model = make_incremental_model(seed)
+        if feature_store is not None:
+            model.feature_window_ = feature_store.window
+    elif feature_store is None:
+        feature_store = feature_store_for(model)
+
+    metrics = StreamingMetrics()
+    rows_trained = 0
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        check_columns(chunk, feature_store)
+        X, y = failure_labels(chunk, feature_store)
+        holdout = holdout_mask(chunk, holdout_fraction) if 'component_id' in chunk else np.zeros(len(chunk), bool)
+
+        if (~holdout).any():
+            partial_fit_chunk(model, X[~holdout], y[~holdout])
+            rows_trained += int((~holdout).sum())
+        if holdout.any() and hasattr(model.steps[-1][1], "coef_"):
+            metrics.update(y[holdout].to_numpy(), model.predict_proba(X[holdout])[:, 1])
+
+    if rows_trained:
+        rows_seen = int(model.steps[0][1].n_samples_seen_)
+        version = save_checkpoint(model, model_path, {
+            "mode": "incremental", "rows_trained": rows_trained, "rows_seen": rows_seen,
+            "holdout": metrics.summary(),
+        })
+        logging.info("💾 Saved incremental checkpoint v%04d (%d new rows, %d total, holdout log loss %.4f)",
+                     version, rows_trained, rows_seen, metrics.log_loss)
+    return model, metrics
+
+def predict_failure_probabilities(model: Pipeline, sensor_df: pd.DataFrame,
+                                  feature_store: Optional[FeatureStore] = None,
+                                  features: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Predicts failure probabilities for each component using the trained model.
+    Window-feature models use `feature_store` (a fresh one when not given).
+    `features` are model inputs already built for `sensor_df`, e.g. by a
+    caller that computes window features before fanning out to workers.
+    """
+    if features is None:
+        if feature_store is None:
+            feature_store = feature_store_for(model)
+        features = failure_features(sensor_df, feature_store)
+    probabilities = model.predict_proba(features[list(getattr(model, 'feature_names_in_', features.columns))])[:, 1]
 
-    sensor_df['failure_probability'] = probabilities
-    return sensor_df[['component_id', 'vehicle_id', 'failure_probability']]
+    result = sensor_df[['component_id', 'vehicle_id']].copy()
+    result['failure_probability'] = probabilities
+    return result
@@ -0,0 +1,298 @@
+# models/feature_store.py
+"""
+In-memory, per-component sliding-window features.
+
+For every component the store keeps its last `window` readings of each signal
+in a ring buffer, together with running sums. Adding one reading is O(1) per
+signal, and a feature row can be read straight from the running state:
+
+    <signal>            latest value
+    <signal>.mean       mean over the window
+    <signal>.max        max over the window
+    <signal>.slope      least-squares slope over the window, per reading
+
+plus per-reading features that need no history (error flag, age, days since
+the last service).
+
+`update` is the per-reading path used by the API. Given the reading's
+timestamp, it ignores readings that are not newer than the component's last
+one (client retries, replayed messages) instead of counting them twice.
+`update_frame` is the bulk path for training and batch scoring. It produces the
+same point-in-time features (each row only sees readings up to itself) for a
+whole frame with array operations, and leaves the store in the same state as
+the equivalent sequence of `update` calls.
+"""
+from __future__ import annotations
+
+import threading
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# pandas is only needed by the bulk path; the per-reading API path runs on NumPy alone
+if TYPE_CHECKING:
+    import pandas as pd
+
+SIGNALS = [
+    "battery.temperature",
+    "battery.voltage",
+    "motor.vibration_level",
+    "motor.torque",
+    "brake_system.brake_pad_thickness",
+    "brake_system.temperature",
+]
+AGGREGATES = ["mean", "max", "slope"]
+READING_FEATURES = ["error_flag", "component_age_days", "days_since_service"]
+DEFAULT_WINDOW = 20
+# Last-seen time of a component with no readings
+NEVER = np.iinfo(np.int64).min
+
+# Flat sensor columns update_frame needs
+STORE_COLUMNS = ["component_id", "timestamp", "battery.error_code", "last_service_date",
+                 "component_age_days"] + SIGNALS
+
+
+def reading_features(error_code: str, component_age_days: float, timestamp: str,
+                     last_service_date: str) -> Dict[str, float]:
+    """Features of a single reading that need no history."""
+    day = datetime.fromisoformat(timestamp).date()
+    return {
+        "error_flag": 1 if error_code != "OK" else 0,
+        "component_age_days": float(component_age_days),
+        "days_since_service": float((day - date.fromisoformat(last_service_date)).days),
+    }
+
+
+def reading_features_frame(sensor_df: pd.DataFrame) -> pd.DataFrame:
+    """Vectorized reading_features over a flat sensor frame."""
+    import pandas as pd
+
+    days = pd.to_datetime(sensor_df["timestamp"]).dt.normalize() - pd.to_datetime(sensor_df["last_service_date"])
+    return pd.DataFrame({
+        "error_flag": (sensor_df["battery.error_code"] != "OK").to_numpy(dtype=int),
+        "component_age_days": sensor_df["component_age_days"].to_numpy(dtype=float),
+        "days_since_service": (days.dt.days).to_numpy(dtype=float),
+    }, index=sensor_df.index)
+
+
+def _ticks(timestamp: datetime) -> int:
+    """Microseconds since the epoch; aware timestamps are compared in UTC."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return int(np.datetime64(timestamp, "us").astype(np.int64))
+
+
+def _slope(n: np.ndarray, total: np.ndarray, weighted: np.ndarray) -> np.ndarray:
+    # Least squares against positions 0..n-1, using the closed forms of sum(x) and sum(x^2)
+    n = n.astype(float)[..., None]
+    sx = n * (n - 1) / 2
+    sxx = (n - 1) * n * (2 * n - 1) / 6
+    denominator = n * sxx - sx * sx
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = (n * weighted - sx * total) / denominator
+    return np.where(denominator > 0, slope, 0.0)
+
+
+class FeatureStore:
+    def __init__(self, window: int = DEFAULT_WINDOW, signals: Sequence[str] = SIGNALS, capacity: int = 1024):
+        self.window = window
+        self.signals = list(signals)
+        self._slots: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        S = len(self.signals)
+        self._values = np.zeros((capacity, window, S))
+        self._head = np.zeros(capacity, dtype=np.int64)   # next write position; the oldest value once full
+        self._count = np.zeros(capacity, dtype=np.int64)  # values in the buffer, at most `window`
+        self._sum = np.zeros((capacity, S))
+        self._weighted = np.zeros((capacity, S))          # sum of position * value, oldest at position 0
+        self._max = np.full((capacity, S), -np.inf)
+        self._last_seen = np.full(capacity, NEVER, dtype=np.int64)  # newest reading, in _ticks
+
+    @property
+    def feature_names(self) -> List[str]:
+        windowed = [f"{signal}.{agg}" for signal in self.signals for agg in AGGREGATES]
+        return self.signals + windowed + READING_FEATURES
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _grow(self, needed: int):
+        capacity = len(self._head)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, 2 * capacity)
+        fills = {"_max": -np.inf, "_last_seen": NEVER}
+        for name in ("_values", "_head", "_count", "_sum", "_weighted", "_max", "_last_seen"):
+            old = getattr(self, name)
+            fill = fills.get(name, 0)
+            grown = np.full((new_capacity,) + old.shape[1:], fill, dtype=old.dtype)
+            grown[:capacity] = old
+            setattr(self, name, grown)
+
+    def _slot(self, component_id: str) -> int:
+        slot = self._slots.get(component_id)
+        if slot is None:
+            slot = len(self._slots)
+            self._grow(slot + 1)
+            self._slots[component_id] = slot
+        return slot
+
+    # ----------------------------
+    # Per-reading path
+    # ----------------------------
+    def update(self, component_id: str, values: Sequence[float],
+               timestamp: Optional[datetime] = None) -> Dict[str, float]:
+        """
+        Adds one reading (signal values in `signals` order) and returns the
+        component's window features. A reading with a timestamp that is not
+        newer than the component's last one is not added again; the current
+        window features are returned instead.
+        """
+        y = np.asarray(values, dtype=float)
+        W = self.window
+        with self._lock:
+            slot = self._slot(component_id)
+            if timestamp is not None:
+                ticks = _ticks(timestamp)
+                if ticks <= self._last_seen[slot]:
+                    return self._features(slot, y)
+                self._last_seen[slot] = ticks
+            n, head = self._count[slot], self._head[slot]
+            if n < W:
+                self._weighted[slot] += n * y
+                self._sum[slot] += y
+                self._max[slot] = np.maximum(self._max[slot], y)
+                self._values[slot, head] = y
+                self._count[slot] = n + 1
+            else:
+                # Every value moves one position towards the front; the oldest drops out
+                old = self._values[slot, head].copy()
+                self._weighted[slot] += (W - 1) * y - (self._sum[slot] - old)
+                self._sum[slot] += y - old
+                self._values[slot, head] = y
+                evicted_max = old >= self._max[slot]
+                self._max[slot] = np.maximum(self._max[slot], y)
+                if evicted_max.any():
+                    self._max[slot, evicted_max] = self._values[slot][:, evicted_max].max(axis=0)
+            self._head[slot] = (head + 1) % W
+            return self._features(slot, y)
+
+    def _features(self, slot: int, latest: np.ndarray) -> Dict[str, float]:
+        n = self._count[slot]
+        mean = self._sum[slot] / n
+        slope = _slope(np.array([n]), self._sum[slot][None], self._weighted[slot][None])[0]
+        features = dict(zip(self.signals, latest.tolist()))
+        for i, signal in enumerate(self.signals):
+            features[f"{signal}.mean"] = float(mean[i])
+            features[f"{signal}.max"] = float(self._max[slot, i])
+            features[f"{signal}.slope"] = float(slope[i])
+        return features
+
+    # ----------------------------
+    # Bulk path
+    # ----------------------------
+    def _history(self, slots: np.ndarray, keep: np.ndarray):
+        """The last `keep` buffered values of each slot, oldest first: ((U, W, S) values, (U, W) valid mask)."""
+        W = self.window
+        k = np.arange(W)
+        positions = (self._head[slots, None] - keep[:, None] + k[None, :]) % W
+        return self._values[slots[:, None], positions], k[None, :] < keep[:, None]
+
+    def update_frame(self, sensor_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adds every reading of a flat sensor frame and returns its point-in-time
+        features (index aligned with `sensor_df`). Readings of one component are
+        taken in timestamp order, or in frame order without a timestamp column.
+        Every row is added, so drop repeated readings from the frame first.
+        """
+        import pandas as pd
+
+        W, S = self.window, len(self.signals)
+        M = len(sensor_df)
+        values = sensor_df[self.signals].to_numpy(dtype=float)
+
+        with self._lock:
+            codes, uniques = pd.factorize(sensor_df["component_id"].astype(str), sort=False)
+            slots = np.fromiter((self._slot(cid) for cid in uniques), dtype=np.int64, count=len(uniques))
+
+            # Chunk rows grouped by component, in time order within the component
+            U = len(uniques)
+            if "timestamp" in sensor_df.columns:
+                times = pd.to_datetime(sensor_df["timestamp"])
+                if times.dt.tz is not None:
+                    times = times.dt.tz_convert(None)
+                ticks = times.to_numpy().astype("datetime64[us]").astype(np.int64)
+                order = np.lexsort((ticks, codes))
+                last_seen = np.full(U, NEVER, dtype=np.int64)
+                np.maximum.at(last_seen, codes, ticks)
+                self._last_seen[slots] = np.maximum(self._last_seen[slots], last_seen)
+            else:
+                order = np.argsort(codes, kind="stable")
+            new_counts = np.bincount(codes, minlength=U)
+            hist_counts = np.minimum(self._count[slots], W - 1)
+
+            # Combined layout: per component, up to W - 1 buffered values, then its new readings
+            sizes = hist_counts + new_counts
+            offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+            combined = np.empty((int(sizes.sum()), S))
+            group_start = np.repeat(offsets, sizes)
+
+            hist_values, hist_valid = self._history(slots, hist_counts)
+            hist_rows = offsets[:, None] + np.arange(W)[None, :]
+            combined[hist_rows[hist_valid]] = hist_values[hist_valid]
+
+            sorted_codes = codes[order]
+            rank = np.arange(M) - np.concatenate([[0], np.cumsum(new_counts)[:-1]])[sorted_codes]
+            new_rows = offsets[sorted_codes] + hist_counts[sorted_codes] + rank
+            combined[new_rows] = values[order]
+
+            # Window [lo, i] of every new row, via prefix sums
+            i = new_rows
+            lo = np.maximum(group_start[i], i - W + 1)
+            n = i - lo + 1
+            local = (np.arange(len(combined)) - group_start)[:, None]
+            zero = np.zeros((1, S))
+            prefix = np.vstack([zero, np.cumsum(combined, axis=0)])
+            prefix_weighted = np.vstack([zero, np.cumsum(local * combined, axis=0)])
+            total = prefix[i + 1] - prefix[lo]
+            weighted = (prefix_weighted[i + 1] - prefix_weighted[lo]) - (lo - group_start[i])[:, None] * total
+            maximum = combined[i].copy()
+            for back in range(1, W):
+                j = i - back
+                valid = j >= lo
+                maximum[valid] = np.maximum(maximum[valid], combined[j[valid]])
+
+            # Write the last W values of every component back into its ring
+            keep = np.minimum(sizes, W)
+            rows = (offsets + sizes - keep)[:, None] + np.arange(W)[None, :]
+            valid = np.arange(W)[None, :] < keep[:, None]
+            ring = np.where(valid[..., None], combined[np.minimum(rows, len(combined) - 1)], 0.0)
+            self._values[slots] = ring
+            self._count[slots] = keep
+            self._head[slots] = keep % W
+            positions = np.arange(W)[None, :, None]
+            self._sum[slots] = ring.sum(axis=1)
+            self._weighted[slots] = (positions * ring).sum(axis=1)
+            self._max[slots] = np.where(valid[..., None], ring, -np.inf).max(axis=1)
+
+        features = np.empty((M, S * (1 + len(AGGREGATES))))
+        features[order, :S] = values[order]
+        features[order, S::3] = total / n[:, None]
+        features[order, S + 1::3] = maximum
+        features[order, S + 2::3] = _slope(n, total, weighted)
+        frame = pd.DataFrame(features, index=sensor_df.index, columns=self.feature_names[:-len(READING_FEATURES)])
+        return pd.concat([frame, reading_features_frame(sensor_df)], axis=1)
+
+    def reset(self, component_id: Optional[str] = None):
+        """Forgets one component's history, or everything."""
+        with self._lock:
+            slots = list(self._slots.values()) if component_id is None else [self._slots.get(component_id)]
+            slots = [slot for slot in slots if slot is not None]
+            self._count[slots] = 0
+            self._head[slots] = 0
+            self._sum[slots] = 0
+            self._weighted[slots] = 0
+            self._max[slots] = -np.inf
+            self._last_seen[slots] = NEVER
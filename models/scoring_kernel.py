@@ -0,0 +1,195 @@
+# models/scoring_kernel.py
+"""
+Dependency-light scoring kernel for the failure model.
+
+`export_scoring_kernel` turns a trained StandardScaler + linear classifier
+pipeline (models/failure_predictor.py: LogisticRegression, or the
+incremental SGDClassifier with log loss) into a small JSON artifact:
+
+    {"format": "failure-kernel", "format_version": 1, "model_version": 7,
+     "feature_names": [...], "mean": [...], "scale": [...],
+     "coef": [...], "intercept": 0.12, "feature_window": null}
+
+With a `.npy` path the same artifact is split for serving: the mean, scale
+and coef rows go into one (3, n_features) float64 array, and everything else
+into a `<path>.json` sidecar, with a sha256 of the array. `load_model` memory-maps that array read-only,
+so API workers on one host share a single copy of the weights from the page
+cache (see api/serving.py).
+
+`ScoringKernel` scores with NumPy alone. It exposes the same `predict_proba` /
+`feature_names_in_` surface as the sklearn pipeline, so the model server and
+the batch scorers accept either. Serving a kernel avoids importing sklearn,
+scipy and joblib, and avoids unpickling.
+
+Usage:
+    python -m models.scoring_kernel model/failure_predictor.pkl model/failure_kernel.json
+    python -m models.scoring_kernel model/failure_predictor.pkl model/failure_kernel.npy
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+
+FORMAT = "failure-kernel"
+FORMAT_VERSION = 1
+
+
+class ScoringKernel:
+    def __init__(self, feature_names, mean, scale, coef, intercept: float, feature_window: Optional[int] = None,
+                 model_version: Optional[int] = None):
+        self.feature_names_in_ = np.array(feature_names, dtype=object)
+        self.mean = np.asarray(mean, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.coef = np.asarray(coef, dtype=float)
+        self.intercept = float(intercept)
+        self.model_version = model_version
+        if feature_window:
+            self.feature_window_ = int(feature_window)
+
+    @classmethod
+    def load(cls, path: str, attempts: int = 3, retry_delay_s: float = 0.05) -> "ScoringKernel":
+        """
+        Loads a JSON kernel, or memory-maps a `.npy` one.
+
+        The .npy and its sidecar are replaced one after the other, so a load can
+        catch the new sidecar with the old weights; the sidecar's digest of the
+        weights catches that, and the pair is read again.
+        """
+        for attempt in range(attempts):
+            artifact = cls._read(path)
+            if artifact is not None:
+                return cls(artifact["feature_names"], artifact["mean"], artifact["scale"], artifact["coef"],
+                           artifact["intercept"], artifact.get("feature_window"), artifact.get("model_version"))
+            if attempt + 1 < attempts:
+                time.sleep(retry_delay_s)
+        raise ValueError(f"{path} does not match its metadata")
+
+    @staticmethod
+    def _read(path: str) -> Optional[dict]:
+        """The artifact at `path`, or None when a .npy does not match its sidecar."""
+        meta_path = f"{path}.json" if path.endswith(".npy") else path
+        with open(meta_path) as f:
+            artifact = json.load(f)
+        if artifact.get("format") != FORMAT or artifact.get("format_version", 0) > FORMAT_VERSION:
+            raise ValueError(f"{path} is not a supported scoring kernel")
+        if not path.endswith(".npy"):
+            return artifact
+        weights = np.load(path, mmap_mode="r")
+        if weights.shape != (3, len(artifact["feature_names"])):
+            return None
+        # Hashes the mapped pages, i.e. exactly the weights this kernel will serve
+        digest = artifact.get("weights_sha256")
+        if digest is not None and hashlib.sha256(weights.tobytes()).hexdigest() != digest:
+            return None
+        return dict(artifact, mean=weights[0], scale=weights[1], coef=weights[2])
+
+    def decision_function(self, X) -> np.ndarray:
+        # Same operation order as StandardScaler.transform followed by the linear model
+        values = np.asarray(X, dtype=float)
+        return ((values - self.mean) / self.scale) @ self.coef + self.intercept
+
+    def predict_proba(self, X) -> np.ndarray:
+        """(n, 2) class probabilities, like the sklearn pipeline."""
+        p = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - p, p])
+
+
+def _model_version(model_path: Optional[str]) -> Optional[int]:
+    # Checkpoints are named like failure_predictor.v0007.pkl (see models.failure_predictor.save_checkpoint)
+    match = re.search(r"\.v(\d+)\.[^.]+$", model_path or "")
+    return int(match.group(1)) if match else None
+
+
+def checkpoint_version(model_path: str) -> Optional[int]:
+    """Version of the checkpoint `model_path` is (or, for the promoted model, a copy of)."""
+    version = _model_version(os.path.realpath(model_path))
+    if version is None:
+        # The promoted model is a copy of the newest checkpoint
+        from models.failure_predictor import list_checkpoints
+        checkpoints = list_checkpoints(model_path)
+        version = checkpoints[-1][0] if checkpoints else None
+    return version
+
+
+def _write_npy_kernel(artifact: dict, path: str):
+    weights = np.array([artifact["mean"], artifact["scale"], artifact["coef"]], dtype=np.float64)
+    meta = {k: v for k, v in artifact.items() if k not in ("mean", "scale", "coef")}
+    meta["weights_sha256"] = hashlib.sha256(weights.tobytes()).hexdigest()
+    with open(f"{path}.json.tmp", "w") as f:
+        json.dump(meta, f, indent=2)
+    with open(f"{path}.tmp", "wb") as f:
+        np.save(f, weights)
+    # Metadata first: the model server reloads when the .npy itself changes, and
+    # ScoringKernel.load re-reads a pair caught between the two replaces.
+    # Replacing (not rewriting) the .npy keeps workers' existing mappings valid.
+    os.replace(f"{path}.json.tmp", f"{path}.json")
+    os.replace(f"{path}.tmp", path)
+
+
+def export_scoring_kernel(model, path: str, model_version: Optional[int] = None) -> dict:
+    """Writes the kernel artifact for a fitted scaler + linear classifier pipeline and returns it."""
+    scaler, classifier = model.steps[0][1], model.steps[-1][1]
+    if not hasattr(classifier, "coef_") or classifier.coef_.shape[0] != 1:
+        raise ValueError("Only fitted binary linear classifiers can be exported")
+    if getattr(classifier, "loss", "log_loss") != "log_loss":
+        raise ValueError("Only log-loss models have probabilities to export")
+
+    n_features = classifier.coef_.shape[1]
+    mean = scaler.mean_ if getattr(scaler, "mean_", None) is not None else np.zeros(n_features)
+    scale = scaler.scale_ if getattr(scaler, "scale_", None) is not None else np.ones(n_features)
+    feature_names = getattr(model, "feature_names_in_", None)
+    if feature_names is None:
+        raise ValueError("The model was not fit on named features")
+
+    artifact = {
+        "format": FORMAT,
+        "format_version": FORMAT_VERSION,
+        "model_version": model_version,
+        "exported_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "feature_names": [str(name) for name in feature_names],
+        "mean": mean.tolist(),
+        "scale": scale.tolist(),
+        "coef": classifier.coef_[0].tolist(),
+        "intercept": float(classifier.intercept_[0]),
+        "feature_window": getattr(model, "feature_window_", None),
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith(".npy"):
+        _write_npy_kernel(artifact, path)
+        return artifact
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(artifact, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+    return artifact
+
+
+def load_model(path: str):
+    """Loads a failure model: a JSON or memory-mapped .npy scoring kernel, or a pickled sklearn pipeline otherwise."""
+    if path.endswith((".json", ".npy")):
+        return ScoringKernel.load(path)
+    import joblib
+
+    return joblib.load(path)
+
+
+def main():
+    from utils import config
+
+    parser = argparse.ArgumentParser(description="Export the failure model as a NumPy scoring kernel")
+    parser.add_argument("model_path", nargs="?", default=config.MODEL_PATH)
+    parser.add_argument("kernel_path", nargs="?", default=config.KERNEL_PATH)
+    args = parser.parse_args()
+
+    version = checkpoint_version(args.model_path)
+    artifact = export_scoring_kernel(load_model(args.model_path), args.kernel_path, model_version=version)
+    print(f"✅ Exported {len(artifact['feature_names'])}-feature kernel (model v{version}) to {args.kernel_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,52 @@
-import pandas as pd
-import json
-from models.failure_predictor import train_failure_model, predict_failure_probabilities
-from engine.decision_engine import apply_decision_engine
-from visualize.plot_fix_wait import plot_decision_breakdown
+# run_decision_engine.py
+"""
+Nightly fleet scoring: scores the sensor history with the saved failure model
+on all cores and writes FIX/WAIT decisions (see engine/batch_scoring.py).
 
-# Load and flatten
-df = pd.read_json("data/sensor_data_stream.jsonl", lines=True)
-df_flat = pd.json_normalize(df.to_dict(orient="records"))
+Usage:
+    python run_decision_engine.py --headless --format parquet
+"""
+import argparse
+import logging
 
-# Train + Predict
-model = train_failure_model(df_flat)
-predicted = predict_failure_probabilities(model, df_flat)
+from engine.batch_scoring import read_decisions, run_batch_scoring
+from engine.cost_model import load_cost_model
+from utils import config
 
-# Load costs
-with open("config/cost_model.json") as f:
-    cost_cfg = json.load(f)
 
-# Apply decision engine
-decisions_df = apply_decision_engine(predicted, cost_cfg)
+def main():
+    parser = argparse.ArgumentParser(description="Score the fleet and write FIX/WAIT decisions")
+    parser.add_argument("--input", default=config.SENSOR_DATA_PATH, help="JSONL file or Parquet store")
+    parser.add_argument("--output", default=config.DECISIONS_OUTPUT_PATH, help="Directory for the part files")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--shard-size", type=int, default=100_000)
+    parser.add_argument("--threshold", type=float, default=None, help="Default: the cost model's threshold")
+    parser.add_argument("--since", default=None, help="Only score readings from this date on (YYYY-MM-DD)")
+    parser.add_argument("--no-resume", action="store_true", help="Discard earlier progress in --output")
+    parser.add_argument("--headless", action="store_true", help="Skip the decision breakdown plot")
+    args = parser.parse_args()
 
-# Visualize
-plot_decision_breakdown(decisions_df)
+    logging.basicConfig(level=logging.INFO)
 
-# Save output (optional)
-decisions_df.to_csv("data/fix_wait_decisions.csv", index=False)
+    # Load and validate costs
+    cost_model = load_cost_model(config.COST_MODEL_PATH)
+    logging.info("Using cost model %s", cost_model.version)
+
+    stats = run_batch_scoring(
+        args.input, args.output, config.MODEL_PATH, cost_model,
+        threshold=args.threshold, workers=args.workers, shard_size=args.shard_size, fmt=args.format,
+        resume=not args.no_resume, filters=[("date", ">=", args.since)] if args.since else None,
+    )
+    print(f"✅ Scored {stats.rows} readings in {stats.shards_total - stats.shards_skipped} shards "
+          f"({stats.shards_skipped} already done) in {stats.seconds:.1f}s ({stats.rows_per_second:,.0f}/s); "
+          f"{stats.fix} FIX -> {args.output}")
+
+    if not args.headless:
+        # Imported here so headless runs never load matplotlib
+        from visualize.plot_fix_wait import plot_decision_breakdown
+        plot_decision_breakdown(read_decisions(args.output))
+
+
+if __name__ == "__main__":
+    main()
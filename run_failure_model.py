@@ -1,36 +1,56 @@
-import pandas as pd
-from models.failure_predictor import train_failure_model, predict_failure_probabilities
 # run_failure_model.py
-from models.failure_predictor import train_failure_model, predict_failure_probabilities
-from visualize.plot_failure_risks import plot_failure_probabilities
+import argparse
 
-# Load and flatten your data
-df = pd.read_json("data/sensor_data_stream.jsonl", lines=True)
-df_flat = pd.json_normalize(df.to_dict(orient="records"))
+from models.failure_predictor import (
+    SCORING_COLUMNS,
+    WINDOWED_SCORING_COLUMNS,
+    predict_failure_probabilities,
+    train_failure_model,
+    train_failure_model_incremental,
+)
+from models.feature_store import FeatureStore
+from utils import config
+from utils.sensor_store import iter_sensor_history, load_sensor_history
 
-# Train model
-model = train_failure_model(df_flat)
 
-# Predict
-predicted_df = predict_failure_probabilities(model, df_flat)
-
-# Plot
-plot_failure_probabilities(predicted_df)
+def run_incremental(since=None, chunk_size=100_000, feature_store=None):
+    # Only the readings since the last run are needed; the checkpoint carries the rest
+    filters = [("date", ">=", since)] if since else None
+    columns = WINDOWED_SCORING_COLUMNS if feature_store is not None else SCORING_COLUMNS
+    chunks = iter_sensor_history(config.SENSOR_DATA_PATH, columns=columns, filters=filters, chunk_size=chunk_size)
+    print("🚀 Updating failure prediction model incrementally...")
+    _, metrics = train_failure_model_incremental(chunks, config.MODEL_PATH, feature_store=feature_store)
+    print(f"📋 Holdout: {metrics.n} rows, log loss {metrics.log_loss:.4f}, accuracy {metrics.accuracy:.3f}, "
+          f"precision {metrics.precision:.3f}, recall {metrics.recall:.3f}")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Train the failure prediction model")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Update the latest checkpoint with partial_fit instead of retraining from scratch")
+    parser.add_argument("--since", default=None, help="Only train on readings from this date on (YYYY-MM-DD)")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--window", type=int, default=None,
+                        help="Train on sliding-window features over this many readings per component")
+    parser.add_argument("--plot", action="store_true", help="Plot the predicted failure probabilities")
+    args = parser.parse_args()
+
+    feature_store = FeatureStore(window=args.window) if args.window else None
+    if args.incremental:
+        run_incremental(args.since, args.chunk_size, feature_store)
+        return
+
     # Load simulated sensor data
+    columns = WINDOWED_SCORING_COLUMNS if feature_store is not None else SCORING_COLUMNS
     try:
-        df = pd.read_json("data/sensor_data_stream.jsonl", lines=True)
+        df_flat = load_sensor_history(config.SENSOR_DATA_PATH, columns=columns)
     except Exception as e:
         print("❌ Failed to load data:", e)
         return
 
-    df_flat = pd.json_normalize(df.to_dict(orient="records"))
-
     # Train model
     print("🚀 Training failure prediction model...")
-    model = train_failure_model(df_flat)
+    model = train_failure_model(df_flat, feature_store=feature_store)
 
     # Predict probabilities
     print("📊 Predicting failure probabilities...")
@@ -39,5 +59,9 @@ def main():
     # Show top risky components
     print(predictions.sort_values(by="failure_probability", ascending=False).head(10))
 
+    if args.plot:
+        from visualize.plot_failure_risks import plot_failure_probabilities
+        plot_failure_probabilities(predictions)
+
 if __name__ == "__main__":
     main()
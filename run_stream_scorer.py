@@ -0,0 +1,58 @@
+# run_stream_scorer.py
+"""
+Scores sensor readings as they arrive and appends decisions to a JSONL sink
+(see engine/stream_scorer.py).
+
+Usage:
+    python run_stream_scorer.py --output data/stream_decisions.jsonl --fix-only
+    tail -f data/sensor_data_stream.jsonl | python run_stream_scorer.py --source stdin
+"""
+import argparse
+import asyncio
+import functools
+
+from engine.cost_model import CostModelStore
+from engine.stream_scorer import JsonlSink, StreamScorer, read_stdin, serve_unix_socket, tail_jsonl
+from utils import config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream sensor readings through the failure model and decision engine")
+    parser.add_argument("--source", choices=["file", "stdin", "socket"], default="file")
+    parser.add_argument("--path", default=config.SENSOR_DATA_PATH, help="JSONL file to tail (--source file)")
+    parser.add_argument("--from-start", action="store_true", help="Score the existing lines before tailing")
+    parser.add_argument("--socket", default=config.STREAM_SOCKET_PATH, help="Unix socket path (--source socket)")
+    parser.add_argument("--output", default="-", help="Decision sink, '-' for stdout")
+    parser.add_argument("--fix-only", action="store_true", help="Only emit FIX decisions")
+    parser.add_argument("--threshold", type=float, default=None, help="Default: the cost model's threshold")
+    parser.add_argument("--max-batch", type=int, default=config.STREAM_MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=config.STREAM_MAX_WAIT_MS)
+    parser.add_argument("--dead-letter", default=None, help="Append the raw lines of batches that fail to score here")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="Seconds between latency reports")
+    args = parser.parse_args()
+
+    # Reloaded when the file changes, so cost edits apply without restarting the scorer
+    cost_models = CostModelStore(config.COST_MODEL_PATH, reload_interval_s=config.COST_MODEL_RELOAD_S)
+    cost_models.get()
+
+    if args.source == "stdin":
+        source = read_stdin
+    elif args.source == "socket":
+        source = functools.partial(serve_unix_socket, args.socket)
+    else:
+        source = functools.partial(tail_jsonl, args.path, from_start=args.from_start)
+
+    scorer = StreamScorer(config.MODEL_PATH, cost_models, JsonlSink(args.output, fix_only=args.fix_only),
+                          threshold=args.threshold, max_batch_size=args.max_batch, max_wait_ms=args.max_wait_ms,
+                          reload_interval_s=config.MODEL_RELOAD_INTERVAL_S, dead_letter_path=args.dead_letter)
+    try:
+        stats = asyncio.run(scorer.run(source, report_interval_s=args.report_interval))
+    except KeyboardInterrupt:
+        stats = scorer.stats()
+    print(f"✅ Scored {stats['scored']} readings ({stats['fix']} FIX, {stats['invalid']} invalid, "
+          f"{stats['failed']} in failed batches), "
+          f"latency p50 {stats['p50_ms']} ms / p99 {stats['p99_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# simulation/anomalies.py
+"""
+Anomaly and degradation processes for the fleet simulator (simulation/fleet.py).
+
+Each process works on a block of readings: a dict of (T, C) arrays, one row
+per time step and one column per component, plus the absolute simulation time
+of every step in days. Processes keep their own per-component state between
+blocks, so a long run can be generated block by block without resetting
+drift or wear at block boundaries.
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+Block = Dict[str, np.ndarray]
+
+
+class AnomalyProcess(ABC):
+    def init_state(self, n_components: int, rng: np.random.Generator):
+        """Called once by the simulator before the first block."""
+
+    @abstractmethod
+    def apply(self, block: Block, t_days: np.ndarray, rng: np.random.Generator):
+        """Modifies the (T, C) arrays of `block` in place."""
+
+
+class SpikeProcess(AnomalyProcess):
+    """
+    Short-lived spikes: each reading is anomalous with probability `rate`,
+    and every column in `effects` is shifted by a uniform draw from its range.
+
+    The defaults reproduce the anomaly injection of simulation/simulator.py.
+    """
+
+    DEFAULT_EFFECTS = {
+        "battery.temperature": (15, 30),
+        "motor.vibration_level": (0.5, 1.2),
+        "battery.voltage": (-2.0, -1.0),
+    }
+
+    def __init__(self, rate: float = 0.05, effects: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.rate = rate
+        self.effects = effects or self.DEFAULT_EFFECTS
+
+    def apply(self, block, t_days, rng):
+        shape = t_days.shape + (block["battery.temperature"].shape[1],)
+        spike = rng.random(shape) < self.rate
+        k = int(spike.sum())
+        for column, (low, high) in self.effects.items():
+            block[column][spike] += rng.uniform(low, high, k)
+
+
+class SensorDrift(AnomalyProcess):
+    """
+    Gradual drift of one signal: every component starts drifting at a random
+    onset (exponential, `onset_rate_per_day` expected onsets per component
+    per day) and then moves by `drift_per_day` per day.
+
+    Once the drift reaches `max_drift` (default: 60 days' worth) the sensor is
+    recalibrated: the drift drops back to zero and a new onset is drawn, so
+    long runs stay within a realistic range.
+    """
+
+    def __init__(self, column: str, drift_per_day: float, onset_rate_per_day: float = 0.01,
+                 max_drift: Optional[float] = None):
+        self.column = column
+        self.drift_per_day = drift_per_day
+        self.onset_rate_per_day = onset_rate_per_day
+        self.max_drift = abs(max_drift if max_drift is not None else 60 * drift_per_day)
+        self.onset_days = None
+
+    def init_state(self, n_components, rng):
+        self.onset_days = rng.exponential(1 / self.onset_rate_per_day, n_components)
+
+    def apply(self, block, t_days, rng):
+        duration = self.max_drift / abs(self.drift_per_day)
+        drift = np.zeros(t_days.shape + self.onset_days.shape)
+        # Each pass adds one drift episode per component; components recalibrated
+        # within the block get a new onset and go round again
+        pending = np.arange(self.onset_days.size)
+        while pending.size:
+            onset = self.onset_days[pending]
+            elapsed = t_days[:, None] - onset[None, :]
+            drifting = (elapsed >= 0) & (elapsed < duration)
+            drift[:, pending] += np.where(drifting, self.drift_per_day * elapsed, 0.0)
+            recalibrated = onset + duration <= t_days[-1]
+            pending = pending[recalibrated]
+            self.onset_days[pending] = (onset[recalibrated] + duration
+                                        + rng.exponential(1 / self.onset_rate_per_day, pending.size))
+        block[self.column] += drift
+
+
+class BrakeWear(AnomalyProcess):
+    """
+    Brake pads wear down by a per-component rate (mm-equivalent per day) and are
+    replaced once they reach `service_threshold`; replacement resets the pad to
+    a new uniform(1.2, 1.5) thickness and marks the reading as serviced.
+
+    Writes "brake_system.brake_pad_thickness" and a boolean "serviced" array.
+    """
+
+    def __init__(self, wear_per_day: Tuple[float, float] = (0.002, 0.01), service_threshold: float = 0.25):
+        self.wear_per_day = wear_per_day
+        self.service_threshold = service_threshold
+        self.thickness = None
+        self.rate = None
+        self.last_t = None
+
+    def init_state(self, n_components, rng):
+        self.thickness = rng.uniform(0.4, 1.5, n_components)
+        self.rate = rng.uniform(*self.wear_per_day, n_components)
+        self.last_t = None
+
+    def apply(self, block, t_days, rng):
+        T, C = block["battery.temperature"].shape
+        dt = np.diff(t_days, prepend=t_days[0] if self.last_t is None else self.last_t)
+        self.last_t = t_days[-1]
+
+        # Noisy but non-negative wear per step, accumulated over the block
+        wear = np.maximum(rng.normal(1.0, 0.2, (T, C)), 0.0) * self.rate[None, :] * dt[:, None]
+        thickness = self.thickness[None, :] - np.cumsum(wear, axis=0)
+        serviced = np.zeros((T, C), dtype=bool)
+
+        # Resolve replacements column by column, only for components that cross the threshold;
+        # each pass handles the earliest remaining replacement of every such component
+        worn = np.flatnonzero((thickness < self.service_threshold).any(axis=0))
+        while worn.size:
+            first = np.argmax(thickness[:, worn] < self.service_threshold, axis=0)
+            new_pads = rng.uniform(1.2, 1.5, worn.size)
+            for col, row, pad in zip(worn, first, new_pads):
+                serviced[row, col] = True
+                thickness[row:, col] += pad - thickness[row, col]
+            worn = worn[(thickness[:, worn] < self.service_threshold).any(axis=0)]
+
+        self.thickness = thickness[-1].copy()
+        block["brake_system.brake_pad_thickness"] = thickness
+        block["serviced"] = serviced
+
+
+def default_processes():
+    return [
+        SpikeProcess(),
+        SensorDrift("battery.temperature", drift_per_day=0.3),
+        SensorDrift("motor.vibration_level", drift_per_day=0.01),
+        BrakeWear(),
+    ]
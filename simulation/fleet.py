@@ -0,0 +1,202 @@
+# simulation/fleet.py
+"""
+Time-series simulation of a persistent fleet.
+
+Unlike simulation/simulator.py, where every reading gets a fresh component,
+a FleetSimulator owns a fixed set of vehicles and components that age and
+degrade over time (see simulation/anomalies.py), so the data has realistic
+per-component history and cardinality.
+
+Usage:
+    python -m simulation.fleet --vehicles 100 --components 4 --steps 10000 --interval 60
+"""
+import argparse
+import time
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from simulation.anomalies import AnomalyProcess, default_processes
+from simulation.simulator import (
+    ERROR_CODES,
+    ERROR_WEIGHTS,
+    LAT_RANGE,
+    LON_RANGE,
+    _dumps,
+    _object_column,
+    _uuid4_strings,
+    frame_to_records,
+)
+
+SECONDS_PER_DAY = 86_400.0
+
+
+class FleetSimulator:
+    """
+    Generates time-ordered readings for `n_vehicles * components_per_vehicle`
+    persistent components, one reading per component every `interval_s` seconds.
+
+    Signals are per-component baselines plus noise, moved by the anomaly
+    processes; vehicles random-walk inside the Nigeria bounding box.
+    """
+
+    def __init__(self, n_vehicles: int = 100, components_per_vehicle: int = 4, seed: Optional[int] = None,
+                 start_time: Optional[datetime] = None, interval_s: float = 60.0,
+                 processes: Optional[List[AnomalyProcess]] = None):
+        self.rng = np.random.default_rng(seed)
+        self.start_time = start_time or datetime.now().replace(microsecond=0)
+        self.interval_s = interval_s
+        self.steps_done = 0
+
+        n = n_vehicles * components_per_vehicle
+        self.n_components = n
+        vehicle_numbers = self.rng.choice(np.arange(1000, 1000 + max(9000, n_vehicles)), n_vehicles, replace=False)
+        self.vehicle_ids = np.array([f"VH-{v}" for v in vehicle_numbers], dtype=object)
+        self.vehicle_of = np.repeat(np.arange(n_vehicles), components_per_vehicle)
+        self.component_ids = _uuid4_strings(self.rng, n)
+
+        # Per-component baselines; baseline spread + reading noise match the
+        # N(65, 5) / N(0.5, 0.1) marginals of simulation/simulator.py
+        self.base_temperature = self.rng.normal(65, 2, n)
+        self.base_vibration = self.rng.normal(0.5, 0.05, n)
+        self.base_voltage = self.rng.uniform(11.9, 12.6, n)
+        self.age_days = self.rng.integers(5, 366, n).astype(float)
+        start_day = np.datetime64(self.start_time.date(), "D").astype(np.int64)
+        self.last_service = start_day - self.rng.integers(1, 91, n)
+
+        self.vehicle_lat = self.rng.uniform(*LAT_RANGE, n_vehicles)
+        self.vehicle_lon = self.rng.uniform(*LON_RANGE, n_vehicles)
+
+        self.processes = default_processes() if processes is None else processes
+        for process in self.processes:
+            process.init_state(n, self.rng)
+
+    def _error_codes(self, shape) -> np.ndarray:
+        p = np.asarray(ERROR_WEIGHTS, dtype=float) / sum(ERROR_WEIGHTS)
+        return self.rng.choice(len(ERROR_CODES), size=shape, p=p).astype(np.int8)
+
+    def _walk_vehicles(self, n_steps: int):
+        # Small random walk per step (~1 km), reflected into the bounding box
+        steps = self.rng.normal(0, 0.01, (2, n_steps, len(self.vehicle_lat)))
+        lat = self.vehicle_lat[None, :] + np.cumsum(steps[0], axis=0)
+        lon = self.vehicle_lon[None, :] + np.cumsum(steps[1], axis=0)
+        lat = np.clip(lat, *LAT_RANGE)
+        lon = np.clip(lon, *LON_RANGE)
+        self.vehicle_lat, self.vehicle_lon = lat[-1].copy(), lon[-1].copy()
+        return lat, lon
+
+    def generate(self, n_steps: int) -> pd.DataFrame:
+        """
+        Advances the fleet by `n_steps` intervals and returns the
+        `n_steps * n_components` readings, ordered by time then component.
+        """
+        T, C = n_steps, self.n_components
+        rng = self.rng
+        step_idx = self.steps_done + np.arange(T)
+        t_days = step_idx * self.interval_s / SECONDS_PER_DAY
+
+        block = {
+            "battery.temperature": self.base_temperature[None, :] + rng.normal(0, 4.58, (T, C)),
+            "battery.voltage": self.base_voltage[None, :] + rng.uniform(-0.4, 0.4, (T, C)),
+            "motor.vibration_level": self.base_vibration[None, :] + rng.normal(0, 0.087, (T, C)),
+            "motor.torque": rng.uniform(10.0, 50.0, (T, C)),
+            "brake_system.brake_pad_thickness": np.full((T, C), np.nan),
+        }
+        for process in self.processes:
+            process.apply(block, t_days, rng)
+
+        thickness = block["brake_system.brake_pad_thickness"]
+        brake_temperature = block["battery.temperature"] + rng.uniform(5, 15, (T, C)) + 10 * np.nan_to_num(
+            1.5 - thickness, nan=0.0)
+
+        timestamps = (np.datetime64(self.start_time, "us")
+                      + (step_idx * self.interval_s * 1e6).astype("timedelta64[us]"))
+
+        # Last service date (as day numbers): the latest replacement so far, else the carried-over date
+        last_service = np.broadcast_to(self.last_service[None, :], (T, C))
+        serviced = block.get("serviced")
+        if serviced is not None and serviced.any():
+            step_days = timestamps.astype("datetime64[D]").astype(np.int64)
+            service_day = np.maximum.accumulate(np.where(serviced, step_days[:, None], -1), axis=0)
+            last_service = np.where(service_day >= 0, service_day, last_service)
+            self.last_service = last_service[-1].copy()
+
+        # Error codes follow the same weights as the bulk simulator, except when the state explains them
+        battery_codes = self._error_codes((T, C))
+        battery_codes[block["battery.temperature"] > 85] = ERROR_CODES.index("WARN_TEMP")
+        motor_codes = self._error_codes((T, C))
+        motor_codes[block["motor.vibration_level"] > 1.0] = ERROR_CODES.index("ERR_VIB")
+        brake_codes = self._error_codes((T, C))
+        brake_codes[thickness < 0.4] = ERROR_CODES.index("BRAKE_WEAR")
+
+        lat, lon = self._walk_vehicles(T)
+
+        def flat(values):
+            return values.reshape(-1)
+
+        frame = pd.DataFrame({
+            "component_id": _object_column(np.tile(self.component_ids, T)),
+            "vehicle_id": _object_column(np.tile(self.vehicle_ids[self.vehicle_of], T)),
+            "timestamp": np.repeat(timestamps, C).astype("datetime64[ns]"),
+            "location.latitude": flat(np.round(lat[:, self.vehicle_of], 6)),
+            "location.longitude": flat(np.round(lon[:, self.vehicle_of], 6)),
+            "battery.temperature": flat(np.round(block["battery.temperature"], 2)),
+            "battery.voltage": flat(np.round(block["battery.voltage"], 2)),
+            "battery.error_code": pd.Categorical.from_codes(flat(battery_codes), categories=ERROR_CODES),
+            "motor.vibration_level": flat(np.round(block["motor.vibration_level"], 3)),
+            "motor.torque": flat(np.round(block["motor.torque"], 2)),
+            "motor.error_code": pd.Categorical.from_codes(flat(motor_codes), categories=ERROR_CODES),
+            "brake_system.brake_pad_thickness": flat(np.round(thickness, 2)),
+            "brake_system.temperature": flat(np.round(brake_temperature, 2)),
+            "brake_system.error_code": pd.Categorical.from_codes(flat(brake_codes), categories=ERROR_CODES),
+            "last_service_date": _object_column(
+                np.datetime_as_string(flat(last_service).astype("datetime64[D]")).astype(object)),
+            "component_age_days": pd.array(
+                flat(np.floor(self.age_days[None, :] + t_days[:, None])).astype(np.int64), dtype="Int64"),
+        })
+
+        self.steps_done += T
+        return frame
+
+    def iter_readings(self, n_steps: int, steps_per_chunk: int = 1000) -> Iterator[pd.DataFrame]:
+        """Yields the readings of `n_steps` intervals in time-ordered chunks."""
+        for offset in range(0, n_steps, steps_per_chunk):
+            yield self.generate(min(steps_per_chunk, n_steps - offset))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate a persistent fleet over time")
+    parser.add_argument("--vehicles", type=int, default=100)
+    parser.add_argument("--components", type=int, default=4, help="Components per vehicle")
+    parser.add_argument("--steps", type=int, default=1000, help="Readings per component")
+    parser.add_argument("--interval", type=float, default=60.0, help="Seconds between readings")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--steps-per-chunk", type=int, default=1000)
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    output = args.output or ("data/sensor_history" if args.format == "parquet" else "data/sensor_data_stream.jsonl")
+    simulator = FleetSimulator(args.vehicles, args.components, seed=args.seed, interval_s=args.interval)
+    start = time.perf_counter()
+    rows = 0
+
+    if args.format == "parquet":
+        from utils.sensor_store import write_sensor_parquet
+        for chunk in simulator.iter_readings(args.steps, args.steps_per_chunk):
+            rows += write_sensor_parquet(chunk, output)
+    else:
+        with open(output, "wb") as f:
+            for chunk in simulator.iter_readings(args.steps, args.steps_per_chunk):
+                f.write(b"".join(_dumps(record) + b"\n" for record in frame_to_records(chunk)))
+                rows += len(chunk)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Wrote {rows} readings for {simulator.n_components} components to {output} "
+          f"in {elapsed:.1f}s ({rows / elapsed:,.0f}/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,20 @@
+import argparse
 import random
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import BinaryIO, Iterator, Optional
 from faker import Faker
 import json
 import time
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:  # pragma: no cover - orjson is optional
+    def _dumps(record):
+        return json.dumps(record).encode()
 
 fake = Faker()
 
@@ -59,10 +70,196 @@ def generate_component_data(component_id: str):
         "component_age_days": random.randint(5, 365)
     }
 
+# ----------------------------
+# Vectorized fleet generation
+# ----------------------------
+ERROR_CODES = ['OK', 'WARN_TEMP', 'ERR_VIB', 'LOW_BATT', 'BRAKE_WEAR', 'NONE']
+ERROR_WEIGHTS = [60, 10, 10, 10, 5, 5]
+ANOMALY_RATE = 0.05
+# Nigeria bounding box (roughly): lat 4.3–13.9, lon 3.3–14.7
+LAT_RANGE = (4.3, 13.9)
+LON_RANGE = (3.3, 14.7)
+# Lookup table instead of formatting one string per reading
+VEHICLE_IDS = np.array([f"VH-{i}" for i in range(1000, 10000)], dtype=object)
+
+
+def _uuid4_strings(rng: np.random.Generator, n: int) -> np.ndarray:
+    # Random UUID4s built from the seeded generator, formatted without a Python loop
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    hex_chars = np.frombuffer(raw.tobytes().hex().encode(), dtype="S1").reshape(n, 32)
+    out = np.full((n, 36), b"-", dtype="S1")
+    out[:, [i for i in range(36) if i not in (8, 13, 18, 23)]] = hex_chars
+    return out.view("S36").ravel().astype("U36").astype(object)
+
+
+def _object_column(values: np.ndarray) -> pd.Series:
+    # Keep string columns as object dtype, like utils.sensor_reader does
+    return pd.Series(values, dtype=object, copy=False)
+
+
+def _error_codes(rng: np.random.Generator, n: int) -> pd.Categorical:
+    p = np.asarray(ERROR_WEIGHTS, dtype=float) / sum(ERROR_WEIGHTS)
+    return pd.Categorical.from_codes(rng.choice(len(ERROR_CODES), size=n, p=p), categories=ERROR_CODES)
+
+
+def generate_fleet_batch(n: int, rng: np.random.Generator, start_time: Optional[datetime] = None,
+                         interval_s: float = 0.1) -> pd.DataFrame:
+    """
+    Generates `n` readings at once, with the same distributions and anomaly
+    rate as `generate_component_data`.
+
+    Returns a flat frame with the columns of utils.sensor_reader.SENSOR_SCHEMA;
+    reading i is stamped `start_time + i * interval_s`.
+    """
+    start_time = start_time or datetime.now()
+
+    temperature = np.round(rng.normal(65, 5, n), 2)
+    vibration = np.round(rng.normal(0.5, 0.1, n), 3)
+    voltage = np.round(rng.uniform(11.5, 13.0, n), 2)
+    brake_thickness = np.round(rng.uniform(0.4, 1.5, n), 2)
+
+    # Inject occasional anomalies
+    anomaly = rng.random(n) < ANOMALY_RATE
+    k = int(anomaly.sum())
+    temperature[anomaly] += rng.uniform(15, 30, k)
+    vibration[anomaly] += rng.uniform(0.5, 1.2, k)
+    voltage[anomaly] -= rng.uniform(1.0, 2.0, k)
+    brake_thickness[anomaly] -= rng.uniform(0.2, 0.4, k)
+
+    timestamps = np.datetime64(start_time, "us") + (np.arange(n) * interval_s * 1e6).astype("timedelta64[us]")
+    today = np.datetime64(start_time.date(), "D")
+    service_dates = np.datetime_as_string(today - np.arange(1, 91).astype("timedelta64[D]")).astype(object)
+
+    return pd.DataFrame({
+        "component_id": _object_column(_uuid4_strings(rng, n)),
+        "vehicle_id": _object_column(VEHICLE_IDS[rng.integers(0, len(VEHICLE_IDS), n)]),
+        "timestamp": timestamps.astype("datetime64[ns]"),
+        "location.latitude": np.round(rng.uniform(*LAT_RANGE, n), 6),
+        "location.longitude": np.round(rng.uniform(*LON_RANGE, n), 6),
+        "battery.temperature": temperature,
+        "battery.voltage": voltage,
+        "battery.error_code": _error_codes(rng, n),
+        "motor.vibration_level": vibration,
+        "motor.torque": np.round(rng.uniform(10.0, 50.0, n), 2),
+        "motor.error_code": _error_codes(rng, n),
+        "brake_system.brake_pad_thickness": brake_thickness,
+        "brake_system.temperature": np.round(temperature + rng.uniform(5, 15, n), 2),
+        "brake_system.error_code": _error_codes(rng, n),
+        "last_service_date": _object_column(service_dates[rng.integers(0, len(service_dates), n)]),
+        "component_age_days": pd.array(rng.integers(5, 366, n), dtype="Int64"),
+    })
+
+
+def generate_fleet(n_rows: int, batch_size: int = 100_000, seed: Optional[int] = None,
+                   start_time: Optional[datetime] = None, interval_s: float = 0.1) -> Iterator[pd.DataFrame]:
+    """Yields `n_rows` readings in batches; the same seed and batch_size give the same data."""
+    rng = np.random.default_rng(seed)
+    start_time = start_time or datetime.now()
+    for offset in range(0, n_rows, batch_size):
+        n = min(batch_size, n_rows - offset)
+        yield generate_fleet_batch(n, rng, start_time + timedelta(seconds=offset * interval_s), interval_s)
+
+
+def frame_to_records(frame: pd.DataFrame) -> Iterator[dict]:
+    """Converts a flat reading frame back into the nested JSON schema."""
+    cols = {col: frame[col].tolist() for col in frame.columns}
+    cols["timestamp"] = list(np.datetime_as_string(frame["timestamp"].to_numpy(), unit="us"))
+    ages = frame["component_age_days"].to_numpy(dtype=np.int64).tolist()
+    for i in range(len(frame)):
+        yield {
+            "component_id": cols["component_id"][i],
+            "vehicle_id": cols["vehicle_id"][i],
+            "timestamp": cols["timestamp"][i],
+            "location": {
+                "latitude": cols["location.latitude"][i],
+                "longitude": cols["location.longitude"][i]
+            },
+            "battery": {
+                "temperature": cols["battery.temperature"][i],
+                "voltage": cols["battery.voltage"][i],
+                "error_code": cols["battery.error_code"][i]
+            },
+            "motor": {
+                "vibration_level": cols["motor.vibration_level"][i],
+                "torque": cols["motor.torque"][i],
+                "error_code": cols["motor.error_code"][i]
+            },
+            "brake_system": {
+                "brake_pad_thickness": cols["brake_system.brake_pad_thickness"][i],
+                "temperature": cols["brake_system.temperature"][i],
+                "error_code": cols["brake_system.error_code"][i]
+            },
+            "last_service_date": cols["last_service_date"][i],
+            "component_age_days": ages[i]
+        }
+
+
+def write_jsonl(frame: pd.DataFrame, f: BinaryIO):
+    f.write(b"".join(_dumps(record) + b"\n" for record in frame_to_records(frame)))
+
+
+def stream_component_data(rate_per_s: float, n_rows: Optional[int] = None, seed: Optional[int] = None,
+                          batch_size: int = 1000) -> Iterator[dict]:
+    """
+    Yields readings in real time at about `rate_per_s` readings per second
+    (forever when `n_rows` is None). Timestamps are wall-clock arrival times.
+    """
+    rng = np.random.default_rng(seed)
+    interval = 1.0 / rate_per_s
+    emitted = 0
+    next_at = time.monotonic()
+    while n_rows is None or emitted < n_rows:
+        n = batch_size if n_rows is None else min(batch_size, n_rows - emitted)
+        batch = generate_fleet_batch(n, rng, datetime.now(), interval)
+        for record in frame_to_records(batch):
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            next_at += interval
+            record["timestamp"] = datetime.now().isoformat()
+            yield record
+            emitted += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic fleet sensor readings")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--output", default=None,
+                        help="JSONL file or Parquet dataset directory (default: data/sensor_data_stream.jsonl)")
+    parser.add_argument("--stream", action="store_true", help="Append readings in real time instead of in bulk")
+    parser.add_argument("--rate", type=float, default=10.0, help="Readings per second in --stream mode")
+    args = parser.parse_args()
+    if args.stream and args.format == "parquet":
+        # Streaming appends one JSON line per reading; a Parquet dataset is written in whole files
+        parser.error("--stream writes JSONL; it cannot be combined with --format parquet")
+
+    output = args.output or ("data/sensor_history" if args.format == "parquet" else "data/sensor_data_stream.jsonl")
+    start = time.perf_counter()
+
+    if args.stream:
+        # Simulate streaming; flush every reading so tailing consumers see it immediately
+        with open(output, "ab") as f:
+            for record in stream_component_data(args.rate, n_rows=args.rows, seed=args.seed):
+                f.write(_dumps(record) + b"\n")
+                f.flush()
+    elif args.format == "parquet":
+        from utils.sensor_store import write_sensor_parquet
+        for batch in generate_fleet(args.rows, args.batch_size, seed=args.seed):
+            write_sensor_parquet(batch, output)
+    else:
+        with open(output, "wb") as f:
+            for batch in generate_fleet(args.rows, args.batch_size, seed=args.seed):
+                write_jsonl(batch, f)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Wrote {args.rows} readings to {output} in {elapsed:.1f}s ({args.rows / elapsed:,.0f}/s)")
+
+
 # Run as standalone script
 if __name__ == "__main__":
-    with open("data/sensor_data_stream.jsonl", "w") as f:
-        for _ in range(1000):
-            data = generate_component_data(str(uuid.uuid4()))
-            f.write(json.dumps(data) + "\n")
-            time.sleep(0.1)  # Simulate streaming
+    main()
@@ -0,0 +1,88 @@
+import json
+from datetime import datetime
+
+import joblib
+import pandas as pd
+import pytest
+
+from engine.batch_scoring import PROGRESS_FILE, read_decisions, run_batch_scoring, score_frame
+from models.failure_predictor import SCORING_COLUMNS, WINDOWED_SCORING_COLUMNS, train_failure_model
+from models.feature_store import FeatureStore
+from simulation.fleet import FleetSimulator
+from simulation.simulator import frame_to_records
+from utils.sensor_store import load_sensor_history
+
+PATH = "data/sensor_data_stream.jsonl"
+COSTS = {"cost_failure": 5000, "early_fix_cost": 1000}
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("model") / "failure_predictor.pkl"
+    train_failure_model(load_sensor_history(PATH, columns=SCORING_COLUMNS), model_path=str(path))
+    return str(path)
+
+
+@pytest.mark.parametrize("fmt,workers", [("csv", 1), ("parquet", 2)])
+def test_sharded_scoring_matches_single_pass(tmp_path, model_path, fmt, workers):
+    stats = run_batch_scoring(PATH, str(tmp_path), model_path, COSTS, workers=workers, shard_size=300, fmt=fmt)
+
+    assert stats.shards_total == 4 and stats.rows == 1000
+    expected = score_frame(joblib.load(model_path), load_sensor_history(PATH, columns=SCORING_COLUMNS), COSTS)
+    decisions = read_decisions(str(tmp_path))
+    for col in ("component_id", "decision"):
+        assert decisions[col].tolist() == expected[col].tolist()
+    pd.testing.assert_series_equal(decisions["failure_probability"], expected["failure_probability"])
+
+
+def test_resume_skips_completed_shards(tmp_path, model_path):
+    run_batch_scoring(PATH, str(tmp_path), model_path, COSTS, workers=1, shard_size=300)
+    # Simulate a crash after two shards
+    (tmp_path / "part-00002.csv").unlink()
+    (tmp_path / "part-00003.csv").unlink()
+    (tmp_path / PROGRESS_FILE).write_text(
+        (tmp_path / PROGRESS_FILE).read_text().replace("[0, 1, 2, 3]", "[0, 1]"))
+
+    stats = run_batch_scoring(PATH, str(tmp_path), model_path, COSTS, workers=1, shard_size=300)
+
+    assert (stats.shards_total, stats.shards_skipped, stats.rows) == (4, 2, 400)
+    assert len(read_decisions(str(tmp_path))) == 1000
+    with pytest.raises(ValueError):
+        run_batch_scoring(PATH, str(tmp_path), model_path, COSTS, workers=1, shard_size=500)
+
+
+def test_resume_refuses_a_different_model(tmp_path, model_path):
+    output = tmp_path / "out"
+    copy = tmp_path / "failure_predictor.pkl"
+    copy.write_bytes(open(model_path, "rb").read())
+    run_batch_scoring(PATH, str(output), str(copy), COSTS, workers=1, shard_size=300)
+
+    # A newly promoted checkpoint at the same path is a different run
+    train_failure_model(load_sensor_history(PATH, columns=SCORING_COLUMNS).head(500), model_path=str(copy))
+    with pytest.raises(ValueError, match="different run"):
+        run_batch_scoring(PATH, str(output), str(copy), COSTS, workers=1, shard_size=300)
+
+
+def test_window_features_do_not_depend_on_workers_or_resume(tmp_path):
+    simulator = FleetSimulator(n_vehicles=10, components_per_vehicle=2, seed=0, start_time=datetime(2025, 7, 1))
+    path = tmp_path / "fleet.jsonl"
+    path.write_text("".join(json.dumps(record) + "\n" for record in frame_to_records(simulator.generate(50))))
+    history = load_sensor_history(str(path), columns=WINDOWED_SCORING_COLUMNS)
+    model_path = str(tmp_path / "windowed.pkl")
+    train_failure_model(history, model_path=model_path, feature_store=FeatureStore(window=5))
+
+    runs = {}
+    for workers in (1, 3):
+        output = tmp_path / f"workers-{workers}"
+        run_batch_scoring(str(path), str(output), model_path, COSTS, workers=workers, shard_size=150)
+        runs[workers] = read_decisions(str(output))
+    pd.testing.assert_frame_equal(runs[1], runs[3])
+
+    # Resuming replays the completed shards into the window before scoring the rest
+    output = tmp_path / "workers-1"
+    for part in ("part-00005.csv", "part-00006.csv"):
+        (output / part).unlink()
+    (output / PROGRESS_FILE).write_text((output / PROGRESS_FILE).read_text().replace(", 5, 6", ""))
+    stats = run_batch_scoring(str(path), str(output), model_path, COSTS, workers=1, shard_size=150)
+    assert stats.rows == 250
+    pd.testing.assert_frame_equal(read_decisions(str(output)), runs[1])
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routes import predict
+from api.utils.model_server import BayesianModelServer
+from models.bayesian_failure import BayesianFailureModel, fit_laplace
+from models.failure_predictor import failure_features
+from models.feature_store import FeatureStore
+from simulation.simulator import frame_to_records, generate_fleet_batch
+
+
+def _synthetic(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 2))
+    y = (rng.random(n) < 1 / (1 + np.exp(-(1.5 * X[:, 0] - 1.0 * X[:, 1] + 0.5)))).astype(float)
+    return X, y
+
+
+def test_laplace_posterior_covers_true_coefficients():
+    X, y = _synthetic(5000)
+    mean, covariance = fit_laplace(X, y)
+    sd = np.sqrt(np.diag(covariance))
+
+    assert np.all(np.abs(mean - [1.5, -1.0, 0.5]) < 3 * sd)
+    # More data, tighter posterior
+    _, small_covariance = fit_laplace(*_synthetic(500))
+    assert np.all(np.diag(covariance) < np.diag(small_covariance))
+
+
+def test_draws_roundtrip_and_intervals(tmp_path):
+    X, y = _synthetic(2000)
+    frame = pd.DataFrame(X, columns=["a", "b"])
+    model = BayesianFailureModel.fit(frame, pd.Series(y), n_draws=500)
+    path = str(tmp_path / "posterior.npz")
+    model.save(path)
+
+    loaded = BayesianFailureModel.load(path)
+    result = loaded.predict(frame.head(50), credible_level=0.9)
+    pd.testing.assert_frame_equal(result, model.predict(frame.head(50), credible_level=0.9))
+    assert loaded.draws.dtype == np.float32 and loaded.draws.shape == (500, 3)
+    assert ((result["lower"] <= result["failure_probability"]) & (result["failure_probability"] <= result["upper"])).all()
+    assert (loaded.predict(frame.head(50), 0.5)["upper"] <= result["upper"] + 1e-6).all()
+
+
+def test_interval_route(tmp_path):
+    rng = np.random.default_rng(0)
+    readings = generate_fleet_batch(300, rng)
+    X = failure_features(readings)
+    path = str(tmp_path / "posterior.npz")
+    BayesianFailureModel.fit(X, pd.Series(X["error_flag"]), n_draws=200).save(path)
+
+    app = FastAPI()
+    app.include_router(predict.router, prefix="/predict-failure")
+    app.state.feature_store = FeatureStore()
+    app.state.bayes_server = None
+    record = next(frame_to_records(readings.head(1)))
+    with TestClient(app) as client:
+        assert client.post("/predict-failure/interval", json=record).status_code == 503
+
+        server = BayesianModelServer(path, credible_level=0.8, batch_window_ms=1)
+        app.state.bayes_server = server
+        client.portal.call(server.start)
+        response = client.post("/predict-failure/interval", json=record)
+        client.portal.call(server.stop)
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["component_id"] == record["component_id"] and body["credible_level"] == 0.8
+    assert body["lower"] <= body["failure_probability"] <= body["upper"]
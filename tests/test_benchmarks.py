@@ -0,0 +1,33 @@
+import json
+from benchmarks import cases  # noqa: F401
+from benchmarks.datasets import synthetic_readings
+from benchmarks.harness import REGISTRY, compare, load_results, run_benchmark, save_results
+
+
+def test_datasets_are_reproducible():
+    first = synthetic_readings(100, seed=7).copy()
+    synthetic_readings.cache_clear()
+    assert first.equals(synthetic_readings(100, seed=7))
+
+
+def test_every_benchmark_runs_and_round_trips(tmp_path):
+    results = [run_benchmark(bench, 50, repeat=1) for bench in REGISTRY.values()]
+    for result in results:
+        assert result.items == 50, result.key
+        assert result.median_s > 0 and result.peak_memory_mb is not None
+    api = next(r for r in results if r.name == "api.predict_failure")
+    assert set(api.latency_ms) == {"p50", "p95", "p99"}
+
+    path = tmp_path / "results.json"
+    save_results(results, str(path))
+    assert json.loads(path.read_text())["environment"]["python"]
+    assert set(load_results(str(path))) == {r.key for r in results}
+
+
+def test_compare_flags_regressions():
+    baseline = {"a[10]": {"median_s": 1.0}, "b[10]": {"median_s": 1.0}, "gone[10]": {"median_s": 1.0}}
+    current = {"a[10]": {"median_s": 1.1}, "b[10]": {"median_s": 1.5}, "new[10]": {"median_s": 1.0}}
+    rows = {row["key"]: row for row in compare(current, baseline, tolerance=0.2)}
+    assert set(rows) == {"a[10]", "b[10]"}
+    assert not rows["a[10]"]["regression"]
+    assert rows["b[10]"]["regression"]
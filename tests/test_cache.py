@@ -0,0 +1,61 @@
+from api.utils.cache import MISSING, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_expiry_and_counters():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl_s=5, clock=clock)
+
+    assert cache.get("c1") is MISSING
+    cache.set("c1", {"ok": True})
+    assert cache.get("c1") == {"ok": True}
+
+    clock.now = 6
+    assert cache.get("c1") is MISSING
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(cache) == 0
+
+
+def test_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl_s=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_invalidate_component_drops_derived_keys():
+    cache = TTLCache(maxsize=10, ttl_s=60)
+    cache.set("c1", "status")
+    cache.set(("c1", "v1", "digest"), "decision")
+    cache.set(("c2", "v1", "digest"), "other")
+
+    assert cache.invalidate_component("c1") == 2
+    assert cache.get(("c2", "v1", "digest")) == "other"
+
+
+def test_component_index_follows_eviction_and_expiry():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=3, ttl_s=5, clock=clock)
+    cache.set(("c1", "a"), 1)
+    cache.set(("c1", "b"), 2)
+    cache.set(("c2", "a"), 3)
+    cache.set(("c3", "a"), 4)  # evicts ("c1", "a")
+
+    assert cache.invalidate_component("c1") == 1
+    clock.now = 6
+    assert cache.get(("c2", "a")) is MISSING
+    assert cache.invalidate_component("c2") == 0
+    assert cache.invalidate_component("c3") == 1
+    assert len(cache) == 0 and cache._by_component == {}
@@ -0,0 +1,67 @@
+import mongomock
+from database.indexes import ensure_indexes
+from database.insert_data import bulk_upsert_readings
+from database.queries import get_latest_reading, get_reading_history, latest_readings_pipeline, list_components_page
+
+
+def _reading(component_id, timestamp, temperature=65.0):
+    return {
+        "component_id": component_id,
+        "vehicle_id": "VH-1000",
+        "timestamp": timestamp,
+        "location": {"latitude": 6.5, "longitude": 3.4},
+        "battery": {"temperature": temperature},
+    }
+
+
+def _db():
+    db = mongomock.MongoClient().db
+    ensure_indexes(db)
+    readings = [
+        _reading("c1", "2025-07-13T10:00:00", 60),
+        _reading("c1", "2025-07-13T12:00:00", 70),
+        _reading("c2", "2025-07-13T11:00:00", 80),
+        _reading("c3", "2025-07-13T09:00:00", 90),
+    ]
+    bulk_upsert_readings(db.components, readings[:2] + readings[2:], batch_size=2, latest_collection=db.components_latest)
+    # An older reading arriving late must not replace the latest one
+    bulk_upsert_readings(db.components, [_reading("c1", "2025-07-13T08:00:00", 50)],
+                         latest_collection=db.components_latest)
+    return db
+
+
+def test_latest_collection_keeps_newest_reading():
+    db = _db()
+
+    latest = get_latest_reading(db, "c1")
+    assert latest["timestamp"] == "2025-07-13T12:00:00"
+    assert latest["geo"] == {"type": "Point", "coordinates": [3.4, 6.5]}
+    assert "_id" not in latest
+    assert db.components_latest.count_documents({}) == 3
+
+
+def test_latest_pipeline_matches_materialized_collection():
+    db = _db()
+    aggregated = {doc["component_id"]: doc["timestamp"] for doc in db.components.aggregate(latest_readings_pipeline())}
+    materialized = {doc["component_id"]: doc["timestamp"] for doc in db.components_latest.find()}
+
+    assert aggregated == materialized
+
+
+def test_cursor_pagination():
+    db = _db()
+
+    first = list_components_page(db, limit=2)
+    assert [c["component_id"] for c in first["items"]] == ["c1", "c2"]
+    second = list_components_page(db, limit=2, after=first["next_cursor"])
+    assert [c["component_id"] for c in second["items"]] == ["c3"]
+    assert second["next_cursor"] is None
+
+
+def test_history_pagination():
+    db = _db()
+
+    page = get_reading_history(db, "c1", limit=2)
+    assert [r["timestamp"][-8:] for r in page["items"]] == ["12:00:00", "10:00:00"]
+    older = get_reading_history(db, "c1", limit=2, before=page["next_cursor"])
+    assert [r["timestamp"][-8:] for r in older["items"]] == ["08:00:00"]
@@ -0,0 +1,121 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routes import recommend
+from api.utils import processor
+from engine.cost_model import CostModel, CostModelStore, load_cost_model, parse_cost_model
+from engine.decision_engine import apply_decision_engine
+
+CONFIG = {
+    "version": "v1",
+    "cost_failure": 5000,
+    "early_fix_cost": 1000,
+    "vehicle_classes": {"bus": {"early_fix_cost": 400}},
+    "component_types": {"battery": {"cost_failure": 8000, "early_fix_cost": 1500}},
+    "vehicles": {"VH-9": {"early_fix_cost": 300}},
+}
+
+
+def test_shipped_config_is_valid():
+    cost_model = load_cost_model("config/cost_model.json")
+    assert cost_model.cost_failure == 5000
+    assert cost_model.version.startswith("2025-07-01+")
+
+
+def test_legacy_key_and_validation():
+    assert parse_cost_model({"failure_cost": 7000}).cost_failure == 7000
+    for bad in ({"failure_cost": 1, "cost_failure": 2}, {"early_fix_cost": -1}, {"threshold": 1.5},
+                {"cost_falure": 10}, {"vehicles": {"VH-1": {"fix": 10}}}, {"vehicles": {"VH-1": {"cost_failure": "x"}}}):
+        with pytest.raises(ValueError):
+            parse_cost_model(bad)
+
+
+def test_version_changes_with_content():
+    a, b = parse_cost_model(CONFIG), parse_cost_model(dict(CONFIG, early_fix_cost=900))
+    assert a.version.startswith("v1+") and b.version.startswith("v1+")
+    assert a.version != b.version
+    assert parse_cost_model(dict(CONFIG)).version == a.version
+
+
+def test_vectorized_lookup_matches_costs_for():
+    cost_model = parse_cost_model(CONFIG)
+    rng = np.random.default_rng(0)
+    vehicles = rng.choice(["VH-1", "VH-9", None], 1000)
+    types = rng.choice(["battery", "motor", None], 1000)
+    classes = rng.choice(["bus", "car"], 1000)
+
+    cost_failure, cost_fix = cost_model.lookup(vehicles, types, classes)
+    expected = [cost_model.costs_for(v, t, c) for v, t, c in zip(vehicles, types, classes)]
+    np.testing.assert_array_equal(cost_failure, [e[0] for e in expected])
+    np.testing.assert_array_equal(cost_fix, [e[1] for e in expected])
+    # The vehicle beats the component type, which beats the vehicle class
+    assert cost_model.costs_for("VH-9", "battery", "bus") == (8000, 300)
+
+
+def test_decisions_are_stamped_with_the_version():
+    cost_model = parse_cost_model(CONFIG)
+    df = pd.DataFrame({"component_id": ["a", "b"], "vehicle_id": ["VH-9", "VH-1"], "failure_probability": [0.1, 0.1]})
+    result = apply_decision_engine(df, cost_model)
+    # 500 > 300 for VH-9, 500 < 1000 for VH-1
+    assert result["decision"].tolist() == ["FIX", "WAIT"]
+    assert set(result["cost_model_version"]) == {cost_model.version}
+
+
+def test_store_hot_reloads_and_keeps_last_good_model(tmp_path):
+    path = tmp_path / "costs.json"
+    path.write_text(json.dumps(CONFIG))
+    store = CostModelStore(str(path), reload_interval_s=0)
+    first = store.get()
+
+    path.write_text(json.dumps(dict(CONFIG, early_fix_cost=900)))
+    os.utime(path, (1, 1))
+    assert store.get().early_fix_cost == 900
+
+    path.write_text("{ not json")
+    os.utime(path, (2, 2))
+    assert store.get().early_fix_cost == 900
+    assert store.get().version != first.version
+
+
+def test_store_falls_back_to_defaults_on_an_invalid_first_load(tmp_path):
+    path = tmp_path / "costs.json"
+    path.write_text(json.dumps(dict(CONFIG, threshold=7)))
+    store = CostModelStore(str(path), reload_interval_s=0)
+    assert store.get() == CostModel()
+
+    path.write_text(json.dumps(CONFIG))
+    os.utime(path, (1, 1))
+    assert store.get().version.startswith("v1+")
+
+
+def test_api_uses_the_reloaded_cost_model(tmp_path, monkeypatch):
+    path = tmp_path / "costs.json"
+    path.write_text(json.dumps(CONFIG))
+    monkeypatch.setattr(processor, "cost_models", CostModelStore(str(path), reload_interval_s=0))
+    monkeypatch.setattr(recommend, "cost_models", processor.cost_models)
+    app = FastAPI()
+    app.include_router(recommend.router, prefix="/recommend-maintenance")
+    client = TestClient(app)
+
+    with open("data/sensor_data_stream.jsonl") as f:
+        record = json.loads(next(f))
+    record.update(vehicle_id="VH-1", battery=dict(record["battery"], temperature=20.0, error_code="OK"),
+                  motor=dict(record["motor"], vibration_level=0.1))
+
+    first = client.post("/recommend-maintenance", json=record).json()
+    assert first["recommended_action"] == "wait"
+
+    path.write_text(json.dumps(dict(CONFIG, early_fix_cost=100)))
+    os.utime(path, (1, 1))
+    second = client.post("/recommend-maintenance", json=record).json()
+    assert second["recommended_action"] == "fix_now"
+    assert second["cost_model_version"] != first["cost_model_version"]
+
+    batch = client.post("/recommend-maintenance/batch", json=[record]).json()
+    assert batch["results"][0] == second
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from benchmarks.datasets import synthetic_readings
+from dashboard.aggregations import HISTOGRAM_EDGES, DashboardAggregates, load_aggregates, refresh_aggregates
+from simulation.simulator import write_jsonl
+
+
+def test_chunked_aggregates_match_whole_frame():
+    df = synthetic_readings(5_000)
+    agg = DashboardAggregates(cell_deg=1.0, sample_size=300)
+    for start in range(0, len(df), 1_700):
+        agg.update(df.iloc[start:start + 1_700])
+
+    assert agg.rows == len(df)
+    edges = HISTOGRAM_EDGES["battery.temperature"]
+    clipped = np.clip(df["battery.temperature"], edges[0], edges[-1])
+    np.testing.assert_array_equal(agg.histograms["battery.temperature"], np.histogram(clipped, edges)[0])
+
+    cells = agg.grid_cells()
+    assert cells["readings"].sum() == len(df)
+    expected = df.groupby([np.floor(df["location.latitude"]), np.floor(df["location.longitude"])]).size()
+    assert len(cells) == len(expected)
+
+    anomalies = (df["battery.temperature"] > 85) & (df["motor.vibration_level"] > 1.0)
+    assert agg.anomalies_over_time()["anomalies"].sum() == anomalies.sum()
+    assert dict(zip(*agg.error_code_counts().to_numpy().T)) == df["battery.error_code"].astype(object).value_counts().to_dict()
+
+    sample = agg.sample()
+    assert len(sample) == 300 and sample["component_id"].is_unique
+    assert set(sample["component_id"]) <= set(df["component_id"])
+    assert agg.latest()["component_id"].tolist() == df["component_id"].tail(50).tolist()
+
+
+def test_jsonl_refresh_reads_only_appended_lines(tmp_path):
+    path = tmp_path / "stream.jsonl"
+    first, second = synthetic_readings(1_000).iloc[:600], synthetic_readings(1_000).iloc[600:]
+    with open(path, "wb") as f:
+        write_jsonl(first, f)
+
+    agg, changed = refresh_aggregates(str(path))
+    assert changed and agg.rows == 600
+    assert refresh_aggregates(str(path), agg) == (agg, False)
+
+    with open(path, "ab") as f:
+        write_jsonl(second, f)
+        f.write(b'{"component_id": "half-wri')  # a writer mid-line
+    agg, changed = refresh_aggregates(str(path), agg)
+    assert changed and agg.rows == 1_000
+
+    # A rewritten (shorter) file is aggregated from scratch
+    with open(path, "wb") as f:
+        write_jsonl(first.iloc[:100], f)
+    agg, changed = refresh_aggregates(str(path), agg)
+    assert changed and agg.rows == 100
+
+    # So is one rewritten in place (same inode) that ends up longer than what was read
+    with open(path, "wb") as f:
+        write_jsonl(second, f)
+    agg, changed = refresh_aggregates(str(path), agg)
+    assert changed and agg.rows == len(second)
+
+
+def test_cached_aggregates_survive_a_restart(tmp_path):
+    path = tmp_path / "stream.jsonl"
+    with open(path, "wb") as f:
+        write_jsonl(synthetic_readings(1_000), f)
+
+    agg = load_aggregates(str(path), cache_dir=str(tmp_path / "cache"), sample_size=100)
+    restored = load_aggregates(str(path), cache_dir=str(tmp_path / "cache"), sample_size=100)
+    assert restored is not agg and restored.rows == 1_000
+    pd.testing.assert_frame_equal(restored.sample(), agg.sample())
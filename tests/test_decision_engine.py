@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+from engine.decision_engine import apply_decision_engine, recommend_action
+
+COSTS = {"cost_failure": 5000, "early_fix_cost": 1000}
+
+
+def _frame(probs, **extra):
+    return pd.DataFrame({
+        "component_id": [f"C-{i}" for i in range(len(probs))],
+        "vehicle_id": [f"VH-{i}" for i in range(len(probs))],
+        "failure_probability": probs,
+        **extra,
+    })
+
+
+def test_matches_scalar_recommend_action():
+    probs = np.random.default_rng(0).random(500)
+    result = apply_decision_engine(_frame(probs), COSTS, threshold=0.6)
+
+    for prob, decision, explanation in zip(probs, result["decision"], result["explanation"]):
+        assert (decision, explanation) == recommend_action(prob, 5000, 1000, threshold=0.6)
+    np.testing.assert_allclose(result["expected_failure_cost"], probs * 5000)
+
+
+def test_vehicle_class_and_row_overrides():
+    df = _frame([0.1, 0.1, 0.1], vehicle_class=["bus", "car", "bus"], early_fix_cost=[np.nan, np.nan, 2000])
+    config = dict(COSTS, vehicle_classes={"bus": {"early_fix_cost": 400}})
+    result = apply_decision_engine(df, config)
+
+    # bus: 500 > 400 -> FIX; car: 500 < 1000 -> WAIT; row override: 500 < 2000 -> WAIT
+    assert result["decision"].tolist() == ["FIX", "WAIT", "WAIT"]
+    assert result["explanation"][0] == "Expected cost: 500.00 > fix cost: 400"
+
+
+def test_passthrough_columns_and_order():
+    df = _frame([0.9, 0.0], latitude=[6.5, 7.1], longitude=[3.3, 4.2])
+    df.index = [10, 3]
+    result = apply_decision_engine(df, COSTS)
+
+    assert result["component_id"].tolist() == ["C-0", "C-1"]
+    assert result["latitude"].tolist() == [6.5, 7.1]
+    assert result["decision"].tolist() == ["FIX", "WAIT"]
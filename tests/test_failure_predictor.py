@@ -0,0 +1,59 @@
+from datetime import datetime
+
+import joblib
+import pandas as pd
+
+from models.failure_predictor import (
+    SCORING_COLUMNS,
+    list_checkpoints,
+    predict_failure_probabilities,
+    save_checkpoint,
+    train_failure_model,
+    train_failure_model_incremental,
+)
+from simulation.fleet import FleetSimulator
+
+
+def _chunks(n_chunks, seed=0):
+    simulator = FleetSimulator(n_vehicles=50, components_per_vehicle=4, seed=seed, start_time=datetime(2025, 7, 1))
+    return [chunk[SCORING_COLUMNS] for chunk in simulator.iter_readings(50 * n_chunks, steps_per_chunk=50)]
+
+
+def test_training_does_not_mutate_input(tmp_path):
+    df = _chunks(1)[0]
+    before = df.copy()
+
+    model = train_failure_model(df, model_path=str(tmp_path / "model.pkl"))
+    predict_failure_probabilities(model, df)
+
+    pd.testing.assert_frame_equal(df, before)
+
+
+def test_incremental_training_resumes_from_checkpoints(tmp_path):
+    path = str(tmp_path / "failure_predictor.pkl")
+    chunks = _chunks(6)
+
+    first, _ = train_failure_model_incremental(chunks[:3], path)
+    seen = first.steps[0][1].n_samples_seen_
+    model, metrics = train_failure_model_incremental(chunks[3:], path)
+
+    assert [v for v, _ in list_checkpoints(path)] == [1, 2]
+    # The second run continued from the first: running scaler stats cover both
+    assert model.steps[0][1].n_samples_seen_ > seen
+    assert metrics.n > 0 and metrics.accuracy > 0.9
+    served = joblib.load(path)
+    pd.testing.assert_series_equal(
+        predict_failure_probabilities(served, chunks[0])["failure_probability"],
+        predict_failure_probabilities(model, chunks[0])["failure_probability"])
+
+
+def test_checkpoints_are_pruned(tmp_path):
+    path = str(tmp_path / "failure_predictor.pkl")
+    chunk = _chunks(1)[0]
+    for _ in range(4):
+        train_failure_model_incremental([chunk], path)
+
+    save_checkpoint(joblib.load(path), path, keep=2)
+    assert [v for v, _ in list_checkpoints(path)] == [4, 5]
+    assert sorted(p.name for p in tmp_path.glob("*.json")) == ["failure_predictor.v0004.json",
+                                                               "failure_predictor.v0005.json"]
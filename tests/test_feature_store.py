@@ -0,0 +1,103 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.models.schemas import SensorInput
+from api.utils.processor import failure_features, windowed_store
+from models.failure_predictor import WINDOWED_SCORING_COLUMNS, predict_failure_probabilities, train_failure_model
+from models.feature_store import SIGNALS, FeatureStore
+from simulation.fleet import FleetSimulator
+from simulation.simulator import frame_to_records
+
+
+def _readings(n_steps=30, seed=0):
+    simulator = FleetSimulator(n_vehicles=10, components_per_vehicle=2, seed=seed, start_time=datetime(2025, 7, 1))
+    return simulator.generate(n_steps)
+
+
+def test_window_aggregates():
+    store = FeatureStore(window=3, signals=["x"])
+    for value in [1.0, 5.0, 2.0]:
+        features = store.update("c", [value])
+    assert features == {"x": 2.0, "x.mean": pytest.approx(8 / 3), "x.max": 5.0, "x.slope": pytest.approx(0.5)}
+
+    # 5.0 stays the max until it drops out of the window
+    assert store.update("c", [3.0])["x.max"] == 5.0
+    features = store.update("c", [1.0])
+    assert features["x.max"] == 3.0
+    assert features["x.mean"] == pytest.approx(2.0)
+    assert features["x.slope"] == pytest.approx(-0.5)
+
+
+def test_bulk_path_matches_per_reading_updates():
+    df = _readings().sample(frac=1, random_state=0)
+    chunks = [df.iloc[:250], df.iloc[250:]]
+
+    bulk_store = FeatureStore(window=7, capacity=4)
+    bulk = pd.concat([bulk_store.update_frame(chunk) for chunk in chunks])
+
+    store, rows = FeatureStore(window=7), {}
+    for chunk in chunks:
+        for idx, row in chunk.sort_values("timestamp", kind="stable").iterrows():
+            rows[idx] = store.update(row["component_id"], row[SIGNALS].to_numpy(dtype=float))
+    expected = pd.DataFrame.from_dict(rows, orient="index").loc[bulk.index]
+
+    np.testing.assert_allclose(bulk[expected.columns].to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-9)
+    assert list(bulk.columns) == store.feature_names
+
+
+def test_api_features_match_training_features():
+    df = _readings(n_steps=10)
+    training = FeatureStore(window=5).update_frame(df)
+
+    store = FeatureStore(window=5)
+    served = [failure_features(SensorInput(**record), store) for record in frame_to_records(df)]
+
+    served = pd.DataFrame(served)[training.columns]
+    np.testing.assert_allclose(served.to_numpy(), training.to_numpy(), rtol=1e-9, atol=1e-9)
+
+
+def test_windowed_model_scores_without_explicit_store(tmp_path):
+    df = _readings()[WINDOWED_SCORING_COLUMNS]
+    model = train_failure_model(df, model_path=str(tmp_path / "model.pkl"), feature_store=FeatureStore(window=5))
+
+    assert model.feature_window_ == 5
+    assert len(model.feature_names_in_) == len(FeatureStore().feature_names)
+    predictions = predict_failure_probabilities(model, df)
+    assert predictions["failure_probability"].between(0, 1).all()
+
+
+def test_repeated_readings_are_not_counted_twice():
+    store = FeatureStore(window=3, signals=["x"])
+    store.update("c", [1.0], timestamp=datetime(2025, 7, 1, 10))
+    features = store.update("c", [5.0], timestamp=datetime(2025, 7, 1, 11))
+    # A retry of the same reading and a late, older one leave the window unchanged
+    assert store.update("c", [5.0], timestamp=datetime(2025, 7, 1, 11)) == features
+    assert store.update("c", [9.0], timestamp=datetime(2025, 7, 1, 10, 30))["x.mean"] == features["x.mean"]
+    assert store.update("c", [3.0], timestamp=datetime(2025, 7, 1, 12))["x.mean"] == pytest.approx(3.0)
+
+    # The bulk path records the newest timestamp too
+    bulk = FeatureStore(window=3, signals=["x"])
+    bulk.update_frame(pd.DataFrame({"component_id": ["c", "c"], "timestamp": ["2025-07-01T11:00", "2025-07-01T10:00"],
+                                    "x": [5.0, 1.0], "battery.error_code": "OK",
+                                    "last_service_date": "2025-06-01", "component_age_days": 10}))
+    assert bulk.update("c", [9.0], timestamp=datetime(2025, 7, 1, 11))["x.mean"] == pytest.approx(3.0)
+    bulk.reset("c")
+    assert bulk.update("c", [9.0], timestamp=datetime(2025, 7, 1, 11))["x.mean"] == 9.0
+
+
+def test_invalid_timestamps_are_rejected():
+    record = next(frame_to_records(_readings(n_steps=1)))
+    for field in ("timestamp", "last_service_date"):
+        with pytest.raises(ValueError):
+            SensorInput(**dict(record, **{field: "13/07/2025"}))
+
+
+def test_store_is_only_used_by_windowed_models():
+    store = FeatureStore(window=5)
+    assert windowed_store(SimpleNamespace(model=SimpleNamespace()), store) is None
+    assert windowed_store(SimpleNamespace(model=None), store) is None
+    assert windowed_store(SimpleNamespace(model=SimpleNamespace(feature_window_=5)), store) is store
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulation.anomalies import AnomalyProcess, BrakeWear, SensorDrift
+from simulation.fleet import FleetSimulator
+from simulation.simulator import write_jsonl
+from utils.sensor_reader import SENSOR_COLUMNS, load_sensor_data
+
+START = datetime(2025, 7, 1)
+
+
+def _history(seed=3, **kwargs):
+    simulator = FleetSimulator(n_vehicles=10, components_per_vehicle=4, seed=seed, start_time=START, **kwargs)
+    return pd.concat(simulator.iter_readings(400, steps_per_chunk=150), ignore_index=True)
+
+
+def test_fleet_is_persistent_and_reproducible():
+    df = _history(interval_s=3600)
+
+    assert list(df.columns) == SENSOR_COLUMNS
+    assert len(df) == 400 * 40
+    assert df["component_id"].nunique() == 40
+    assert df["vehicle_id"].nunique() == 10
+    assert df.groupby("component_id")["vehicle_id"].nunique().eq(1).all()
+    assert df["timestamp"].is_monotonic_increasing
+    pd.testing.assert_frame_equal(df, _history(interval_s=3600))
+
+
+def test_brake_wear_resets_on_service():
+    df = _history(interval_s=6 * 3600)  # 100 days
+    thickness = df.pivot(index="timestamp", columns="component_id", values="brake_system.brake_pad_thickness")
+    service_date = df.pivot(index="timestamp", columns="component_id", values="last_service_date")
+
+    jumps = thickness.diff() > 0.5
+    assert jumps.any().any()
+    # Between services the pads only wear down (up to rounding)
+    assert (thickness.diff()[~jumps].fillna(0) <= 0.01).all().all()
+    # Every replacement moves the last service date to the replacement day
+    for component in jumps.columns[jumps.any()]:
+        ts = jumps.index[jumps[component]][0]
+        assert service_date.loc[ts, component] == ts.strftime("%Y-%m-%d")
+    assert (df["brake_system.brake_pad_thickness"] >= BrakeWear().service_threshold - 0.01).all()
+
+
+def test_sensor_drift_is_recalibrated_over_long_runs():
+    drift = SensorDrift("battery.temperature", drift_per_day=0.3, onset_rate_per_day=0.05)
+    rng = np.random.default_rng(0)
+    drift.init_state(20, rng)
+    blocks = []
+    for start in range(0, 5 * 365, 30):  # five years, block by block
+        t_days = start + np.arange(0, 30, 0.25)
+        block = {"battery.temperature": np.zeros((t_days.size, 20))}
+        drift.apply(block, t_days, rng)
+        blocks.append(block["battery.temperature"])
+    values = np.vstack(blocks)
+
+    assert values.min() >= 0 and values.max() < drift.max_drift == pytest.approx(18)
+    # Every component drifted and was recalibrated, several times
+    recalibrations = (np.diff(values, axis=0) < -drift.max_drift / 2).sum(axis=0)
+    assert (recalibrations >= 3).all()
+
+
+def test_anomaly_processes_must_implement_apply():
+    with pytest.raises(TypeError):
+        AnomalyProcess()
+
+
+def test_jsonl_roundtrip(tmp_path):
+    df = FleetSimulator(n_vehicles=5, seed=1, start_time=START).generate(20)
+    path = tmp_path / "fleet.jsonl"
+    with open(path, "wb") as f:
+        write_jsonl(df, f)
+
+    pd.testing.assert_frame_equal(load_sensor_data(str(path)), df, check_categorical=False)
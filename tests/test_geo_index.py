@@ -0,0 +1,81 @@
+import mongomock
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routes import dispatch
+from api.utils.geo import DispatchIndex
+from database.indexes import ensure_indexes
+from database.insert_data import bulk_upsert_readings
+from engine.geo_index import GridIndex, haversine_km
+from tests.test_status_routes import _AsyncDatabase
+
+
+def _points(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-60, 60, n), rng.uniform(-180, 180, n)
+
+
+def test_within_matches_brute_force():
+    lat, lon = _points()
+    index = GridIndex(lat, lon, {"id": np.arange(len(lat))}, cell_deg=1.0)
+    for q_lat, q_lon, radius in [(0, 0, 500), (45, 170, 1500), (-30, -179.5, 800), (10, 100, 5)]:
+        expected = np.flatnonzero(haversine_km(q_lat, q_lon, lat, lon) <= radius)
+        result = index.within(q_lat, q_lon, radius)
+        assert sorted(result["id"]) == sorted(expected)
+        assert result["distance_km"].is_monotonic_increasing
+
+
+def test_nearest_matches_brute_force_across_antimeridian():
+    lat, lon = _points()
+    index = GridIndex(lat, lon, {"id": np.arange(len(lat))}, cell_deg=0.5)
+    for q_lat, q_lon in [(0, 179.9), (20, -179.9), (59, 0)]:
+        expected = np.argsort(haversine_km(q_lat, q_lon, lat, lon))[:7]
+        assert list(index.nearest(q_lat, q_lon, k=7)["id"]) == list(expected)
+
+
+def test_missing_locations_are_dropped():
+    index = GridIndex([1.0, np.nan, 2.0], [1.0, 3.0, np.nan], {"id": [1, 2, 3]})
+    assert len(index) == 1
+    assert list(index.nearest(0, 0, k=5)["id"]) == [1]
+
+
+def _client():
+    db = mongomock.MongoClient().db
+    ensure_indexes(db)
+    readings = [
+        {"component_id": "near-fix", "vehicle_id": "VH-1", "timestamp": "2025-07-13T10:00:00",
+         "location": {"latitude": 6.50, "longitude": 3.40},
+         "battery": {"temperature": 95.0, "error_code": "OK"}, "motor": {"vibration_level": 0.2}},
+        {"component_id": "near-wait", "vehicle_id": "VH-1", "timestamp": "2025-07-13T10:00:00",
+         "location": {"latitude": 6.52, "longitude": 3.38},
+         "battery": {"temperature": 40.0, "error_code": "OK"}, "motor": {"vibration_level": 0.2}},
+        {"component_id": "far-fix", "vehicle_id": "VH-2", "timestamp": "2025-07-13T10:00:00",
+         "location": {"latitude": 9.05, "longitude": 7.49},
+         "battery": {"temperature": 40.0, "error_code": "E42"}, "motor": {"vibration_level": 0.2}},
+    ]
+    bulk_upsert_readings(db.components, readings, latest_collection=db.components_latest)
+
+    app = FastAPI()
+    app.include_router(dispatch.router, prefix="/dispatch")
+    app.state.db = _AsyncDatabase(db)
+    app.state.dispatch_index = DispatchIndex(refresh_interval_s=60)
+    return TestClient(app)
+
+
+def test_dispatch_routes():
+    client = _client()
+
+    nearby = client.get("/dispatch/nearby", params={"latitude": 6.5244, "longitude": 3.3792, "radius_km": 50}).json()
+    assert nearby["index_size"] == 2
+    assert [r["component_id"] for r in nearby["results"]] == ["near-fix"]
+
+    everything = client.get("/dispatch/nearby", params={"latitude": 6.5244, "longitude": 3.3792,
+                                                        "radius_km": 50, "action": "any"}).json()
+    assert [r["component_id"] for r in everything["results"]] == ["near-wait", "near-fix"]
+
+    nearest = client.get("/dispatch/nearest", params={"latitude": 9.0, "longitude": 7.5, "k": 5}).json()
+    assert [r["component_id"] for r in nearest["results"]] == ["far-fix", "near-fix"]
+    assert nearest["results"][0]["recommended_action"] == "fix_now"
+
+    assert client.get("/dispatch/nearby", params={"latitude": 95, "longitude": 0}).status_code == 422
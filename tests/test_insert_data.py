@@ -0,0 +1,49 @@
+import mongomock
+import pytest
+from pymongo.errors import AutoReconnect
+from database.insert_data import bulk_upsert_readings, ingest_jsonl, iter_jsonl_records
+
+PATH = "data/sensor_data_stream.jsonl"
+
+
+def test_ingest_is_batched_and_idempotent(tmp_path):
+    path = tmp_path / "stream.jsonl"
+    with open(PATH) as f:
+        path.write_text("".join(f.readlines()[:250]))
+    db = mongomock.MongoClient().db
+
+    stats = ingest_jsonl(str(path), db, batch_size=100)
+    assert stats.documents == 250
+    assert stats.batches == 3
+    assert stats.upserted == 250
+
+    again = ingest_jsonl(str(path), db, batch_size=100)
+    assert again.upserted == 0
+    assert db.components.count_documents({}) == 250
+
+
+def test_retries_transient_errors(monkeypatch):
+    collection = mongomock.MongoClient().db.components
+    original = collection.bulk_write
+    failures = iter([AutoReconnect("primary stepped down")])
+
+    def flaky_bulk_write(*args, **kwargs):
+        error = next(failures, None)
+        if error:
+            raise error
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(collection, "bulk_write", flaky_bulk_write)
+    records = list(iter_jsonl_records(PATH))[:10]
+    stats = bulk_upsert_readings(collection, records, batch_size=10, backoff_s=0)
+
+    assert stats.retries == 1
+    assert collection.count_documents({}) == 10
+
+
+def test_non_retryable_errors_propagate(monkeypatch):
+    collection = mongomock.MongoClient().db.components
+    monkeypatch.setattr(collection, "bulk_write", lambda *a, **k: (_ for _ in ()).throw(ValueError("bad")))
+
+    with pytest.raises(ValueError):
+        bulk_upsert_readings(collection, [{"component_id": "c", "timestamp": "t"}], backoff_s=0)
@@ -0,0 +1,127 @@
+import json
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from pymongo.errors import ServerSelectionTimeoutError
+from api.routes import monitoring
+from api.utils.instrumentation import REQUEST_ERRORS, REQUEST_SECONDS, REQUESTS, MetricsMiddleware
+from utils.metrics import Counter, Gauge, Histogram, Registry, render_multiprocess
+
+
+def test_histogram_exposition():
+    registry = Registry()
+    hist = Histogram("t_seconds", "Test", ["route"], buckets=(0.1, 1.0), registry=registry)
+    for value in (0.05, 0.5, 5):
+        hist.observe(value, route="/a")
+    Counter("t_total", "Test", ["cache"], callback=lambda: {("status",): 3}, registry=registry)
+
+    text = registry.render()
+    assert 't_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 't_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 't_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 't_seconds_count{route="/a"} 3' in text
+    assert 't_total{cache="status"} 3' in text
+    assert "# TYPE t_seconds histogram" in text
+
+
+def _app(model_loaded=True, db_ok=True):
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(monitoring.router)
+
+    @app.get("/items/{item_id}")
+    def item(item_id: str):
+        if item_id == "boom":
+            raise HTTPException(status_code=503, detail="down")
+        return {"id": item_id}
+
+    async def ping(command):
+        if not db_ok:
+            raise ServerSelectionTimeoutError("no servers")
+        return {"ok": 1}
+
+    app.state.model_server = SimpleNamespace(is_loaded=model_loaded)
+    app.state.bayes_server = None
+    app.state.db = SimpleNamespace(command=ping)
+    return app
+
+
+def test_middleware_labels_by_route_template():
+    client = TestClient(_app())
+    before = REQUESTS.value(method="GET", route="/items/{item_id}", status="200")
+    timed = REQUEST_SECONDS.count(method="GET", route="/items/{item_id}")
+    errors = REQUEST_ERRORS.value(method="GET", route="/items/{item_id}")
+
+    client.get("/items/a")
+    client.get("/items/b")
+    client.get("/items/boom")
+    client.get("/nowhere")
+
+    assert REQUESTS.value(method="GET", route="/items/{item_id}", status="200") == before + 2
+    assert REQUEST_SECONDS.count(method="GET", route="/items/{item_id}") == timed + 3
+    assert REQUEST_ERRORS.value(method="GET", route="/items/{item_id}") == errors + 1
+    assert REQUESTS.value(method="GET", route="unmatched", status="404") >= 1
+
+    text = client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/items/{item_id}",status="200"}' in text
+    assert 'cache_hits_total{cache="status"}' in text
+
+
+def test_healthz():
+    assert TestClient(_app()).get("/healthz").json() == {
+        "status": "ok", "checks": {"model": "ok", "bayes_model": "disabled", "database": "ok"}}
+
+    response = TestClient(_app(db_ok=False)).get("/healthz")
+    assert response.status_code == 503
+    assert response.json()["checks"]["database"] == "unreachable"
+
+    assert TestClient(_app(model_loaded=False)).get("/healthz").status_code == 503
+
+
+def test_route_labels_include_router_prefixes():
+    from api.main import app
+
+    # No lifespan (so no database): the routes only need to be matched for their labels
+    client = TestClient(app, raise_server_exceptions=False)
+    client.post("/recommend-maintenance/batch", json={"columns": {}})
+    status = client.get("/get-component-status/get-component-status/c1").status_code
+
+    assert REQUESTS.value(method="POST", route="/recommend-maintenance/batch", status="422") >= 1
+    assert REQUESTS.value(method="GET", route="/get-component-status/get-component-status/{component_id}",
+                          status=str(status)) >= 1
+    assert REQUESTS.value(method="POST", route="/batch", status="422") == 0
+
+
+def test_multiprocess_render_merges_worker_snapshots(tmp_path):
+    registry = Registry()
+    requests = Counter("t_requests_total", "Test", ["route"], registry=registry)
+    in_progress = Gauge("t_in_progress", "Test", [], registry=registry)
+    ratio = Gauge("t_ratio", "Test", [], registry=registry, multiprocess_mode="all")
+    seconds = Histogram("t_seconds", "Test", [], buckets=(1.0,), registry=registry)
+    requests.inc(2, route="/a")
+    in_progress.set(1)
+    ratio.set(0.5)
+    seconds.observe(0.5)
+
+    live = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    exited_pid = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited_pid.wait()
+    try:
+        other = {"t_requests_total": [[["/a"], 3]], "t_in_progress": [[[], 2]], "t_ratio": [[[], 0.25]],
+                 "t_seconds": [[[], [[0, 1], 4.0]]]}
+        (tmp_path / f"metrics-{live.pid}.json").write_text(json.dumps(other))
+        (tmp_path / f"metrics-{exited_pid.pid}.json").write_text(json.dumps(other))
+        text = render_multiprocess(str(tmp_path), registry)
+    finally:
+        live.kill()
+        live.wait()
+
+    # Counters and histograms keep exited workers' counts; gauges only count live workers
+    assert 't_requests_total{route="/a"} 8' in text
+    assert "t_in_progress 3" in text
+    assert f't_ratio{{pid="{os.getpid()}"}} 0.5' in text and f't_ratio{{pid="{live.pid}"}} 0.25' in text
+    assert f'pid="{exited_pid.pid}"' not in text
+    assert 't_seconds_bucket{le="1"} 1' in text and 't_seconds_count 3' in text and "t_seconds_sum 8.5" in text
@@ -0,0 +1,61 @@
+import asyncio
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from api.utils.model_server import ModelServer
+
+FEATURES = ["battery.temperature", "motor.vibration_level", "error_flag"]
+
+
+def _train(seed):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "battery.temperature": rng.normal(65, 10, 200),
+        "motor.vibration_level": rng.normal(0.5, 0.3, 200),
+        "error_flag": rng.integers(0, 2, 200),
+    })
+    y = ((X["battery.temperature"] > 70) | (X["error_flag"] == 1)).astype(int)
+    return make_pipeline(StandardScaler(), LogisticRegression()).fit(X, y)
+
+
+def test_concurrent_requests_are_batched(tmp_path):
+    path = tmp_path / "model.pkl"
+    model = _train(0)
+    joblib.dump(model, path)
+    server = ModelServer(str(path), batch_window_ms=50, max_batch_size=64)
+    rows = [{"battery.temperature": 60 + i, "motor.vibration_level": 0.5, "error_flag": i % 2} for i in range(20)]
+
+    calls = []
+    original = server.predict_batch
+    server.predict_batch = lambda batch: calls.append(len(batch)) or original(batch)
+
+    async def run():
+        await server.start()
+        try:
+            return await asyncio.gather(*(server.predict(r) for r in rows))
+        finally:
+            await server.stop()
+
+    probs = asyncio.run(run())
+    expected = model.predict_proba(pd.DataFrame(rows, columns=FEATURES))[:, 1]
+    np.testing.assert_allclose(probs, expected)
+    assert calls == [20]
+
+
+def test_hot_reload_on_file_change(tmp_path):
+    path = tmp_path / "model.pkl"
+    joblib.dump(_train(0), path)
+    server = ModelServer(str(path), reload_interval_s=0)
+    server.load()
+    first = server.model
+
+    joblib.dump(_train(1), path)
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    server.predict_batch([{"battery.temperature": 60, "motor.vibration_level": 0.5, "error_flag": 0}])
+
+    assert server.model is not first
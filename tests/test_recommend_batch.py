@@ -0,0 +1,114 @@
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from api.routes import recommend
+
+app = FastAPI()
+app.include_router(recommend.router, prefix="/recommend-maintenance")
+client = TestClient(app)
+
+with open("data/sensor_data_stream.jsonl") as f:
+    RECORDS = [json.loads(next(f)) for _ in range(20)]
+
+
+def test_batch_matches_single_endpoint_in_order():
+    response = client.post("/recommend-maintenance/batch", json=RECORDS)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["errors"] == []
+
+    for record, result in zip(RECORDS, body["results"]):
+        single = client.post("/recommend-maintenance", json=record).json()
+        assert result == single
+
+
+def test_batch_reports_per_item_errors():
+    bad = dict(RECORDS[1])
+    bad.pop("battery")
+    response = client.post("/recommend-maintenance/batch", json=[RECORDS[0], bad, RECORDS[2]])
+    body = response.json()
+
+    assert body["results"][0]["component_id"] == RECORDS[0]["component_id"]
+    assert body["results"][1] is None
+    assert body["results"][2]["component_id"] == RECORDS[2]["component_id"]
+    assert [e["index"] for e in body["errors"]] == [1]
+
+
+def test_columnar_payload():
+    columns = {
+        "component_id": ["a", "b", "c"],
+        "vehicle_id": ["VH-1", "VH-2", "VH-3"],
+        "battery.temperature": [60.0, 90.0, "hot"],
+        "motor.vibration_level": [0.5, 0.5, 0.5],
+        "battery.error_code": ["OK", "OK", "OK"],
+    }
+    body = client.post("/recommend-maintenance/batch", json={"columns": columns}).json()
+
+    assert body["results"][0]["recommended_action"] == "wait"
+    assert body["results"][1]["recommended_action"] == "fix_now"
+    assert body["results"][2] is None
+    assert body["errors"][0]["index"] == 2
+
+
+def test_columnar_payload_missing_column():
+    response = client.post("/recommend-maintenance/batch", json={"columns": {"component_id": ["a"]}})
+    assert response.status_code == 422
+
+
+def test_single_recommendation_is_cached():
+    from api.utils.cache import recommendation_cache
+
+    recommendation_cache.clear()
+    hits = recommendation_cache.hits
+    first = client.post("/recommend-maintenance", json=RECORDS[0]).json()
+    second = client.post("/recommend-maintenance", json=RECORDS[0]).json()
+
+    assert first == second
+    assert recommendation_cache.hits == hits + 1
+
+
+def test_empty_and_all_invalid_batches():
+    empty_columns = {col: [] for col in ["component_id", "vehicle_id", "battery.temperature",
+                                         "motor.vibration_level", "battery.error_code"]}
+    for payload, n_items in (([], 0), ({"columns": empty_columns}, 0), ([{"x": 1}], 1)):
+        response = client.post("/recommend-maintenance/batch", json=payload)
+        assert response.status_code == 200, payload
+        body = response.json()
+        assert body["results"] == [None] * n_items
+        assert [e["index"] for e in body["errors"]] == list(range(n_items))
+
+
+def test_single_route_is_served_at_the_prefix():
+    current = client.post("/recommend-maintenance", json=RECORDS[0])
+    legacy = client.post("/recommend-maintenance/recommend-maintenance", json=RECORDS[0])
+    assert current.status_code == legacy.status_code == 200
+    assert current.json() == legacy.json()
+    assert "/recommend-maintenance/recommend-maintenance" not in app.openapi()["paths"]
+
+
+def test_columnar_cells_are_type_checked():
+    columns = {
+        "component_id": ["a", 123, "c", "d", "e"],
+        "vehicle_id": ["VH-1", "VH-2", 7, "VH-4", "VH-5"],
+        "battery.temperature": [60.0, 60.0, 60.0, 60.0, [1, 2]],
+        "motor.vibration_level": [0.5, 0.5, 0.5, 0.5, 0.5],
+        "battery.error_code": ["OK", "OK", "OK", 5, "OK"],
+        "component_type": [None, "battery", "battery", "motor", ["battery"]],
+    }
+    response = client.post("/recommend-maintenance/batch", json={"columns": columns})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["results"][0]["component_id"] == "a"
+    assert body["results"][1:] == [None] * 4
+
+    errors = {e["index"]: e["errors"] for e in body["errors"]}
+    assert [(err["loc"], err["type"], err["input"]) for err in errors[1]] == [(["component_id"], "string_type", 123)]
+    assert [err["loc"] for err in errors[2]] == [["vehicle_id"]]
+    assert [err["loc"] for err in errors[3]] == [["battery", "error_code"]]
+    assert [(err["loc"], err["type"]) for err in errors[4]] == [(["battery", "temperature"], "float_type"),
+                                                                (["component_type"], "string_type")]
+
+    # Same shape as the errors of the list-of-objects payload
+    bad = dict(RECORDS[0], component_id=123)
+    (listed,) = client.post("/recommend-maintenance/batch", json=[bad]).json()["errors"][0]["errors"]
+    assert set(listed) == set(errors[1][0]) and listed["type"] == "string_type"
@@ -0,0 +1,94 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import joblib
+import numpy as np
+import pytest
+
+from api.utils.model_server import ModelServer
+from models.failure_predictor import (
+    SCORING_COLUMNS,
+    WINDOWED_SCORING_COLUMNS,
+    failure_features,
+    train_failure_model,
+    train_failure_model_incremental,
+)
+from models.feature_store import FeatureStore
+from models import scoring_kernel
+from models.scoring_kernel import ScoringKernel, export_scoring_kernel
+from utils.sensor_store import load_sensor_history
+
+PATH = "data/sensor_data_stream.jsonl"
+
+
+@pytest.fixture(scope="module")
+def readings():
+    return load_sensor_history(PATH, columns=WINDOWED_SCORING_COLUMNS)
+
+
+@pytest.mark.parametrize("kind", ["logistic", "sgd", "windowed"])
+def test_kernel_matches_sklearn(tmp_path, readings, kind):
+    model_path = str(tmp_path / "model.pkl")
+    store = None
+    if kind == "logistic":
+        model = train_failure_model(readings[SCORING_COLUMNS], model_path=model_path)
+    elif kind == "sgd":
+        model, _ = train_failure_model_incremental([readings[SCORING_COLUMNS]], model_path)
+    else:
+        model = train_failure_model(readings, model_path=model_path, feature_store=FeatureStore(window=5))
+        store = FeatureStore(window=5)
+
+    export_scoring_kernel(model, str(tmp_path / "kernel.json"), model_version=3)
+    kernel = ScoringKernel.load(str(tmp_path / "kernel.json"))
+
+    X = failure_features(readings, store)[list(model.feature_names_in_)]
+    np.testing.assert_allclose(kernel.predict_proba(X), model.predict_proba(X), rtol=1e-12, atol=1e-12)
+    assert list(kernel.feature_names_in_) == list(model.feature_names_in_)
+    assert getattr(kernel, "feature_window_", None) == getattr(model, "feature_window_", None)
+    assert kernel.model_version == 3
+
+
+def test_model_server_serves_kernel(tmp_path, readings):
+    model = train_failure_model(readings[SCORING_COLUMNS], model_path=str(tmp_path / "model.pkl"))
+    export_scoring_kernel(model, str(tmp_path / "kernel.json"))
+    server = ModelServer(str(tmp_path / "kernel.json"))
+    server.load()
+
+    rows = failure_features(readings.head(20)).to_dict("records")
+    expected = joblib.load(tmp_path / "model.pkl").predict_proba(failure_features(readings.head(20)))[:, 1]
+    np.testing.assert_allclose(server.predict_batch(rows), expected, rtol=1e-12)
+
+
+def test_kernel_scoring_needs_only_numpy(tmp_path, readings):
+    model = train_failure_model(readings[SCORING_COLUMNS], model_path=str(tmp_path / "model.pkl"))
+    export_scoring_kernel(model, str(tmp_path / "kernel.json"))
+    code = (
+        "import sys\n"
+        "from models.scoring_kernel import load_model\n"
+        f"kernel = load_model({str(tmp_path / 'kernel.json')!r})\n"
+        "kernel.predict_proba([[65.0, 0.5, 0]])\n"
+        "print(sorted(m for m in ('sklearn', 'scipy', 'joblib', 'pandas') if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_npy_kernel_rejects_weights_from_another_export(tmp_path, readings, monkeypatch):
+    path, promoted = str(tmp_path / "kernel.npy"), str(tmp_path / "promoted.npy")
+    columns = readings[SCORING_COLUMNS]
+    export_scoring_kernel(train_failure_model(columns, model_path=str(tmp_path / "v1.pkl")), path, model_version=1)
+    model = train_failure_model(columns.head(len(columns) // 2), model_path=str(tmp_path / "v2.pkl"))
+    export_scoring_kernel(model, promoted, model_version=2)
+
+    # The new sidecar is in place but the old weights have not been replaced yet
+    shutil.copy(f"{promoted}.json", f"{path}.json")
+    with pytest.raises(ValueError, match="does not match"):
+        ScoringKernel.load(path, retry_delay_s=0)
+
+    # A load that catches the gap reads the pair again once the weights land
+    monkeypatch.setattr(scoring_kernel.time, "sleep", lambda seconds: os.replace(promoted, path))
+    kernel = ScoringKernel.load(path)
+    assert kernel.model_version == 2
+    np.testing.assert_array_equal(kernel.coef, model.steps[-1][1].coef_[0])
@@ -0,0 +1,45 @@
+import json
+import pandas as pd
+import pytest
+from utils.sensor_reader import iter_sensor_chunks, load_sensor_data
+
+PATH = "data/sensor_data_stream.jsonl"
+
+
+@pytest.mark.parametrize("engine", ["python", "pyarrow"])
+def test_matches_json_normalize(engine):
+    if engine == "pyarrow":
+        pytest.importorskip("pyarrow.json")
+    with open(PATH) as f:
+        expected = pd.json_normalize([json.loads(line) for line in f])
+
+    df = load_sensor_data(PATH, chunk_size=128, engine=engine)
+
+    assert len(df) == len(expected)
+    for col in ["battery.temperature", "motor.vibration_level", "location.latitude", "component_age_days"]:
+        assert (df[col].to_numpy() == expected[col].to_numpy()).all()
+    assert df["battery.error_code"].astype(str).tolist() == expected["battery.error_code"].tolist()
+    assert (df["timestamp"] == pd.to_datetime(expected["timestamp"])).all()
+
+
+def test_chunking_and_projection():
+    columns = ["component_id", "battery.temperature"]
+    chunks = list(iter_sensor_chunks(PATH, columns=columns, chunk_size=300))
+
+    assert [len(c) for c in chunks] == [300, 300, 300, 100]
+    assert all(list(c.columns) == columns for c in chunks)
+
+
+def test_nested_nulls(tmp_path):
+    path = tmp_path / "stream.jsonl"
+    path.write_text(json.dumps({"component_id": "c1", "location": None, "battery": {"temperature": 70.0}}) + "\n")
+
+    df = load_sensor_data(str(path), columns=["component_id", "location.latitude", "battery.temperature"], engine="python")
+
+    assert df["location.latitude"].isna().all()
+    assert df["battery.temperature"].tolist() == [70.0]
+
+
+def test_unknown_column():
+    with pytest.raises(ValueError):
+        load_sensor_data(PATH, columns=["battery.nope"])
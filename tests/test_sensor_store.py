@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from utils.sensor_store import convert_jsonl_to_parquet, load_sensor_history
+
+PATH = "data/sensor_data_stream.jsonl"
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    root = tmp_path_factory.mktemp("sensor_history")
+    convert_jsonl_to_parquet(PATH, str(root), chunk_size=400)
+    return root
+
+
+def test_partitioned_by_date_and_vehicle(store):
+    files = list(store.glob("date=*/vehicle_id=*/*.parquet"))
+    assert files
+    assert all(f.parent.parent.name.startswith("date=2025-") for f in files)
+
+
+def test_roundtrip_matches_jsonl(store):
+    expected = load_sensor_history(PATH).sort_values("component_id").reset_index(drop=True)
+    df = load_sensor_history(str(store)).sort_values("component_id").reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(df, expected, check_categorical=False)
+
+
+def test_projection_and_filters_match_jsonl(store):
+    columns = ["component_id", "battery.temperature", "motor.vibration_level", "battery.error_code"]
+    filters = [("vehicle_id", "in", ["VH-1705", "VH-8953"]), ("battery.temperature", ">", 60)]
+
+    df = load_sensor_history(str(store), columns=columns, filters=filters)
+    expected = load_sensor_history(PATH, columns=columns, filters=filters)
+
+    assert list(df.columns) == columns
+    assert sorted(df["component_id"]) == sorted(expected["component_id"])
+    assert len(df) > 0
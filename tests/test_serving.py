@@ -0,0 +1,123 @@
+import asyncio
+import os
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from api import serving
+from api.utils.model_server import ModelServer
+from models.scoring_kernel import ScoringKernel, load_model
+from tests.test_model_server import FEATURES, _train
+from utils import config
+
+
+def _rows(n=50):
+    rng = np.random.default_rng(1)
+    return pd.DataFrame({
+        "battery.temperature": rng.normal(65, 10, n),
+        "motor.vibration_level": rng.normal(0.5, 0.3, n),
+        "error_flag": rng.integers(0, 2, n),
+    })
+
+
+def test_prepare_exports_a_memory_mapped_kernel_once(tmp_path, monkeypatch):
+    model_path, kernel_path = str(tmp_path / "model.pkl"), str(tmp_path / "kernel.npy")
+    model = _train(0)
+    joblib.dump(model, model_path)
+    monkeypatch.setattr(config, "MODEL_PATH", model_path)
+    monkeypatch.setenv("MODEL_PATH", model_path)
+
+    assert serving.prepare_shared_model(kernel_path=kernel_path) == kernel_path
+    assert config.MODEL_PATH == os.environ["MODEL_PATH"] == kernel_path
+
+    kernel = load_model(kernel_path)
+    assert isinstance(kernel, ScoringKernel)
+    # Read-only views of the mapped file, not per-worker copies
+    assert not kernel.coef.flags.writeable and not kernel.coef.flags.owndata
+    X = _rows()
+    np.testing.assert_allclose(kernel.predict_proba(X[FEATURES].to_numpy()), model.predict_proba(X))
+
+    # Up to date: reused, not exported again
+    mtime = os.path.getmtime(kernel_path)
+    serving.prepare_shared_model(model_path, kernel_path)
+    assert os.path.getmtime(kernel_path) == mtime
+
+
+def test_watcher_exports_promoted_checkpoints(tmp_path):
+    model_path, kernel_path = str(tmp_path / "model.pkl"), str(tmp_path / "kernel.npy")
+    joblib.dump(_train(0), model_path)
+    serving.prepare_shared_model(model_path, kernel_path)
+    server = ModelServer(kernel_path, reload_interval_s=0)
+    server.load()
+
+    stop = threading.Event()
+    serving.watch_model(model_path, kernel_path, interval_s=0.01, stop=stop)
+    promoted = _train(1)
+    joblib.dump(promoted, model_path)
+    exported = os.path.getmtime(kernel_path)
+    os.utime(model_path, (exported + 1, exported + 1))
+    deadline = time.monotonic() + 5
+    while os.path.getmtime(kernel_path) == exported and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stop.set()
+
+    server.maybe_reload()
+    X = _rows()[FEATURES].to_numpy()
+    np.testing.assert_allclose(server.model.predict_proba(X), promoted.predict_proba(_rows()[FEATURES]))
+
+
+def test_kernel_paths_are_served_as_they_are(monkeypatch):
+    monkeypatch.setattr(config, "MODEL_PATH", "model/failure_kernel.json")
+    assert serving.prepare_shared_model(kernel_path="unused.npy") == "model/failure_kernel.json"
+
+
+def test_stop_answers_queued_requests(tmp_path):
+    path = tmp_path / "model.pkl"
+    joblib.dump(_train(0), path)
+    # A batch window far longer than the test: only stop() can answer these
+    server = ModelServer(str(path), batch_window_ms=60_000, max_batch_size=64)
+    row = {"battery.temperature": 90.0, "motor.vibration_level": 0.5, "error_flag": 1}
+
+    async def run():
+        await server.start()
+        pending = [asyncio.ensure_future(server.predict(row)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        await server.stop()
+        return await asyncio.wait_for(asyncio.gather(*pending), 1)
+
+    results = asyncio.run(run())
+    assert len(results) == 5 and all(0 <= p <= 1 for p in results)
+
+
+def test_windowed_models_need_a_single_worker(tmp_path, monkeypatch):
+    model_path = str(tmp_path / "model.pkl")
+    joblib.dump(_train(0), model_path)
+    windowed = _train(1)
+    windowed.feature_window_ = 5
+    monkeypatch.setattr(serving, "prepare_metrics_dir", lambda workers: None)
+    monkeypatch.setattr(serving, "prepare_shared_model", lambda path: path)
+    monkeypatch.setattr(config, "MODEL_PATH", model_path)
+    monkeypatch.setattr(config, "API_SERVING_WORKERS", 1)
+    monkeypatch.setenv("MODEL_PATH", model_path)
+    monkeypatch.setenv("API_SERVING_WORKERS", "1")
+
+    assert serving.start_serving(4) == model_path
+    assert config.API_SERVING_WORKERS == 4
+    server = ModelServer(model_path, reload_interval_s=0)
+    server.load()
+    served = server.model
+
+    # A windowed checkpoint promoted under several workers is not hot-reloaded
+    joblib.dump(windowed, model_path)
+    os.utime(model_path, (time.time() + 5, time.time() + 5))
+    server.maybe_reload()
+    assert server.model is served
+
+    # ... and several workers refuse to start on one
+    with pytest.raises(ValueError, match="--workers 1"):
+        serving.start_serving(2)
+    assert serving.start_serving(1) == model_path
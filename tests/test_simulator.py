@@ -0,0 +1,37 @@
+import uuid
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from simulation.simulator import generate_fleet, generate_fleet_batch, write_jsonl
+from utils.sensor_reader import SENSOR_COLUMNS, load_sensor_data
+
+START = datetime(2025, 7, 13, 12, 0, 0)
+
+
+def test_seeded_generation_is_reproducible():
+    a = pd.concat(generate_fleet(1000, batch_size=300, seed=7, start_time=START), ignore_index=True)
+    b = pd.concat(generate_fleet(1000, batch_size=300, seed=7, start_time=START), ignore_index=True)
+
+    pd.testing.assert_frame_equal(a, b)
+    assert a["timestamp"].is_monotonic_increasing
+
+
+def test_distributions_match_scalar_generator():
+    df = generate_fleet_batch(200_000, np.random.default_rng(0), START)
+
+    assert list(df.columns) == SENSOR_COLUMNS
+    assert abs((df["battery.error_code"] == "OK").mean() - 0.6) < 0.01
+    # ~5% anomalies push the temperature mean up by ~1.1°C over the N(65, 5) baseline
+    assert abs(df["battery.temperature"].mean() - 66.1) < 0.1
+    assert df["vehicle_id"].str.match(r"^VH-\d{4}$").all()
+    assert df["component_age_days"].between(5, 365).all()
+    assert uuid.UUID(df["component_id"][0]).version == 4
+
+
+def test_jsonl_roundtrip(tmp_path):
+    df = generate_fleet_batch(500, np.random.default_rng(1), START)
+    path = tmp_path / "stream.jsonl"
+    with open(path, "wb") as f:
+        write_jsonl(df, f)
+
+    pd.testing.assert_frame_equal(load_sensor_data(str(path)), df, check_categorical=False)
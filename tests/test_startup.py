@@ -0,0 +1,19 @@
+import subprocess
+import sys
+
+from benchmarks.startup import measure_startup
+
+
+# Import times are checked by `python -m benchmarks.startup`, not here: wall-clock
+# budgets are flaky on a loaded machine, what a fresh interpreter imports is not
+def test_entry_points_do_not_import_heavy_libraries():
+    for result in measure_startup(repeat=1, scale=100):
+        assert result.forbidden == [], f"{result.module} imports {result.forbidden}"
+
+
+def test_plotting_is_deferred():
+    # A fresh interpreter: other tests may already have imported matplotlib into this one
+    check = ("import sys, visualize.plot_failure_risks, visualize.plot_fix_wait; "
+             "print(sorted({'seaborn', 'matplotlib'} & set(sys.modules)))")
+    result = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,127 @@
+import time
+
+import mongomock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from api.routes import ingest, status
+from api.utils.cache import InvalidationFeed, status_cache
+from database.indexes import ensure_indexes
+from database.insert_data import bulk_upsert_readings
+
+
+class _AsyncCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, n):
+        self._cursor = self._cursor.limit(n)
+        return self
+
+    async def to_list(self, length=None):
+        return list(self._cursor)
+
+
+class _AsyncCollection:
+    """The subset of pymongo's AsyncCollection used by database.queries, over mongomock."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def find(self, *args, **kwargs):
+        return _AsyncCursor(self._collection.find(*args, **kwargs))
+
+    async def find_one(self, *args, **kwargs):
+        return self._collection.find_one(*args, **kwargs)
+
+    async def bulk_write(self, *args, **kwargs):
+        return self._collection.bulk_write(*args, **kwargs)
+
+
+class _AsyncDatabase:
+    def __init__(self, db):
+        self._db = db
+
+    def __getitem__(self, name):
+        return _AsyncCollection(self._db[name])
+
+
+def _client(db=None):
+    db = db or mongomock.MongoClient().db
+    ensure_indexes(db)
+    readings = [
+        {"component_id": f"c{i}", "vehicle_id": "VH-1", "timestamp": f"2025-07-13T1{i}:00:00"} for i in range(5)
+    ]
+    bulk_upsert_readings(db.components, readings, latest_collection=db.components_latest)
+
+    app = FastAPI()
+    app.include_router(status.router, prefix="/get-component-status")
+    app.include_router(ingest.router)
+    app.state.db = _AsyncDatabase(db)
+    return TestClient(app)
+
+
+def test_get_status_and_404():
+    client = _client()
+
+    body = client.get("/get-component-status/get-component-status/c3").json()
+    assert body["timestamp"] == "2025-07-13T13:00:00"
+    assert client.get("/get-component-status/get-component-status/missing").status_code == 404
+
+
+def test_list_is_paginated_and_limited():
+    client = _client()
+
+    page = client.get("/get-component-status/get-all-components", params={"limit": 3}).json()
+    assert [c["component_id"] for c in page["items"]] == ["c0", "c1", "c2"]
+    rest = client.get("/get-component-status/get-all-components", params={"after": page["next_cursor"]}).json()
+    assert [c["component_id"] for c in rest["items"]] == ["c3", "c4"]
+
+    assert client.get("/get-component-status/get-all-components", params={"limit": 100000}).status_code == 422
+
+
+def _reading(component_id, timestamp):
+    error = {"error_code": "NONE"}
+    return {
+        "component_id": component_id, "vehicle_id": "VH-1", "timestamp": timestamp,
+        "location": {"latitude": 52.5, "longitude": 13.4},
+        "battery": {"temperature": 40.0, "voltage": 12.6, **error},
+        "motor": {"vibration_level": 0.4, "torque": 120.0, **error},
+        "brake_system": {"brake_pad_thickness": 8.0, "temperature": 90.0, **error},
+        "last_service_date": "2025-01-01", "component_age_days": 200,
+    }
+
+
+def test_ingest_refreshes_the_status_of_its_components():
+    status_cache.clear()
+    client = _client()
+    status_url = "/get-component-status/get-component-status/c1"
+    assert client.get(status_url).json()["timestamp"] == "2025-07-13T11:00:00"
+
+    response = client.post("/ingest-readings", json=[_reading("c1", "2025-07-14T09:00:00")])
+    assert response.json() == {"documents": 1, "upserted": 1, "modified": 0}
+    body = client.get(status_url).json()
+    assert body["timestamp"] == "2025-07-14T09:00:00"
+    assert "ingested_at" not in body
+
+
+def test_other_processes_writes_invalidate_the_cache(monkeypatch):
+    status_cache.clear()
+    now = [time.time()]
+    monkeypatch.setattr(status, "invalidation_feed", InvalidationFeed(interval_s=1, clock=lambda: now[0]))
+    db = mongomock.MongoClient().db
+    worker = _client(db)
+    status_url = "/get-component-status/get-component-status/c2"
+    assert worker.get(status_url).json()["timestamp"] == "2025-07-13T12:00:00"
+
+    # Another worker, or ingest_jsonl, writes the same database
+    newer = {"component_id": "c2", "vehicle_id": "VH-1", "timestamp": "2025-07-14T09:00:00"}
+    bulk_upsert_readings(db.components, [newer], latest_collection=db.components_latest)
+
+    # Served from the cache until the next poll, one interval later
+    assert worker.get(status_url).json()["timestamp"] == "2025-07-13T12:00:00"
+    now[0] += 1
+    assert worker.get(status_url).json()["timestamp"] == "2025-07-14T09:00:00"
@@ -0,0 +1,115 @@
+import asyncio
+import functools
+
+import orjson
+import pandas as pd
+import pytest
+
+from engine.batch_scoring import score_frame
+from engine.stream_scorer import JsonlSink, StreamScorer, tail_jsonl
+from models.failure_predictor import SCORING_COLUMNS, WINDOWED_SCORING_COLUMNS, train_failure_model
+from models.feature_store import FeatureStore
+from utils.sensor_store import load_sensor_history
+
+PATH = "data/sensor_data_stream.jsonl"
+COSTS = {"cost_failure": 5000, "early_fix_cost": 1000}
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("model") / "failure_predictor.pkl"
+    train_failure_model(load_sensor_history(PATH, columns=SCORING_COLUMNS), model_path=str(path))
+    return str(path)
+
+
+def _read_jsonl(path):
+    with open(path, "rb") as f:
+        return [orjson.loads(line) for line in f]
+
+
+def test_scores_file_and_skips_invalid_lines(tmp_path, model_path):
+    source_path = tmp_path / "stream.jsonl"
+    lines = open(PATH, "rb").read().splitlines(keepends=True)[:300]
+    source_path.write_bytes(b"".join(lines[:100]) + b"{not json}\n" + b'{"component_id": "x"}\n'
+                            + b"".join(lines[100:]))
+    out = tmp_path / "decisions.jsonl"
+
+    scorer = StreamScorer(model_path, COSTS, JsonlSink(str(out)), max_batch_size=64, max_wait_ms=10)
+    source = functools.partial(tail_jsonl, str(source_path), from_start=True, follow=False)
+    stats = asyncio.run(scorer.run(source, report_interval_s=None))
+
+    assert (stats["scored"], stats["invalid"]) == (300, 2)
+    decisions = pd.DataFrame(_read_jsonl(out))
+    expected = score_frame(scorer.model.model, load_sensor_history(PATH, columns=SCORING_COLUMNS).head(300), COSTS)
+    assert decisions["component_id"].tolist() == expected["component_id"].tolist()
+    assert decisions["decision"].tolist() == expected["decision"].tolist()
+    assert stats["fix"] == (expected["decision"] == "FIX").sum()
+
+
+def test_tails_appended_lines_with_bounded_latency(tmp_path, model_path):
+    source_path = tmp_path / "stream.jsonl"
+    source_path.write_bytes(b"")
+    out = tmp_path / "decisions.jsonl"
+    lines = open(PATH, "rb").read().splitlines(keepends=True)[:50]
+
+    scorer = StreamScorer(model_path, COSTS, JsonlSink(str(out)), max_wait_ms=20)
+
+    async def run():
+        task = asyncio.create_task(scorer.run(functools.partial(tail_jsonl, str(source_path), poll_interval_s=0.01),
+                                              report_interval_s=None))
+        await asyncio.sleep(0.05)
+        with open(source_path, "ab") as f:
+            for line in lines:
+                f.write(line)
+                f.flush()
+                await asyncio.sleep(0.001)
+        for _ in range(200):
+            if scorer.scored == len(lines):
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+
+    assert len(_read_jsonl(out)) == len(lines)
+    latency = scorer.latency.percentiles()
+    assert latency["p99_ms"] < 1000
+
+
+def test_failed_batches_are_dead_lettered_and_skipped(tmp_path, model_path):
+    source_path = tmp_path / "stream.jsonl"
+    lines = open(PATH, "rb").read().splitlines(keepends=True)[:100]
+    source_path.write_bytes(b"".join(lines))
+    dead_letter = tmp_path / "dead.jsonl"
+
+    scorer = StreamScorer(model_path, COSTS, JsonlSink(str(tmp_path / "decisions.jsonl")), max_batch_size=40,
+                          max_wait_ms=1000, dead_letter_path=str(dead_letter))
+    score_batch = scorer.score_batch
+
+    def fail_first(batch):
+        if not dead_letter.stat().st_size:
+            raise RuntimeError("boom")
+        return score_batch(batch)
+
+    scorer.score_batch = fail_first
+    source = functools.partial(tail_jsonl, str(source_path), from_start=True, follow=False)
+    stats = asyncio.run(scorer.run(source, report_interval_s=None))
+
+    assert (stats["failed"], stats["scored"], scorer.failed_batches) == (40, 60, 1)
+    assert dead_letter.read_bytes() == b"".join(lines[:40])
+
+
+def test_feature_store_follows_the_model_window(tmp_path):
+    model_path = str(tmp_path / "failure_predictor.pkl")
+    train_failure_model(load_sensor_history(PATH, columns=SCORING_COLUMNS), model_path=model_path)
+    scorer = StreamScorer(model_path, COSTS, JsonlSink(str(tmp_path / "decisions.jsonl")), reload_interval_s=0)
+    assert scorer.feature_store is None
+
+    history = load_sensor_history(PATH, columns=WINDOWED_SCORING_COLUMNS)
+    train_failure_model(history, model_path=model_path, feature_store=FeatureStore(window=5))
+    lines = [(0.0, line) for line in open(PATH, "rb").read().splitlines()[:10]]
+    decisions = scorer.score_batch(lines)
+
+    assert scorer.feature_store.window == 5 and len(scorer.feature_store) == 10
+    assert len(decisions) == 10
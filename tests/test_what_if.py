@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from engine.decision_engine import apply_decision_engine, resolve_costs
+from engine.cost_model import parse_cost_model
+from engine.what_if import WhatIfSweep
+
+
+def _frame(probs, vehicles=None):
+    return pd.DataFrame({
+        "component_id": [f"C-{i}" for i in range(len(probs))],
+        "vehicle_id": vehicles if vehicles is not None else ["VH-1"] * len(probs),
+        "failure_probability": probs,
+    })
+
+
+def _expected(decisions, probs, cost_failure, cost_fix):
+    fix = (decisions["decision"] == "FIX").to_numpy()
+    return fix.sum(), np.where(fix, cost_fix, probs * cost_failure).sum()
+
+
+def test_evaluate_matches_decision_engine():
+    probs = np.random.default_rng(0).random(2000)
+    sweep = WhatIfSweep(probs)
+    for threshold, cost_failure, cost_fix in [(0.6, 5000, 1000), (0.95, 2000, 1500), (0.0, 5000, 1000), (1.0, 0, 10)]:
+        decisions = apply_decision_engine(_frame(probs), {"cost_failure": cost_failure, "early_fix_cost": cost_fix},
+                                          threshold=threshold)
+        n_fix, cost = _expected(decisions, probs, cost_failure, cost_fix)
+        result = sweep.evaluate(threshold, cost_failure, cost_fix)
+        assert (result.n_fix, result.n_wait) == (n_fix, len(probs) - n_fix)
+        np.testing.assert_allclose(result.expected_cost, cost)
+        np.testing.assert_allclose(result.savings, (probs * cost_failure).sum() - cost)
+
+
+def test_evaluate_with_per_row_costs():
+    probs = np.random.default_rng(1).random(500)
+    frame = _frame(probs, vehicles=np.where(np.arange(500) % 3 == 0, "VH-9", "VH-1"))
+    cost_model = parse_cost_model({"vehicles": {"VH-9": {"early_fix_cost": 200}}})
+    cost_failure, cost_fix = resolve_costs(frame, cost_model)
+
+    decisions = apply_decision_engine(frame, cost_model)
+    n_fix, cost = _expected(decisions, probs, cost_failure, cost_fix)
+    result = WhatIfSweep(probs).evaluate(cost_model.threshold, cost_failure, cost_fix)
+    assert result.n_fix == n_fix
+    np.testing.assert_allclose(result.expected_cost, cost)
+
+
+def test_grid_matches_evaluate():
+    sweep = WhatIfSweep(np.random.default_rng(2).random(1000))
+    grid = sweep.grid([0.2, 0.5, 0.9], [1000, 5000], [500, 1000, 3000])
+    assert len(grid) == 18
+    for row in grid.itertuples():
+        result = sweep.evaluate(row.threshold, row.cost_failure, row.early_fix_cost)
+        assert (row.n_fix, row.n_wait) == (result.n_fix, result.n_wait)
+        np.testing.assert_allclose([row.expected_cost, row.savings], [result.expected_cost, result.savings])
+
+
+def test_grid_with_per_row_costs_matches_evaluate():
+    rng = np.random.default_rng(3)
+    probs = rng.random(2000)
+    cost_failure = rng.choice([1000.0, 5000.0, 8000.0], 2000)
+    cost_fix = rng.choice([0.0, 200.0, 1000.0], 2000)
+    sweep = WhatIfSweep(probs)
+    grid = sweep.grid([0.9, 0.2, 0.5, 1.0], [0, 0.5, 2], [0, 1, 3], row_cost_failure=cost_failure,
+                      row_cost_fix=cost_fix)
+    assert len(grid) == 36
+    for row in grid.itertuples():
+        result = sweep.evaluate(row.threshold, row.failure_cost_scale * cost_failure, row.fix_cost_scale * cost_fix)
+        assert (row.n_fix, row.n_wait) == (result.n_fix, result.n_wait)
+        np.testing.assert_allclose([row.expected_cost, row.baseline_cost],
+                                   [result.expected_cost, result.baseline_cost])
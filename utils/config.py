@@ -0,0 +1,73 @@
+# utils/config.py
+# Runtime settings, overridable through environment variables.
+import os
+
+# 📁 Sensor history: a JSONL stream or a partitioned Parquet dataset directory
+SENSOR_DATA_PATH = os.getenv("SENSOR_DATA_PATH", "data/sensor_data_stream.jsonl")
+
+# 🤖 Failure model serving
+MODEL_PATH = os.getenv("MODEL_PATH", "model/failure_predictor.pkl")
+MODEL_BATCH_WINDOW_MS = float(os.getenv("MODEL_BATCH_WINDOW_MS", "5"))
+MODEL_MAX_BATCH_SIZE = int(os.getenv("MODEL_MAX_BATCH_SIZE", "256"))
+MODEL_RELOAD_INTERVAL_S = float(os.getenv("MODEL_RELOAD_INTERVAL_S", "2"))
+# Exported NumPy scoring kernel (models/scoring_kernel.py); point MODEL_PATH at it to serve without sklearn
+KERNEL_PATH = os.getenv("KERNEL_PATH", "model/failure_kernel.json")
+# Posterior draws of the Bayesian failure model (models/bayesian_failure.py)
+BAYES_MODEL_PATH = os.getenv("BAYES_MODEL_PATH", "model/failure_posterior.npz")
+CREDIBLE_LEVEL = float(os.getenv("CREDIBLE_LEVEL", "0.9"))
+# Readings per component kept for sliding-window features (models/feature_store.py)
+FEATURE_WINDOW = int(os.getenv("FEATURE_WINDOW", "20"))
+
+# 🚀 Serving (api/serving.py, gunicorn.conf.py)
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+# 0 = one worker per CPU
+API_WORKERS = int(os.getenv("API_WORKERS", "0"))
+# Set by api/serving.py for the workers: how many serve this app (windowed models need exactly one)
+API_SERVING_WORKERS = int(os.getenv("API_SERVING_WORKERS", "1"))
+# Seconds a stopping worker gets to finish in-flight requests
+API_GRACEFUL_TIMEOUT_S = int(os.getenv("API_GRACEFUL_TIMEOUT_S", "30"))
+# Memory-mapped kernel the workers share when MODEL_PATH is a pickled pipeline
+SERVING_KERNEL_PATH = os.getenv("SERVING_KERNEL_PATH", "model/failure_kernel.npy")
+# Shared by the workers' metric snapshots so /metrics reports all of them (utils/metrics.py);
+# api/serving.py creates a temporary one when several workers start without it
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR") or None
+METRICS_SNAPSHOT_INTERVAL_S = float(os.getenv("METRICS_SNAPSHOT_INTERVAL_S", "1"))
+
+# 🍃 MongoDB
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+MONGO_DB = os.getenv("MONGO_DB", "smart_transport")
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_TIMEOUT_MS = int(os.getenv("MONGO_TIMEOUT_MS", "5000"))
+MONGO_INGEST_BATCH_SIZE = int(os.getenv("MONGO_INGEST_BATCH_SIZE", "1000"))
+# How long /healthz waits for a MongoDB ping before reporting the database unreachable
+HEALTH_DB_TIMEOUT_S = float(os.getenv("HEALTH_DB_TIMEOUT_S", "1"))
+
+# 🗃️ API caches
+STATUS_CACHE_SIZE = int(os.getenv("STATUS_CACHE_SIZE", "10000"))
+STATUS_CACHE_TTL_S = float(os.getenv("STATUS_CACHE_TTL_S", "30"))
+# Seconds between a worker's polls of components_latest for readings other processes ingested
+STATUS_CACHE_SYNC_S = float(os.getenv("STATUS_CACHE_SYNC_S", "1"))
+RECOMMENDATION_CACHE_SIZE = int(os.getenv("RECOMMENDATION_CACHE_SIZE", "50000"))
+RECOMMENDATION_CACHE_TTL_S = float(os.getenv("RECOMMENDATION_CACHE_TTL_S", "300"))
+
+# 💸 Decision engine
+COST_MODEL_PATH = os.getenv("COST_MODEL_PATH", "config/cost_model.json")
+# Seconds between checks of the cost model file for changes (engine/cost_model.py)
+COST_MODEL_RELOAD_S = float(os.getenv("COST_MODEL_RELOAD_S", "5"))
+DECISIONS_OUTPUT_PATH = os.getenv("DECISIONS_OUTPUT_PATH", "data/fix_wait_decisions")
+
+# 📊 Dashboard aggregates (dashboard/aggregations.py)
+DASHBOARD_CACHE_DIR = os.getenv("DASHBOARD_CACHE_DIR", "data/.dashboard_cache")
+DASHBOARD_GRID_DEG = float(os.getenv("DASHBOARD_GRID_DEG", "0.25"))
+DASHBOARD_TIME_BUCKET = os.getenv("DASHBOARD_TIME_BUCKET", "1D")
+DASHBOARD_SAMPLE_SIZE = int(os.getenv("DASHBOARD_SAMPLE_SIZE", "2000"))
+
+# 📍 Dispatch queries (api/routes/dispatch.py): grid cell size and how often the index is rebuilt
+GEO_CELL_DEG = float(os.getenv("GEO_CELL_DEG", "0.5"))
+GEO_INDEX_REFRESH_S = float(os.getenv("GEO_INDEX_REFRESH_S", "30"))
+
+# ⚡ Streaming scorer
+STREAM_MAX_BATCH_SIZE = int(os.getenv("STREAM_MAX_BATCH_SIZE", "500"))
+STREAM_MAX_WAIT_MS = float(os.getenv("STREAM_MAX_WAIT_MS", "200"))
+STREAM_SOCKET_PATH = os.getenv("STREAM_SOCKET_PATH", "/tmp/sensor_stream.sock")
@@ -0,0 +1,323 @@
+# utils/metrics.py
+"""
+Process-local metrics in the Prometheus text exposition format.
+
+A minimal stand-in for prometheus_client, enough for the API's counters,
+histograms and gauges without a new dependency:
+
+    REQUESTS = Counter("http_requests_total", "Requests served", ["route", "status"])
+    REQUESTS.inc(route="/predict-failure/", status="200")
+    LATENCY.observe(0.012, route="/predict-failure/")
+    print(REGISTRY.render())
+
+Counters and gauges can be given a callback that is evaluated at scrape time, for values
+that already live elsewhere (cache sizes, whether a model is loaded).
+Each metric is guarded by its own lock, so updates are safe from the sync
+routes' threadpool.
+
+Several worker processes behind one port (api/serving.py) each hold their own
+values, and a scrape reaches only one of them. With PROMETHEUS_MULTIPROC_DIR
+set, every worker writes a snapshot of its registry to
+`<dir>/metrics-<pid>.json` (`start_snapshot_thread`, every
+METRICS_SNAPSHOT_INTERVAL_S), and `render_multiprocess` merges all of them:
+
+    counters, histograms   summed over every process, including exited ones,
+                           so totals never go backwards when a worker is recycled
+    gauges                 "livesum" (default): summed over live processes;
+                           "all": one sample per live process, with a `pid` label;
+                           "max": the largest value of a live process
+
+A scrape therefore sees other workers' values at most one snapshot interval
+old. The serving master empties the directory at startup.
+"""
+import bisect
+import glob
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def items(self) -> list:
+        """[(label values, value)] of this process, sorted by labels."""
+        raise NotImplementedError
+
+    def format_samples(self, items, labelnames: Sequence[str] = None) -> List[str]:
+        raise NotImplementedError
+
+    def samples(self) -> List[str]:
+        return self.format_samples(self.items())
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+    def render(self) -> List[str]:
+        return self.header() + self.samples()
+
+
+class _Scalar(Metric):
+    def __init__(self, *args, callback: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._callback = callback
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def items(self) -> list:
+        if self._callback is not None:
+            return sorted((tuple(map(str, k)), v) for k, v in self._callback().items())
+        with self._lock:
+            return sorted(self._values.items())
+
+    def format_samples(self, items, labelnames: Sequence[str] = None) -> List[str]:
+        labelnames = self.labelnames if labelnames is None else labelnames
+        return [f"{self.name}{_format_labels(labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Counter(_Scalar):
+    """
+    A monotonically increasing count. With a `callback` returning
+    {label values tuple: value}, the values are read at scrape time instead
+    (for counts kept elsewhere, like cache hits).
+    """
+    type = "counter"
+
+
+class Gauge(_Scalar):
+    """
+    A value that goes up and down; also accepts a scrape-time `callback`.
+    `multiprocess_mode` says how the values of several workers are merged (see the module docstring).
+    """
+    type = "gauge"
+    MODES = ("livesum", "all", "max")
+
+    def __init__(self, *args, multiprocess_mode: str = "livesum", **kwargs):
+        if multiprocess_mode not in self.MODES:
+            raise ValueError(f"Unknown multiprocess_mode: {multiprocess_mode}")
+        super().__init__(*args, **kwargs)
+        self.multiprocess_mode = multiprocess_mode
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes the wall time of the `with` block, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def items(self) -> list:
+        with self._lock:
+            return sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+
+    def format_samples(self, items, labelnames: Sequence[str] = None) -> List[str]:
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ----------------------------
+# Several worker processes
+# ----------------------------
+def _snapshot_path(directory: str, pid: int) -> str:
+    return os.path.join(directory, f"metrics-{pid}.json")
+
+
+def write_snapshot(directory: str, registry: Optional[Registry] = None):
+    """Writes this process's current values to `directory` (atomically, so readers never see half a file)."""
+    registry = registry or REGISTRY
+    with registry._lock:
+        metrics = list(registry._metrics.values())
+    snapshot = {metric.name: [[list(key), value] for key, value in metric.items()] for metric in metrics}
+    path = _snapshot_path(directory, os.getpid())
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(snapshot, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def clear_snapshots(directory: str):
+    """Removes the snapshots of a previous run; call once before any worker starts."""
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "metrics-*.json*")):
+        os.remove(path)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge(metric: Metric, per_process: List[Tuple[int, bool, list]]) -> Tuple[list, Sequence[str]]:
+    """Merged (items, labelnames) of one metric from every process's snapshot."""
+    mode = getattr(metric, "multiprocess_mode", None)
+    merged: Dict[tuple, object] = {}
+    for pid, alive, items in per_process:
+        if mode is not None and not alive:
+            continue
+        for key, value in items:
+            key = tuple(key)
+            if mode == "all":
+                merged[key + (str(pid),)] = value
+            elif isinstance(metric, Histogram):
+                counts, total = merged.get(key, ([0] * len(value[0]), 0.0))
+                merged[key] = ([a + b for a, b in zip(counts, value[0])], total + value[1])
+            elif mode == "max":
+                merged[key] = max(merged.get(key, value), value)
+            else:
+                merged[key] = merged.get(key, 0) + value
+    labelnames = metric.labelnames + ("pid",) if mode == "all" else metric.labelnames
+    return sorted(merged.items()), labelnames
+
+
+def render_multiprocess(directory: str, registry: Optional[Registry] = None) -> str:
+    """The registry's metrics merged over every worker that wrote a snapshot to `directory`."""
+    registry = registry or REGISTRY
+    write_snapshot(directory, registry)
+    snapshots = []
+    for path in glob.glob(os.path.join(directory, "metrics-*.json")):
+        pid = int(os.path.basename(path)[len("metrics-"):-len(".json")])
+        try:
+            with open(path) as f:
+                snapshots.append((pid, _alive(pid), json.load(f)))
+        except (OSError, ValueError):
+            continue
+    with registry._lock:
+        metrics = list(registry._metrics.values())
+    lines = []
+    for metric in metrics:
+        items, labelnames = _merge(metric, [(pid, alive, snapshot.get(metric.name, []))
+                                            for pid, alive, snapshot in snapshots])
+        lines += metric.header() + metric.format_samples(items, labelnames)
+    return "\n".join(lines) + "\n"
+
+
+def start_snapshot_thread(directory: str, interval_s: float, registry: Optional[Registry] = None,
+                          stop: Optional[threading.Event] = None) -> threading.Event:
+    """Writes this process's snapshot every `interval_s` until the returned event is set (then once more)."""
+    stop = stop or threading.Event()
+
+    def run():
+        while True:
+            stopping = stop.wait(interval_s)
+            try:
+                write_snapshot(directory, registry)
+            except OSError:
+                # e.g. the directory was cleaned up under us; the next tick tries again
+                pass
+            if stopping:
+                return
+
+    threading.Thread(target=run, name="metrics-snapshot", daemon=True).start()
+    return stop
@@ -0,0 +1,252 @@
+# utils/sensor_reader.py
+"""
+Streaming reader for the simulator's JSONL sensor stream.
+
+Each line holds one nested reading (battery / motor / brake_system / location).
+Readings are flattened straight into typed columns named like
+`pd.json_normalize` would name them ("battery.temperature", ...), in chunks of
+`chunk_size` rows, so the whole file is never materialized as Python dicts.
+
+Two parser paths are available:
+- "pyarrow": pyarrow's multithreaded C++ JSON reader (used when installed)
+- "python":  orjson (falls back to the stdlib json module) plus a flat column builder
+
+`start` / `end` restrict reading to a byte range, so a consumer tailing a
+growing file can read just the lines appended since its last offset (see
+`complete_lines_end`).
+"""
+import io
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson is optional
+    import json
+    _loads = json.loads
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Flat column name -> dtype of the column in the returned frames
+SENSOR_SCHEMA: Dict[str, str] = {
+    "component_id": "object",
+    "vehicle_id": "object",
+    "timestamp": "datetime64[ns]",
+    "location.latitude": "float64",
+    "location.longitude": "float64",
+    "battery.temperature": "float64",
+    "battery.voltage": "float64",
+    "battery.error_code": "category",
+    "motor.vibration_level": "float64",
+    "motor.torque": "float64",
+    "motor.error_code": "category",
+    "brake_system.brake_pad_thickness": "float64",
+    "brake_system.temperature": "float64",
+    "brake_system.error_code": "category",
+    "last_service_date": "object",
+    "component_age_days": "Int64",
+}
+
+SENSOR_COLUMNS: List[str] = list(SENSOR_SCHEMA)
+
+
+def _finalize(columns: Dict[str, object]) -> pd.DataFrame:
+    """Builds a chunk frame and casts every column to its SENSOR_SCHEMA dtype."""
+    frame = pd.DataFrame(columns)
+    for col in frame.columns:
+        dtype = SENSOR_SCHEMA[col]
+        if dtype == "datetime64[ns]":
+            frame[col] = pd.to_datetime(frame[col], format="ISO8601").astype(dtype)
+        elif dtype == "object":
+            frame[col] = frame[col].astype(object)
+        else:
+            frame[col] = frame[col].astype(dtype)
+    return frame
+
+
+class _ByteRange(io.RawIOBase):
+    """Read-only view of bytes [start, end) of an open binary file."""
+
+    def __init__(self, f, start: int, end: int):
+        self._f = f
+        self._remaining = end - start
+        f.seek(start)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), self._remaining)
+        if n <= 0:
+            return 0
+        data = self._f.read(n)
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+@contextmanager
+def _open_range(path: str, start: int = 0, end: Optional[int] = None):
+    with open(path, "rb") as f:
+        if start == 0 and end is None:
+            yield f
+        else:
+            yield io.BufferedReader(_ByteRange(f, start, os.fstat(f.fileno()).st_size if end is None else end))
+
+
+def complete_lines_end(path: str, start: int = 0) -> int:
+    """
+    Offset just past the last newline of `path` (at least `start`), i.e. the
+    end of the lines a writer has finished appending.
+    """
+    with open(path, "rb") as f:
+        end = os.fstat(f.fileno()).st_size
+        block = 1 << 16
+        while end > start:
+            begin = max(start, end - block)
+            f.seek(begin)
+            data = f.read(end - begin)
+            newline = data.rfind(b"\n")
+            if newline >= 0:
+                return begin + newline + 1
+            end = begin
+    return start
+
+
+def _iter_python(path: str, columns: List[str], chunk_size: int, start: int = 0,
+                 end: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    paths = [(col, col.split(".")) for col in columns]
+    buffers: Dict[str, list] = {col: [] for col in columns}
+    rows = 0
+
+    with _open_range(path, start, end) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = _loads(line)
+            for col, keys in paths:
+                value = record.get(keys[0])
+                if len(keys) == 2:
+                    value = value.get(keys[1]) if value else None
+                buffers[col].append(value)
+            rows += 1
+            if rows == chunk_size:
+                yield _finalize(buffers)
+                buffers = {col: [] for col in columns}
+                rows = 0
+
+    if rows:
+        yield _finalize(buffers)
+
+
+def _arrow_schema():
+    import pyarrow as pa
+
+    # Read dates as strings so both parser paths produce identical frames
+    return pa.schema([
+        ("component_id", pa.string()),
+        ("vehicle_id", pa.string()),
+        ("timestamp", pa.string()),
+        ("location", pa.struct([("latitude", pa.float64()), ("longitude", pa.float64())])),
+        ("battery", pa.struct([("temperature", pa.float64()), ("voltage", pa.float64()), ("error_code", pa.string())])),
+        ("motor", pa.struct([("vibration_level", pa.float64()), ("torque", pa.float64()), ("error_code", pa.string())])),
+        ("brake_system", pa.struct([("brake_pad_thickness", pa.float64()), ("temperature", pa.float64()),
+                                    ("error_code", pa.string())])),
+        ("last_service_date", pa.string()),
+        ("component_age_days", pa.int64()),
+    ])
+
+
+def _iter_pyarrow(path: str, columns: List[str], chunk_size: int, start: int = 0,
+                  end: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    if start == 0 and end is None:
+        # Let pyarrow open the whole file itself
+        yield from _iter_arrow_source(path, columns, chunk_size)
+        return
+    with _open_range(path, start, end) as f:
+        yield from _iter_arrow_source(f, columns, chunk_size)
+
+
+def _iter_arrow_source(source, columns: List[str], chunk_size: int) -> Iterator[pd.DataFrame]:
+    import pyarrow as pa
+    import pyarrow.json as pa_json
+
+    reader = pa_json.open_json(
+        source,
+        read_options=pa_json.ReadOptions(block_size=1 << 22),
+        parse_options=pa_json.ParseOptions(explicit_schema=_arrow_schema(), unexpected_field_behavior="ignore"),
+    )
+
+    pending: List[pa.Table] = []
+    pending_rows = 0
+    for batch in reader:
+        table = pa.Table.from_batches([batch]).flatten().select(columns)
+        pending.append(table)
+        pending_rows += table.num_rows
+        while pending_rows >= chunk_size:
+            combined = pa.concat_tables(pending)
+            chunk, rest = combined.slice(0, chunk_size), combined.slice(chunk_size)
+            yield _finalize({col: chunk.column(col).to_numpy(zero_copy_only=False) for col in columns})
+            pending, pending_rows = [rest], rest.num_rows
+
+    if pending_rows:
+        combined = pa.concat_tables(pending)
+        yield _finalize({col: combined.column(col).to_numpy(zero_copy_only=False) for col in columns})
+
+
+def _resolve_engine(engine: str) -> str:
+    if engine != "auto":
+        return engine
+    try:
+        import pyarrow.json  # noqa: F401
+        return "pyarrow"
+    except ImportError:
+        return "python"
+
+
+def iter_sensor_chunks(path: str, columns: Optional[List[str]] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       engine: str = "auto", start: int = 0, end: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Yields flat, typed DataFrames of at most `chunk_size` readings from a JSONL file.
+
+    `columns` restricts the output to a subset of SENSOR_COLUMNS.
+    `engine` is "auto", "pyarrow" or "python".
+    `start` / `end` read only that byte range; both must fall on line boundaries.
+    """
+    columns = list(columns or SENSOR_COLUMNS)
+    unknown = [col for col in columns if col not in SENSOR_SCHEMA]
+    if unknown:
+        raise ValueError(f"Unknown sensor column(s): {', '.join(unknown)}")
+    if end is not None and end <= start:
+        return iter(())
+
+    if _resolve_engine(engine) == "pyarrow":
+        return _iter_pyarrow(path, columns, chunk_size, start, end)
+    return _iter_python(path, columns, chunk_size, start, end)
+
+
+def concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenates chunk frames, keeping categorical columns categorical."""
+    if len(chunks) == 1:
+        return chunks[0]
+    for col in chunks[0].columns:
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            categories = pd.api.types.union_categoricals([c[col] for c in chunks]).categories
+            for c in chunks:
+                c[col] = c[col].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def load_sensor_data(path: str, columns: Optional[List[str]] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     engine: str = "auto") -> pd.DataFrame:
+    """
+    Loads a whole JSONL sensor file as one flat frame (see iter_sensor_chunks).
+    """
+    chunks = list(iter_sensor_chunks(path, columns=columns, chunk_size=chunk_size, engine=engine))
+    if not chunks:
+        return _finalize({col: [] for col in (columns or SENSOR_COLUMNS)})
+    return concat_chunks(chunks)
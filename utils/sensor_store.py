@@ -0,0 +1,214 @@
+# utils/sensor_store.py
+"""
+Columnar sensor history on disk.
+
+Readings are stored as a Hive-partitioned Parquet dataset:
+
+    <root>/date=2025-07-13/vehicle_id=VH-1705/part-<uuid>-0.parquet
+
+so readers only open the files whose partitions match their filters and only
+decode the columns they ask for. `load_sensor_history` is the single loader
+the scripts use: it reads either such a dataset or a raw JSONL stream.
+
+Usage:
+    python -m utils.sensor_store data/sensor_data_stream.jsonl data/sensor_history
+"""
+import argparse
+import os
+import uuid
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from utils.sensor_reader import DEFAULT_CHUNK_SIZE, SENSOR_SCHEMA, iter_sensor_chunks, load_sensor_data
+
+PARTITION_COLUMNS = ["date", "vehicle_id"]
+
+# (column, op, value) predicates, AND-ed together, as accepted by pyarrow.parquet
+Filters = Sequence[Tuple[str, str, object]]
+
+
+def _partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(pa.schema([("date", pa.string()), ("vehicle_id", pa.string())]), flavor="hive")
+
+
+def write_sensor_parquet(frame: pd.DataFrame, root: str) -> int:
+    """
+    Appends a flat sensor frame (see utils.sensor_reader) to the dataset at `root`.
+    Returns the number of rows written.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    if frame.empty:
+        return 0
+
+    frame = frame.copy()
+    frame["date"] = pd.to_datetime(frame["timestamp"]).dt.strftime("%Y-%m-%d")
+    frame["vehicle_id"] = frame["vehicle_id"].astype(str)
+    # Sorted input lets the writer finish each partition in one file instead of
+    # reopening partitions once it hits its open-file limit
+    frame = frame.sort_values(PARTITION_COLUMNS, kind="stable")
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+
+    ds.write_dataset(
+        table,
+        root,
+        format="parquet",
+        partitioning=_partitioning(),
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        max_partitions=1_000_000,
+    )
+    return len(frame)
+
+
+def convert_jsonl_to_parquet(jsonl_path: str, root: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Streams a JSONL sensor file into the Parquet dataset chunk by chunk."""
+    return sum(write_sensor_parquet(chunk, root) for chunk in iter_sensor_chunks(jsonl_path, chunk_size=chunk_size))
+
+
+def read_sensor_parquet(root: str, columns: Optional[List[str]] = None,
+                        filters: Optional[Filters] = None) -> pd.DataFrame:
+    """
+    Reads the Parquet dataset with column projection and predicate pushdown.
+
+    Filters on `date` / `vehicle_id` prune whole partitions; filters on other
+    columns are pushed down to Parquet row-group statistics.
+    """
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(root, columns=columns, filters=list(filters) if filters else None,
+                          partitioning=_partitioning())
+    return _to_sensor_frame(table, columns)
+
+
+def _to_sensor_frame(table, columns: Optional[List[str]]) -> pd.DataFrame:
+    frame = table.to_pandas()
+    # Match the dtypes and column order produced by utils.sensor_reader
+    for col in frame.columns:
+        if SENSOR_SCHEMA.get(col) == "object":
+            frame[col] = frame[col].astype(object)
+    if columns is None:
+        frame = frame[[col for col in SENSOR_SCHEMA if col in frame.columns]]
+    return frame
+
+
+_OPS = {
+    "==": lambda s, v: s == v,
+    "=": lambda s, v: s == v,
+    "!=": lambda s, v: s != v,
+    "<": lambda s, v: s < v,
+    "<=": lambda s, v: s <= v,
+    ">": lambda s, v: s > v,
+    ">=": lambda s, v: s >= v,
+    "in": lambda s, v: s.isin(v),
+    "not in": lambda s, v: ~s.isin(v),
+}
+
+
+def _filter_frame(frame: pd.DataFrame, filters: Filters) -> pd.DataFrame:
+    # Same predicate semantics as the Parquet path, for JSONL input
+    mask = pd.Series(True, index=frame.index)
+    for col, op, value in filters:
+        series = frame["timestamp"].dt.strftime("%Y-%m-%d") if col == "date" else frame[col]
+        mask &= _OPS[op](series, value)
+    return frame[mask].reset_index(drop=True)
+
+
+def _with_filter_columns(columns: Optional[List[str]], filters: Filters) -> List[str]:
+    # Filter columns must be loaded even if they are not returned
+    needed = list(columns or SENSOR_SCHEMA)
+    for col, _, _ in filters:
+        extra = "timestamp" if col == "date" else col
+        if extra not in needed:
+            needed.append(extra)
+    return needed
+
+
+def load_sensor_history(path: str, columns: Optional[List[str]] = None,
+                        filters: Optional[Filters] = None) -> pd.DataFrame:
+    """
+    Loads sensor readings from a Parquet dataset directory / file or a JSONL stream.
+
+    Only `columns` are returned (all sensor columns when None), and only the
+    rows matching every `filters` predicate.
+    """
+    if os.path.isdir(path) or path.endswith(".parquet"):
+        return read_sensor_parquet(path, columns=columns, filters=filters)
+
+    if not filters:
+        return load_sensor_data(path, columns=columns)
+
+    frame = _filter_frame(load_sensor_data(path, columns=_with_filter_columns(columns, filters)), filters)
+    return frame[columns] if columns else frame
+
+
+def _iter_parquet(root: str, columns: Optional[List[str]], filters: Optional[Filters],
+                  chunk_size: int, files: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    if files is not None:
+        # Partition values still come from the paths below root
+        dataset = ds.dataset(files, format="parquet", partitioning=_partitioning(), partition_base_dir=root)
+    else:
+        dataset = ds.dataset(root, format="parquet", partitioning=_partitioning())
+    expression = pq.filters_to_expression(list(filters)) if filters else None
+    # Partition files are small, so record batches are coalesced up to chunk_size rows
+    pending, pending_rows = [], 0
+    for batch in dataset.to_batches(columns=columns, filter=expression, batch_size=chunk_size):
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        if pending_rows >= chunk_size:
+            yield _to_sensor_frame(pa.Table.from_batches(pending), columns)
+            pending, pending_rows = [], 0
+    if pending_rows:
+        yield _to_sensor_frame(pa.Table.from_batches(pending), columns)
+
+
+def iter_sensor_history(path: str, columns: Optional[List[str]] = None, filters: Optional[Filters] = None,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Chunked counterpart of load_sensor_history: yields frames of roughly
+    `chunk_size` readings, so callers never hold the whole history in memory.
+    """
+    if os.path.isdir(path) or path.endswith(".parquet"):
+        yield from _iter_parquet(path, columns, filters, chunk_size)
+        return
+
+    if not filters:
+        yield from iter_sensor_chunks(path, columns=columns, chunk_size=chunk_size)
+        return
+
+    needed = _with_filter_columns(columns, filters)
+    for chunk in iter_sensor_chunks(path, columns=needed, chunk_size=chunk_size):
+        chunk = _filter_frame(chunk, filters)
+        if len(chunk):
+            yield chunk[columns] if columns else chunk
+
+
+def iter_parquet_files(root: str, files: List[str], columns: Optional[List[str]] = None,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Like iter_sensor_history, over just the given data files of the dataset at `root`."""
+    if files:
+        yield from _iter_parquet(root, columns, None, chunk_size, files=files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a JSONL sensor stream into the partitioned Parquet store")
+    parser.add_argument("jsonl_path")
+    parser.add_argument("root")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    rows = convert_jsonl_to_parquet(args.jsonl_path, args.root, chunk_size=args.chunk_size)
+    print(f"✅ Wrote {rows} readings to {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
 # visualize/plot_failure_risks.py
 
-import seaborn as sns
-import matplotlib.pyplot as plt
 import pandas as pd
 
 def plot_failure_probabilities(df_with_probs: pd.DataFrame):
+    # Plotting libraries are imported on first use; the CLIs only need them with --plot
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+
     sns.set(style="whitegrid", font_scale=1.1)
     df_sorted = df_with_probs.sort_values(by='failure_probability', ascending=False).reset_index(drop=True)
     df_sorted['component_idx'] = df_sorted.index + 1
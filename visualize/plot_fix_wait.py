@@ -1,7 +1,8 @@
-import seaborn as sns
-import matplotlib.pyplot as plt
-
 def plot_decision_breakdown(df_decisions):
+    # Plotting libraries are imported on first use; the CLIs only need them with --plot
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+
     sns.set(style="whitegrid", font_scale=1.1)
     
     # Count decisions
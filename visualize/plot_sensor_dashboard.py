@@ -1,17 +1,17 @@
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-import json
-
-# Set seaborn theme
-sns.set(style="whitegrid", palette="deep", font_scale=1.1)
+from utils.sensor_store import load_sensor_history
 
 def load_and_flatten_sensor_data(filepath):
-    with open(filepath, "r") as f:
-        lines = [json.loads(line) for line in f]
-    return pd.json_normalize(lines)
+    return load_sensor_history(filepath)
 
 def plot_dashboard(df):
+    # Plotting libraries are imported, and the theme set, on first use rather than at import
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+
+    # Set seaborn theme
+    sns.set(style="whitegrid", palette="deep", font_scale=1.1)
+
     fig, axs = plt.subplots(2, 2, figsize=(16, 10))
     fig.suptitle("🔧 Sensor System Monitoring Dashboard", fontsize=18, fontweight="bold")
 